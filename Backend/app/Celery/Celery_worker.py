@@ -1,7 +1,9 @@
 # app/celery_app.py
 import os
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown
 from dotenv import load_dotenv
+from app.core import sync_db
 
 load_dotenv()
 
@@ -34,10 +36,35 @@ celery.conf.update(
     task_track_started=True,
 )
 
+# Hard backstop behind the per-task image limits: recycle a prefork child once its
+# resident memory grows past this many KiB (checked after each task).
+if os.getenv("CELERY_MAX_MEMORY_PER_CHILD_KB"):
+    celery.conf.worker_max_memory_per_child = int(os.getenv("CELERY_MAX_MEMORY_PER_CHILD_KB"))
+
+
+# Per-process Mongo client: every prefork child opens its own pooled client after
+# the fork and reuses it across tasks; nothing is opened in the parent/API process.
+@worker_process_init.connect
+def _init_worker_mongo(**kwargs):
+    sync_db.init_client()
+
+
+@worker_process_shutdown.connect
+def _close_worker_mongo(**kwargs):
+    sync_db.close_client()
+
 # Import tasks to register them
-from app.Celery import image_tasks
+from app.Celery import image_tasks, pdf_tasks
+
+from app.utils.task_metrics import StageTimer, record_task_metrics
 
 @celery.task
-def process_item(item_id):
-    # Place your background task logic (e.g., DB, image work) here
-    return {"status": "completed", "item_id": item_id}
+def process_item(item_id, enqueued_at=None):
+    timer = StageTimer("process_item", enqueued_at=enqueued_at)
+    outcome = "failed"
+    try:
+        # Place your background task logic (e.g., DB, image work) here
+        outcome = "completed"
+        return {"status": outcome, "item_id": item_id, "timings": timer.as_dict()}
+    finally:
+        record_task_metrics(sync_db.getdb(), timer, outcome, item_id=item_id)
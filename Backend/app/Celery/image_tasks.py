@@ -1,90 +1,189 @@
 # app/tasks/image_tasks.py
 import io
+import os
+from typing import Optional, Union, BinaryIO
 from app.Celery.Celery_worker import celery
-from pymongo import MongoClient
-import gridfs
-from PIL import Image
-from dotenv import load_dotenv
+from PIL import Image, UnidentifiedImageError
 from bson import ObjectId
-import os
+from app.core.sync_db import getdb, get_gridfs
 from app.utils.cache_manager import cache_manager
+from app.utils.task_metrics import StageTimer, record_task_metrics
+from app.utils.status_events import publish_status
+
+# Input limits for thumbnailing. Anything above them is rejected with a specific
+# processing_status instead of being decoded.
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))
+# Ceiling on the decoded bitmap a single task may hold (after JPEG draft scaling)
+IMAGE_TASK_MEMORY_MB = int(os.getenv("IMAGE_TASK_MEMORY_MB", "256"))
+
+# Let PIL's own decompression-bomb check agree with ours
+Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
 
-load_dotenv()
+class ImageRejected(Exception):
+    """Raised when an input image is outside the configured limits."""
+
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _set_status(db, oid: ObjectId, item_id: str, status: str, **fields):
+    """
+    Update the item's processing_status (plus any extra fields), drop the cached copy
+    so the next GET sees it, then publish the transition to SSE/WebSocket listeners.
+    """
+    result = db.items.update_one({"_id": oid}, {"$set": {"processing_status": status, **fields}})
+    cache_manager.invalidate_item(item_id)
+    publish_status(item_id, status, **fields)
+    return result
 
-MONGO_URI = os.getenv("MONGODB_URI", "mongodb://mongo:27017")
-MONGO_DB = os.getenv("MONGODB_DB", "ZEKA")
 
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB]
-fs = gridfs.GridFS(db)
+def _record_metrics(timer: StageTimer, outcome: str, item_oid: Optional[ObjectId] = None, **extra):
+    """Persist the task timings on the item (if any) and in the `task_metrics` collection."""
+    db = getdb()
+    if item_oid is not None:
+        try:
+            db.items.update_one({"_id": item_oid}, {"$set": {"timings": {**timer.as_dict(), "outcome": outcome}}})
+        except Exception as exc:
+            print(f"[DEBUG] Failed to store timings on item: {exc}")
+    record_task_metrics(db, timer, outcome, **extra)
 
-def _make_thumbnail_bytes(image_bytes: bytes, size=(256, 256)) -> bytes:
-    im = Image.open(io.BytesIO(image_bytes))
-    im = im.convert("RGB")
-    im.thumbnail(size)
-    out = io.BytesIO()
-    im.save(out, format="JPEG", quality=85)
+
+def _make_thumbnail_bytes(source: Union[bytes, BinaryIO], size=(256, 256), timer: Optional[StageTimer] = None) -> bytes:
+    """
+    Build a JPEG thumbnail while keeping memory bounded.
+
+    `source` may be raw bytes or a seekable file-like object (e.g. a GridOut), in
+    which case PIL pulls the data through the decoder in chunks rather than the
+    whole original being read into memory first. Only the header is parsed before
+    the dimension check, and JPEGs are decoded at the smallest DCT scale that
+    still covers `size`.
+    """
+    timer = timer or StageTimer("thumbnail")
+    fp = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    with timer.stage("header_check"):
+        try:
+            im = Image.open(fp)  # lazy: reads the header only
+        except Image.DecompressionBombError as exc:
+            raise ImageRejected("too_many_pixels", str(exc)) from exc
+        except UnidentifiedImageError as exc:
+            raise ImageRejected("unsupported_image", str(exc)) from exc
+        width, height = im.size
+        if width * height > IMAGE_MAX_PIXELS:
+            raise ImageRejected(
+                "too_many_pixels",
+                f"image is {width}x{height} ({width * height} px), limit is {IMAGE_MAX_PIXELS} px",
+            )
+        im.draft("RGB", size)
+        decoded_bytes = im.size[0] * im.size[1] * 3
+        if decoded_bytes > IMAGE_TASK_MEMORY_MB * 1024 * 1024:
+            raise ImageRejected(
+                "memory_limit",
+                f"decoding needs ~{decoded_bytes // (1024 * 1024)} MB, limit is {IMAGE_TASK_MEMORY_MB} MB",
+            )
+    with timer.stage("decode"):
+        try:
+            im = im.convert("RGB")
+        except MemoryError as exc:
+            raise ImageRejected("memory_limit", "out of memory while decoding") from exc
+    with timer.stage("resize"):
+        im.thumbnail(size)
+    with timer.stage("encode"):
+        out = io.BytesIO()
+        im.save(out, format="JPEG", quality=85)
     return out.getvalue()
 
 @celery.task(bind=True, acks_late=True)
-def process_image(self, item_id: str):
+def process_image(self, item_id: str, enqueued_at: Optional[float] = None):
+    timer = StageTimer("process_image", enqueued_at=enqueued_at)
+    db = getdb()
+    fs = get_gridfs()
     print(f"[DEBUG] Starting process_image for item_id: {item_id}")
     try:
         oid = ObjectId(item_id)
         print(f"[DEBUG] Converted to ObjectId: {oid}")
     except Exception as e:
         print(f"[DEBUG] Failed to convert to ObjectId: {e}")
+        _record_metrics(timer, "invalid_id", item_id=item_id)
         return {"error": "invalid item_id"}
 
     # Set processing status
-    result = db.items.update_one({"_id": oid}, {"$set": {"processing_status": "processing"}})
+    with timer.stage("status_update"):
+        result = _set_status(db, oid, item_id, "processing")
     print(f"[DEBUG] Update result - matched: {result.matched_count}, modified: {result.modified_count}")
 
-    item = db.items.find_one({"_id": oid})
+    with timer.stage("item_lookup"):
+        item = db.items.find_one({"_id": oid})
     print(f"[DEBUG] Found item: {item is not None}")
     if not item:
-        db.items.update_one({"_id": oid}, {"$set": {"processing_status": "not_found"}})
+        _set_status(db, oid, item_id, "not_found")
+        _record_metrics(timer, "not_found", item_id=item_id)
         return {"error": "item not found"}
 
     image_id = item.get("image_id")
     if not image_id:
-        db.items.update_one({"_id": oid}, {"$set": {"processing_status": "no_image"}})
+        _set_status(db, oid, item_id, "no_image")
+        _record_metrics(timer, "no_image", oid, item_id=item_id)
         return {"error": "no image"}
 
     try:
-        img_oid = ObjectId(image_id)
-        grid_out = fs.get(img_oid)
-        image_bytes = grid_out.read()
+        with timer.stage("gridfs_open"):
+            img_oid = ObjectId(image_id)
+            grid_out = fs.get(img_oid)
     except Exception as exc:
-        db.items.update_one({"_id": oid}, {"$set": {"processing_status": "read_error"}})
+        _set_status(db, oid, item_id, "read_error")
+        _record_metrics(timer, "read_error", oid, item_id=item_id)
         return {"error": f"gridfs read failed: {exc}"}
 
+    input_bytes = grid_out.length
+    if input_bytes > IMAGE_MAX_BYTES:
+        message = f"image is {input_bytes} bytes, limit is {IMAGE_MAX_BYTES} bytes"
+        _set_status(db, oid, item_id, "too_large", processing_error=message)
+        _record_metrics(timer, "too_large", oid, item_id=item_id, input_bytes=input_bytes)
+        return {"error": message}
+
     try:
-        thumb_bytes = _make_thumbnail_bytes(image_bytes, size=(256, 256))
-        thumb_id = fs.put(thumb_bytes, filename=f"thumb_{image_id}.jpg", metadata={"contentType": "image/jpeg"})
+        # GridOut is file-like: the decoder streams chunks from GridFS as it goes
+        thumb_bytes = _make_thumbnail_bytes(grid_out, size=(256, 256), timer=timer)
+        with timer.stage("gridfs_write"):
+            thumb_id = fs.put(thumb_bytes, filename=f"thumb_{image_id}.jpg", metadata={"contentType": "image/jpeg"})
+    except ImageRejected as exc:
+        _set_status(db, oid, item_id, exc.status, processing_error=str(exc))
+        _record_metrics(timer, exc.status, oid, item_id=item_id, input_bytes=input_bytes)
+        return {"error": str(exc)}
     except Exception as exc:
-        db.items.update_one({"_id": oid}, {"$set": {"processing_status": "thumb_fail"}})
+        _set_status(db, oid, item_id, "thumb_fail")
+        _record_metrics(timer, "thumb_fail", oid, item_id=item_id, input_bytes=input_bytes)
         return {"error": f"thumbnail creation failed: {exc}"}
 
-    db.items.update_one({"_id": oid}, {"$set": {"thumbnail_id": str(thumb_id), "processing_status": "done"}})
-    
-    # Invalidate cache so the next GET fetches the updated item with thumbnail_id
-    cache_manager.invalidate_item(item_id)
+    with timer.stage("write_back"):
+        # also invalidates the cache so the next GET fetches the updated item with thumbnail_id
+        _set_status(db, oid, item_id, "done", thumbnail_id=str(thumb_id))
+
+    _record_metrics(timer, "done", oid, item_id=item_id, input_bytes=input_bytes, output_bytes=len(thumb_bytes))
     
-    return {"status": "ok", "thumbnail_id": str(thumb_id)}
+    return {"status": "ok", "thumbnail_id": str(thumb_id), "timings": timer.as_dict()}
 
 import time
 from app.utils.mock_redis import MockRedis
 
 @celery.task
-def cache_task(key: str, value: str):
+def cache_task(key: str, value: str, enqueued_at: Optional[float] = None):
+    timer = StageTimer("cache_task", enqueued_at=enqueued_at)
+
     # Simulate heavy processing
-    time.sleep(5)
+    with timer.stage("compute"):
+        time.sleep(5)
     
     # Connect to Mock Redis using file storage
-    r = MockRedis.from_url("local")
+    with timer.stage("cache_write"):
+        r = MockRedis.from_url("local")
     
-    # Set the value with a TTL of 60 seconds
-    r.setex(key, 60, value)
+        # Set the value with a TTL of 60 seconds
+        r.setex(key, 60, value)
+
+    _record_metrics(timer, "cached", key=key)
     
     return {"status": "cached", "key": key, "value": value}
@@ -0,0 +1,141 @@
+# app/Celery/pdf_tasks.py
+import os
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Optional
+from bson import ObjectId
+from app.Celery.Celery_worker import celery
+from app.core.sync_db import getdb, get_gridfs
+from app.utils.parse_cache import iter_test_cases_cached, content_digest
+from app.utils.task_metrics import StageTimer, record_task_metrics
+from app.utils.dedup_index import dedup_index
+
+PDF_INSERT_BATCH_SIZE = int(os.getenv("PDF_INSERT_BATCH_SIZE", "50"))
+# Write job progress at most every this many pages (plus after every batch)
+PROGRESS_EVERY_PAGES = int(os.getenv("PDF_PROGRESS_EVERY_PAGES", "10"))
+
+
+def _update_job(db, job_oid: ObjectId, fields: dict, push_error: Optional[str] = None):
+    update = {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}}
+    if push_error:
+        update["$push"] = {"errors": push_error}
+    db.jobs.update_one({"_id": job_oid}, update)
+
+
+@celery.task(bind=True, acks_late=True)
+def ingest_pdf(self, job_id: str, enqueued_at: Optional[float] = None):
+    """
+    Parse a PDF stored in GridFS and insert its test cases in batches, keeping the
+    job document's pages_processed / items_inserted / errors current as it goes.
+    """
+    timer = StageTimer("ingest_pdf", enqueued_at=enqueued_at)
+    db = getdb()
+    fs = get_gridfs()
+    try:
+        job_oid = ObjectId(job_id)
+    except Exception:
+        record_task_metrics(db, timer, "invalid_id", job_id=job_id)
+        return {"error": "invalid job_id"}
+
+    job = db.jobs.find_one({"_id": job_oid})
+    if not job:
+        record_task_metrics(db, timer, "not_found", job_id=job_id)
+        return {"error": "job not found"}
+    _update_job(db, job_oid, {"status": "running", "task_id": self.request.id})
+
+    try:
+        with timer.stage("gridfs_read"):
+            file_bytes = fs.get(ObjectId(job["file_id"])).read()
+    except Exception as exc:
+        _update_job(db, job_oid, {"status": "failed", "finished_at": datetime.now(timezone.utc)}, push_error=f"GridFS read failed: {exc}")
+        record_task_metrics(db, timer, "read_error", job_id=job_id)
+        return {"error": f"gridfs read failed: {exc}"}
+
+    digest = content_digest(file_bytes)
+    if job.get("skip_duplicates"):
+        previous = db.pdf_uploads.find_one({"_id": digest})
+        if previous:
+            _update_job(db, job_oid, {
+                "status": "duplicate",
+                "duplicate_item_ids": previous.get("item_ids", []),
+                "finished_at": datetime.now(timezone.utc),
+            })
+            record_task_metrics(db, timer, "duplicate", job_id=job_id)
+            return {"status": "duplicate", "job_id": job_id, "items_inserted": 0}
+
+    progress = {"pages": 0, "total": None, "written": 0}
+
+    def on_page(done: int, total: int):
+        progress["pages"] = done
+        progress["total"] = total
+        if progress["written"] == 0:
+            _update_job(db, job_oid, {"pages_total": total, "pages_processed": done})
+            progress["written"] = done
+        elif done - progress["written"] >= PROGRESS_EVERY_PAGES:
+            _update_job(db, job_oid, {"pages_processed": done})
+            progress["written"] = done
+
+    # prefork children are daemonic and cannot start their own process pool
+    cases = iter_test_cases_cached(file_bytes, digest=digest, workers=1, on_page=on_page)
+    inserted = 0
+    inserted_ids = []
+    duplicates_skipped = 0
+    status = "done"
+    with timer.stage("dedup_refresh"):
+        dedup_index.refresh_sync(db)
+    while True:
+        try:
+            with timer.stage("parse"):
+                batch = list(islice(cases, PDF_INSERT_BATCH_SIZE))
+        except Exception as exc:
+            status = "failed"
+            _update_job(db, job_oid, {"pages_processed": progress["pages"]}, push_error=f"Error parsing PDF: {exc}")
+            break
+        if not batch:
+            break
+        with timer.stage("dedup"):
+            batch, skipped = dedup_index.screen(batch)
+        duplicates_skipped += skipped
+        if not batch:
+            continue
+        now = datetime.now(timezone.utc)
+        for case in batch:
+            case.setdefault("created_at", now)
+            case["ingest_job_id"] = job_id
+        try:
+            with timer.stage("insert"):
+                res = db.items.insert_many(batch, ordered=True)
+            inserted += len(batch)
+            inserted_ids.extend(str(oid) for oid in res.inserted_ids)
+            for case, oid in zip(batch, res.inserted_ids):
+                dedup_index.add(str(oid), case)
+            _update_job(db, job_oid, {
+                "pages_processed": progress["pages"],
+                "items_inserted": inserted,
+                "duplicates_skipped": duplicates_skipped,
+            })
+        except Exception as exc:
+            # keep going: one bad batch should not lose the rest of the document
+            _update_job(db, job_oid, {"pages_processed": progress["pages"]}, push_error=f"Insert of {len(batch)} items failed: {exc}")
+
+    if status == "done" and inserted == 0 and not duplicates_skipped:
+        _update_job(db, job_oid, {}, push_error="No valid test cases found in PDF")
+    if status == "done" and inserted:
+        now = datetime.now(timezone.utc)
+        db.pdf_uploads.update_one(
+            {"_id": digest},
+            {"$set": {"filename": job.get("filename"), "item_ids": inserted_ids, "updated_at": now},
+             "$setOnInsert": {"created_at": now}},
+            upsert=True,
+        )
+    _update_job(db, job_oid, {
+        "status": status,
+        "pages_total": progress["total"],
+        "pages_processed": progress["pages"],
+        "items_inserted": inserted,
+        "duplicates_skipped": duplicates_skipped,
+        "finished_at": datetime.now(timezone.utc),
+        "timings": timer.as_dict(),
+    })
+    record_task_metrics(db, timer, status, job_id=job_id, items_inserted=inserted, pages=progress["pages"])
+    return {"status": status, "job_id": job_id, "items_inserted": inserted}
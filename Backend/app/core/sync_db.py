@@ -0,0 +1,66 @@
+# app/core/sync_db.py
+# Synchronous (pymongo) access for the Celery workers.
+#
+# Nothing here connects at import time: the API process imports the task modules
+# only to call `.delay()`, and prefork workers must not inherit a client that was
+# created in the parent before fork. Each worker child builds its own pooled client
+# from the `worker_process_init` signal (see Celery_worker.py); the getters below
+# also create it lazily for the solo/threads pools and for scripts.
+import os
+import gridfs
+from pymongo import MongoClient
+from pymongo.database import Database
+from dotenv import load_dotenv
+
+load_dotenv()
+MONGO_URI = os.getenv("MONGODB_URI", "mongodb://mongo:27017")
+MONGO_DB = os.getenv("MONGODB_DB", "ZEKA")
+MONGO_POOL_SIZE = int(os.getenv("MONGODB_WORKER_POOL_SIZE", "4"))
+
+client: MongoClient | None = None
+db: Database | None = None
+fs: gridfs.GridFS | None = None
+_owner_pid: int | None = None
+
+
+def init_client() -> MongoClient:
+    """
+    Create the per-process client. Safe to call again after a fork: a client
+    inherited from another pid is dropped (not closed, its sockets belong to the
+    parent) and replaced.
+    """
+    global client, db, fs, _owner_pid
+    client = MongoClient(MONGO_URI, maxPoolSize=MONGO_POOL_SIZE, connect=False)
+    db = None
+    fs = None
+    _owner_pid = os.getpid()
+    return client
+
+
+def getclient() -> MongoClient:
+    if client is None or _owner_pid != os.getpid():
+        init_client()
+    return client
+
+
+def getdb() -> Database:
+    global db
+    if db is None or _owner_pid != os.getpid():
+        db = getclient()[MONGO_DB]
+    return db
+
+
+def get_gridfs() -> gridfs.GridFS:
+    global fs
+    if fs is None or _owner_pid != os.getpid():
+        fs = gridfs.GridFS(getdb())
+    return fs
+
+
+def close_client():
+    """Close this process's client (worker shutdown)."""
+    global client, db, fs, _owner_pid
+    if client is not None and _owner_pid == os.getpid():
+        client.close()
+    client = db = fs = None
+    _owner_pid = None
@@ -2,9 +2,10 @@
 
 from bson import ObjectId
 from datetime import datetime, timezone
-from typing import Optional, AsyncGenerator, Dict, Any
+from typing import Optional, AsyncGenerator, Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 from pymongo.errors import PyMongoError
+from app.utils.dedup_index import dedup_index
 from bson import ObjectId
 
 
@@ -50,6 +51,7 @@ async def Create_item(db:AsyncIOMotorDatabase,item_dict:dict)->dict:
         if isinstance(ca, datetime) and ca.tzinfo is None:
             items["created_at"] = ca.replace(tzinfo=timezone.utc)
         item_out = {**items, "id": str(res.inserted_id)}
+    dedup_index.add(item_out["id"], item_out)
     
     return item_out
 
@@ -57,6 +59,45 @@ async def Create_item(db:AsyncIOMotorDatabase,item_dict:dict)->dict:
 
 
 
+async def Create_items(db: AsyncIOMotorDatabase, item_dicts: List[dict]) -> List[dict]:
+    """
+    Batched variant of `Create_item`: inserts all items with a single `insert_many`
+    round trip and builds the returned documents locally instead of reading each
+    one back.
+
+    :param db: The async MongoDB database handle
+    :type db: AsyncIOMotorDatabase
+    :param item_dicts: The item documents to insert, in order
+    :type item_dicts: List[dict]
+    :return: The inserted items in the same order, each with "id" set and a
+    timezone-aware "created_at".
+    """
+    if not item_dicts:
+        return []
+    now = datetime.now(timezone.utc)
+    docs = []
+    for item_dict in item_dicts:
+        doc = dict(item_dict)
+        doc.setdefault("created_at", now)
+        docs.append(doc)
+
+    try:
+        res = await db.items.insert_many(docs, ordered=True)
+    except PyMongoError as e:
+        raise RuntimeError(f"DB insert failed: {e}") from e
+
+    items_out = []
+    for doc, inserted_id in zip(docs, res.inserted_ids):
+        doc.pop("_id", None)
+        ca = doc.get("created_at")
+        if isinstance(ca, datetime) and ca.tzinfo is None:
+            doc["created_at"] = ca.replace(tzinfo=timezone.utc)
+        items_out.append({**doc, "id": str(inserted_id)})
+        dedup_index.add(str(inserted_id), doc)
+    return items_out
+
+
+
 async def Get_item(db:AsyncIOMotorDatabase,item_id:str)->Optional[Dict[str,Any]]:
     """
     The function `Get_item` retrieves an item from a MongoDB database using its ID.
@@ -220,4 +261,127 @@ async def update_item_fields(db: AsyncIOMotorDatabase, item_id: str, fields: Dic
     except Exception:
         return False
     res = await db.items.update_one({"_id": oid}, {"$set": fields})
-    return res.modified_count > 0
\ No newline at end of file
+    return res.modified_count > 0
+
+
+
+async def Get_items(db: AsyncIOMotorDatabase, item_ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Fetch several items by id in one query, returned in the order of `item_ids`
+    (ids that are malformed or no longer exist are skipped).
+    """
+    oids = []
+    for item_id in item_ids:
+        try:
+            oids.append(ObjectId(item_id))
+        except Exception:
+            continue
+    docs = {}
+    async for doc in db.items.find({"_id": {"$in": oids}}):
+        doc["id"] = str(doc.pop("_id"))
+        docs[doc["id"]] = doc
+    return [docs[str(oid)] for oid in oids if str(oid) in docs]
+
+
+async def get_pdf_upload(db: AsyncIOMotorDatabase, digest: str) -> Optional[Dict[str, Any]]:
+    """Previous ingestion of a PDF with this content hash, if any."""
+    return await db.pdf_uploads.find_one({"_id": digest})
+
+
+async def record_pdf_upload(db: AsyncIOMotorDatabase, digest: str, filename: str, item_ids: List[str]):
+    """Remember which items a PDF (by content hash) produced, for duplicate-upload detection."""
+    await db.pdf_uploads.update_one(
+        {"_id": digest},
+        {
+            "$set": {"filename": filename, "item_ids": item_ids, "updated_at": datetime.now(timezone.utc)},
+            "$setOnInsert": {"created_at": datetime.now(timezone.utc)},
+        },
+        upsert=True,
+    )
+
+
+# Relative weights of the fields in the `items` text index
+SEARCH_WEIGHTS = {"title": 10, "steps": 2, "description": 3, "expected_result": 2}
+SEARCH_INDEX_NAME = "items_text"
+
+
+async def ensure_item_indexes(db: AsyncIOMotorDatabase):
+    """
+    Create the indexes the item queries rely on (no-op if they already exist):
+    a weighted text index for `search_items`, an index on `type` for filtering and
+    one on `created_at` for date filters and the dedup index refresh.
+    """
+    await db.items.create_index(
+        [(field, "text") for field in SEARCH_WEIGHTS],
+        name=SEARCH_INDEX_NAME,
+        weights=SEARCH_WEIGHTS,
+        default_language="english",
+    )
+    await db.items.create_index([("type", 1)], name="items_type")
+    await db.items.create_index([("created_at", 1)], name="items_created_at")
+
+
+async def search_items(
+    db: AsyncIOMotorDatabase,
+    query: str,
+    item_type: Optional[str] = None,
+    limit: int = 20,
+    skip: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Full-text search over title, description, expected_result and steps using the
+    `items` text index, best matches first.
+
+    :param db: The async MongoDB database handle
+    :type db: AsyncIOMotorDatabase
+    :param query: Search terms; supports the Mongo `$text` syntax ("quoted phrases",
+    -excluded terms)
+    :type query: str
+    :param item_type: Only return items of this type (e.g. "negative")
+    :type item_type: Optional[str]
+    :param limit: Maximum number of results
+    :type limit: int
+    :param skip: Number of results to skip (for paging)
+    :type skip: int
+    :return: Matching items with "id" set and their relevance in "score".
+    """
+    flt: Dict[str, Any] = {"$text": {"$search": query}}
+    if item_type:
+        flt["type"] = item_type
+    score = {"score": {"$meta": "textScore"}}
+    cursor = db.items.find(flt, score).sort([("score", {"$meta": "textScore"})]).skip(skip).limit(limit)
+    results = []
+    async for doc in cursor:
+        doc["id"] = str(doc.pop("_id"))
+        results.append(doc)
+    return results
+
+
+async def iter_items(
+    db: AsyncIOMotorDatabase,
+    flt: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, Any]] = None,
+    batch_size: int = 1000,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Stream items matching `flt` in `_id` order without loading them all: the Motor
+    cursor fetches `batch_size` documents per round trip and only `projection`'s
+    fields are sent over the wire.
+
+    :param db: The async MongoDB database handle
+    :type db: AsyncIOMotorDatabase
+    :param flt: Mongo filter (all items if omitted)
+    :type flt: Optional[Dict[str, Any]]
+    :param projection: Fields to return (all if omitted)
+    :type projection: Optional[Dict[str, Any]]
+    :param batch_size: Documents fetched per cursor batch
+    :type batch_size: int
+    :return: An async generator of item dicts with "id" set instead of "_id".
+    """
+    cursor = db.items.find(flt or {}, projection).sort("_id", 1).batch_size(batch_size)
+    try:
+        async for doc in cursor:
+            doc["id"] = str(doc.pop("_id"))
+            yield doc
+    finally:
+        await cursor.close()
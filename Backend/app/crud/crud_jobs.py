@@ -0,0 +1,69 @@
+# app/crud/crud_jobs.py
+
+from bson import ObjectId
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+
+def _job_out(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc["id"] = str(doc.pop("_id"))
+    for key in ("created_at", "updated_at", "finished_at"):
+        value = doc.get(key)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            doc[key] = value.replace(tzinfo=timezone.utc)
+    return doc
+
+
+async def create_job(db: AsyncIOMotorDatabase, job_type: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Insert a new background job document in the "queued" state.
+
+    :param db: The async MongoDB database handle
+    :type db: AsyncIOMotorDatabase
+    :param job_type: The kind of job, e.g. "pdf_ingest"
+    :type job_type: str
+    :param fields: Job specific fields (file id, filename, ...)
+    :type fields: Dict[str, Any]
+    :return: The stored job with "_id" replaced by a string "id".
+    """
+    now = datetime.now(timezone.utc)
+    job = {
+        "type": job_type,
+        "status": "queued",
+        "pages_total": None,
+        "pages_processed": 0,
+        "items_inserted": 0,
+        "errors": [],
+        "created_at": now,
+        "updated_at": now,
+        **fields,
+    }
+    try:
+        res = await db.jobs.insert_one(job)
+    except PyMongoError as e:
+        raise RuntimeError(f"DB insert failed: {e}") from e
+    job["_id"] = res.inserted_id
+    return _job_out(job)
+
+
+async def get_job(db: AsyncIOMotorDatabase, job_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a job by id; returns None for unknown or malformed ids."""
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        return None
+    doc = await db.jobs.find_one({"_id": oid})
+    if not doc:
+        return None
+    return _job_out(doc)
+
+
+async def update_job_fields(db: AsyncIOMotorDatabase, job_id: str, fields: Dict[str, Any]) -> bool:
+    try:
+        oid = ObjectId(job_id)
+    except Exception:
+        return False
+    res = await db.jobs.update_one({"_id": oid}, {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}})
+    return res.modified_count > 0
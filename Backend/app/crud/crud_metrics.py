@@ -0,0 +1,40 @@
+# app/crud/crud_metrics.py
+
+import os
+from typing import Optional, List, Dict, Any
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+# Task timing records expire this many days after the task started (TTL index)
+TASK_METRICS_TTL_DAYS = float(os.getenv("TASK_METRICS_TTL_DAYS", "14"))
+
+
+async def ensure_metrics_indexes(db: AsyncIOMotorDatabase):
+    """
+    Create the TTL index that expires old `task_metrics` records, so the
+    collection stays bounded; the percentiles only ever look at recent runs.
+    An existing TTL index is updated if TASK_METRICS_TTL_DAYS changed.
+    """
+    ttl = int(TASK_METRICS_TTL_DAYS * 86400)
+    try:
+        await db.task_metrics.create_index("started_at", name="task_metrics_ttl", expireAfterSeconds=ttl)
+    except Exception:
+        # index exists with another expireAfterSeconds: change it in place
+        await db.command("collMod", "task_metrics",
+                         index={"name": "task_metrics_ttl", "expireAfterSeconds": ttl})
+
+
+async def get_recent_task_metrics(db: AsyncIOMotorDatabase, task: Optional[str] = None, limit: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Fetch the most recent task timing records written by the Celery workers.
+
+    :param db: The async MongoDB database handle
+    :type db: AsyncIOMotorDatabase
+    :param task: Optional task name (e.g. "process_image") to restrict the records to
+    :type task: Optional[str]
+    :param limit: Maximum number of records to return, newest first
+    :type limit: int
+    :return: A list of raw timing records with the "_id" field removed.
+    """
+    query = {"task": task} if task else {}
+    cursor = db.task_metrics.find(query, {"_id": 0}).sort("started_at", -1).limit(limit)
+    return await cursor.to_list(length=limit)
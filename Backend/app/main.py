@@ -1,9 +1,14 @@
 # app/main.py
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 from app.core import db
-from app.routers import items
+from app.routers import items, admin, jobs
+from app.utils.status_events import status_broker
+from app.crud.crud_items import ensure_item_indexes
+from app.crud.crud_metrics import ensure_metrics_indexes
+from app.utils.pdf_handler import shutdown_extract_pool
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -16,13 +21,28 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print("MongoDB connection error on startup:", e)
         raise
+    try:
+        await ensure_item_indexes(db.getdb())
+    except Exception as e:
+        # search answers 503 until the index exists; don't block startup on it
+        print("Failed to create item indexes:", e)
+    try:
+        await ensure_metrics_indexes(db.getdb())
+    except Exception as e:
+        print("Failed to create task_metrics TTL index:", e)
+    # one status-event tailer per process feeds all SSE/WebSocket subscribers
+    status_broker.start()
     try:
         yield
     finally:
-        # shutdown: close the client
+        # shutdown: stop the tailer and the PDF extraction pool, close the client
+        await status_broker.stop()
+        await run_in_threadpool(shutdown_extract_pool)
         client.close()
         print("MongoDB client closed")
 
 app = FastAPI(title="FastAPI + MongoDB (GridFS)", lifespan=lifespan)
 
 app.include_router(items.router)
+app.include_router(admin.router)
+app.include_router(jobs.router)
@@ -18,4 +18,35 @@ class ItemIn(BaseModel):
 class ItemOut(ItemIn):
     id: str
     image_id: Optional[str] = None
-    created_at: datetime = Field(..., example="2025-11-21T12:34:56+00:00")
\ No newline at end of file
+    created_at: datetime = Field(..., example="2025-11-21T12:34:56+00:00")
+    task_id: Optional[str] = None
+    processing_status: Optional[str] = None
+    processing_error: Optional[str] = None
+    thumbnail_id: Optional[str] = None
+    timings: Optional[dict] = None
+    duplicate_of: Optional[str] = None
+    duplicate_score: Optional[float] = None
+
+# `ItemSearchHit` is an item returned by full-text search, with its relevance score.
+class ItemSearchHit(ItemOut):
+    score: float
+
+# `JobOut` describes a background job (e.g. an asynchronous PDF ingest) and its progress.
+class JobOut(BaseModel):
+    id: str
+    type: str
+    status: str
+    filename: Optional[str] = None
+    file_id: Optional[str] = None
+    task_id: Optional[str] = None
+    pages_total: Optional[int] = None
+    pages_processed: int = 0
+    items_inserted: int = 0
+    duplicates_skipped: int = 0
+    errors: list[str] = []
+    skip_duplicates: bool = False
+    duplicate_item_ids: Optional[list[str]] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    timings: Optional[dict] = None
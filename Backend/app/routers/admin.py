@@ -0,0 +1,45 @@
+# app/routers/admin.py
+# operational endpoints (task timings etc.), kept apart from the item API
+
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.db import get_db_dep
+from app.crud.crud_metrics import get_recent_task_metrics
+from app.utils.task_metrics import summarize_task_metrics
+from app.utils.admission import admission
+from app.utils.dedup_index import dedup_index
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/task-metrics")
+async def task_metrics_endpoint(
+    task: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: AsyncIOMotorDatabase = Depends(get_db_dep),
+):
+    """
+    Aggregate the most recent Celery task timings into p50/p90/p99 per task,
+    covering queue wait, total run time and each recorded stage.
+    """
+    records = await get_recent_task_metrics(db, task=task, limit=limit)
+    return {"sampled": len(records), "tasks": summarize_task_metrics(records)}
+
+
+@router.get("/queue")
+async def queue_status_endpoint():
+    """
+    Current broker queue depth against the high-water mark, the admission
+    policy each route applies once the mark is reached, and how many jobs this
+    process is still coalescing onto.
+    """
+    await admission.depth()
+    await admission.refresh_pending()
+    return admission.snapshot()
+
+
+@router.get("/dedup")
+async def dedup_status_endpoint():
+    """Near-duplicate index settings and size for this API process."""
+    return dedup_index.stats()
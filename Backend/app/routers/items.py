@@ -2,22 +2,59 @@
 # mainly for createing the basic fast api endpoints for file modularity its been shifter to items.py
 
 # app/routers/items.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Response, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from pymongo.errors import OperationFailure
 from typing import Optional
 from app.core.db import get_db_dep, get_gridfs_bucket
-from app.models.schemas import ItemIn, ItemOut
-from app.crud.crud_items import Create_item, save_image, get_latest_image_meta, open_image_stream, update_item_fields
+from app.models.schemas import ItemIn, ItemOut, ItemSearchHit, JobOut
+from app.crud.crud_items import Create_item, Create_items, save_image, get_latest_image_meta, open_image_stream, update_item_fields
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 from app.Celery.image_tasks import process_image
+from app.Celery.pdf_tasks import ingest_pdf
+import csv
+import io
 import json
+import time
+import asyncio
+import os
+from itertools import islice
+from datetime import datetime
+from bson import ObjectId
 from typing import List
-from app.utils.pdf_handler import parse_pdf_test_cases
+from app.utils.parse_cache import iter_test_cases_cached, content_digest
 from app.utils.cache_manager import cache_manager
-from app.crud.crud_items import Get_item
+from app.crud.crud_items import Get_item, Get_items, get_pdf_upload, record_pdf_upload, search_items, iter_items
+from app.crud.crud_jobs import create_job, update_job_fields
+from app.utils.status_events import status_broker, publish_status, is_terminal, format_sse
+from app.utils.admission import admission, ENQUEUE, REJECT, DEGRADE, COALESCED, RETRY_AFTER_SECONDS
+from app.utils.dedup_index import dedup_index
+
+# How often an idle event stream sends a keepalive
+EVENTS_KEEPALIVE_SECONDS = 15
+# Test cases inserted per insert_many during PDF ingestion
+PDF_INSERT_BATCH_SIZE = int(os.getenv("PDF_INSERT_BATCH_SIZE", "50"))
+# Export: documents per Motor cursor batch, rows per chunk written to the response
+EXPORT_BATCH_SIZE = int(os.getenv("ITEMS_EXPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_ROWS = int(os.getenv("ITEMS_EXPORT_CHUNK_ROWS", "500"))
+EXPORT_FIELDS = (
+    "id", "title", "type", "description", "expected_result", "steps", "metadata",
+    "image_id", "thumbnail_id", "processing_status", "duplicate_of", "created_at",
+)
+# Default for `skip_duplicates` on PDF uploads
+PDF_SKIP_DUPLICATE_UPLOADS = os.getenv("PDF_SKIP_DUPLICATE_UPLOADS", "0") == "1"
 
 router = APIRouter(prefix="/items", tags=["items"])
 
+
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Background queue is full, retry later",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
 @router.post("/", response_model=ItemOut)
 async def create_item_endpoint(
     title: str = Form(...),
@@ -64,6 +101,11 @@ async def create_item_endpoint(
     saved in the database after creating a new item. The `ItemOut` object likely contains information
     about the newly created item, such as its title, description, metadata, and image ID.
     """
+    # admission control first, so a rejected request does no work at all
+    decision = await admission.admit("create_item")
+    if decision == REJECT:
+        raise _queue_full()
+
     # build json document
     item_data = {
         "title": title,
@@ -86,6 +128,17 @@ async def create_item_endpoint(
         except Exception:
             item_data["metadata"] = {"raw": metadata}
 
+    # near-duplicate check (DEDUP_MODE): skip returns the existing item, link marks this one
+    if dedup_index.enabled:
+        await dedup_index.refresh(db)
+        match = dedup_index.find(item_data)
+        if match and dedup_index.mode == "skip":
+            existing = await Get_item(db, match[0])
+            if existing:
+                return ItemOut(**existing)
+        if match:
+            item_data["duplicate_of"], item_data["duplicate_score"] = match[0], round(match[1], 3)
+
     # save image first (if present)
     image_id = None
     if image:
@@ -98,20 +151,31 @@ async def create_item_endpoint(
     # create DB document (ensure Create_item in crud sets created_at)
     saved = await Create_item(db, item_data)
 
-    # enqueue Celery task (fire-and-forget)
-    try:
-        async_result = process_image.delay(saved["id"])
-        # store task id and status optionally
-        if async_result and async_result.id:
-            task_id = async_result.id
-            status = "queued"
-            await update_item_fields(db, saved["id"], {"task_id": task_id, "processing_status": status})
-            # Sync local dict for immediate caching
-            saved["task_id"] = task_id
+    if decision == DEGRADE:
+        # queue is above the high-water mark: keep the item, skip the thumbnail
+        status = "skipped"
+        await update_item_fields(db, saved["id"], {"processing_status": status})
+        saved["processing_status"] = status
+    else:
+        # enqueue Celery task (fire-and-forget)
+        try:
+            async_result = process_image.delay(saved["id"], enqueued_at=time.time())
+            # store task id and status optionally
+            if async_result and async_result.id:
+                task_id = async_result.id
+                status = "queued"
+                await update_item_fields(db, saved["id"], {"task_id": task_id, "processing_status": status})
+                # Sync local dict for immediate caching
+                saved["task_id"] = task_id
+                saved["processing_status"] = status
+                publish_status(saved["id"], status, task_id=task_id)
+        except Exception as e:
+            # record the enqueue error on the item but don't fail the request
+            print("Failed to enqueue image processing task:", e)
+            status = "enqueue_failed"
+            await update_item_fields(db, saved["id"], {"processing_status": status, "processing_error": str(e)})
             saved["processing_status"] = status
-    except Exception as e:
-        # log enqueue error but don't fail the request
-        print("Failed to enqueue image processing task:", e)
+            saved["processing_error"] = str(e)
 
     # Initial cache (will be invalidated later by Celery task completion)
     cache_manager.set_item(saved["id"], saved)
@@ -166,39 +230,255 @@ async def get_cache(key: str):
 
 @router.post("/cache/compute/{key}")
 async def compute_cache(key: str, value: str = Form(...)):
+    coalesce_key = f"cache_task:{key}:{value}"
+    decision = await admission.admit("compute_cache", coalesce_key=coalesce_key)
+    if decision == COALESCED:
+        return {"key": key, "task_id": admission.tracked_task(coalesce_key), "status": "Already processing"}
+    if decision in (REJECT, DEGRADE):
+        # the task is the whole request, so there is nothing to degrade to
+        raise _queue_full()
+
     # Trigger Celery task
-    task = cache_task.delay(key, value)
+    try:
+        task = cache_task.delay(key, value, enqueued_at=time.time())
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"Failed to enqueue task: {e}")
+    admission.track(coalesce_key, task.id)
     return {"key": key, "task_id": task.id, "status": "Processing triggered"}
 
+def _next_batch(iterator, size: int) -> List[dict]:
+    return list(islice(iterator, size))
+
+
 @router.post("/upload-pdf", response_model=List[ItemOut])
 async def upload_pdf_endpoint(
     file: UploadFile = File(...),
-    db: AsyncIOMotorDatabase = Depends(get_db_dep)
+    stream: bool = Query(False, description="Stream saved items back as NDJSON while the PDF is processed"),
+    async_: bool = Query(False, alias="async", description="Store the PDF and ingest it in a background job"),
+    skip_duplicates: bool = Query(
+        PDF_SKIP_DUPLICATE_UPLOADS,
+        description="If this exact file was ingested before, return its items instead of inserting them again",
+    ),
+    db: AsyncIOMotorDatabase = Depends(get_db_dep),
+    fs: AsyncIOMotorGridFSBucket = Depends(get_gridfs_bucket),
 ):
     """
     Upload a PDF file containing test cases in JSON-like blocks.
     The parser will extract the test cases, classify them, and save them to the database.
+
+    Test cases are parsed incrementally and inserted in batches of `PDF_INSERT_BATCH_SIZE`.
+    With `stream=true` each saved item is written back as one NDJSON line as soon as its
+    batch is stored, instead of one JSON array at the end.
+
+    With `async=true` nothing is parsed in the API: the PDF is stored in GridFS, an
+    ingest job is queued and `202` is returned with the job; poll `GET /jobs/{id}`.
+
+    Parsed results are cached by content hash, so re-uploading a known file skips parsing.
+    With `skip_duplicates=true` a known file is not inserted again either: the items from
+    its earlier ingestion are returned. Individual test cases that are near-duplicates of
+    stored ones are skipped or linked via `duplicate_of` according to DEDUP_MODE.
     """
     if file.content_type != "application/pdf" and not file.filename.endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Only PDF files allowed")
+
+    if async_:
+        if await admission.admit("ingest_pdf") != ENQUEUE:
+            raise _queue_full()
+        contents = await file.read()
+        # save_image is a plain GridFS upload, fine for any content type
+        file_id = await save_image(fs, contents, file.filename, "application/pdf")
+        job = await create_job(db, "pdf_ingest", {
+            "filename": file.filename,
+            "file_id": file_id,
+            "skip_duplicates": skip_duplicates,
+        })
+        try:
+            async_result = ingest_pdf.delay(job["id"], enqueued_at=time.time())
+        except Exception as e:
+            await update_job_fields(db, job["id"], {"status": "enqueue_failed", "errors": [str(e)]})
+            raise HTTPException(status_code=503, detail=f"Failed to enqueue ingest job: {e}")
+        await update_job_fields(db, job["id"], {"task_id": async_result.id})
+        job["task_id"] = async_result.id
+        return JSONResponse(status_code=202, content=JobOut(**job).model_dump(mode="json"))
     
+    contents = await file.read()
+    digest = content_digest(contents)
+
+    if skip_duplicates:
+        previous = await get_pdf_upload(db, digest)
+        if previous:
+            existing = [ItemOut(**item) for item in await Get_items(db, previous.get("item_ids", []))]
+            if stream:
+                return StreamingResponse(
+                    (item.model_dump_json() + "\n" for item in existing),
+                    media_type="application/x-ndjson",
+                )
+            return existing
+
+    cases = iter_test_cases_cached(contents, digest=digest)
+    inserted_ids: List[str] = []
+    dedup = {"skipped": 0}
+    await dedup_index.refresh(db)
+
+    async def next_batch() -> List[dict]:
+        while True:
+            # parsing is CPU-bound: advance the generator in the threadpool
+            batch = await run_in_threadpool(_next_batch, cases, PDF_INSERT_BATCH_SIZE)
+            if not batch:
+                return []
+            batch, skipped = dedup_index.screen(batch)
+            dedup["skipped"] += skipped
+            if batch:
+                break
+        saved = await Create_items(db, batch)
+        cache_manager.set_items(saved)
+        inserted_ids.extend(item["id"] for item in saved)
+        return saved
+
+    def close_cases():
+        # releases the PDF and any extraction work still queued for it
+        try:
+            cases.close()
+        except ValueError:
+            # still being advanced by a threadpool worker (client went away mid-batch)
+            pass
+
     try:
-        contents = await file.read()
-        test_cases = parse_pdf_test_cases(contents)
+        first = await next_batch()
     except Exception as e:
+        close_cases()
         raise HTTPException(status_code=500, detail=f"Error parsing PDF: {str(e)}")
         
-    if not test_cases:
-        raise HTTPException(status_code=404, detail="No valid test cases found in PDF")
-        
-    saved_items = []
-    for case in test_cases:
-        # Each case is already classified by parse_pdf_test_cases
-        saved = await Create_item(db, case)
-        cache_manager.set_item(saved["id"], saved)
-        saved_items.append(ItemOut(**saved))
-        
-    return saved_items
+    if not first:
+        close_cases()
+        if not dedup["skipped"]:
+            raise HTTPException(status_code=404, detail="No valid test cases found in PDF")
+        # every case was a near-duplicate of a stored one (DEDUP_MODE=skip): nothing
+        # to return, but the upload is still known and answered in the requested format
+        await record_pdf_upload(db, digest, file.filename, inserted_ids)
+        if stream:
+            return StreamingResponse(iter(()), media_type="application/x-ndjson")
+        return []
+
+    if not stream:
+        saved_items = [ItemOut(**saved) for saved in first]
+        try:
+            while batch := await next_batch():
+                saved_items.extend(ItemOut(**saved) for saved in batch)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error parsing PDF: {str(e)}")
+        finally:
+            close_cases()
+        await record_pdf_upload(db, digest, file.filename, inserted_ids)
+        return saved_items
+
+    async def ndjson_lines():
+        batch = first
+        try:
+            while batch:
+                for saved in batch:
+                    yield ItemOut(**saved).model_dump_json() + "\n"
+                batch = await next_batch()
+            await record_pdf_upload(db, digest, file.filename, inserted_ids)
+        except Exception as e:
+            # headers are already sent; report the failure in-band
+            yield json.dumps({"error": f"Error parsing PDF: {str(e)}"}) + "\n"
+        finally:
+            close_cases()
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@router.get("/search", response_model=List[ItemSearchHit])
+async def search_items_endpoint(
+    q: str = Query(..., min_length=1, max_length=500, description="Search terms (Mongo $text syntax)"),
+    type: Optional[str] = Query(None, description="Only return items of this type"),
+    limit: int = Query(20, ge=1, le=200),
+    skip: int = Query(0, ge=0, le=10_000),
+    db: AsyncIOMotorDatabase = Depends(get_db_dep),
+):
+    """
+    Ranked full-text search over title, description, expected_result and steps,
+    served by the weighted `items` text index (title counts the most).
+    """
+    try:
+        hits = await search_items(db, q, item_type=type, limit=limit, skip=skip)
+    except OperationFailure as e:
+        # typically the text index is missing (it is created on startup)
+        raise HTTPException(status_code=503, detail=f"Search unavailable: {e}")
+    return [ItemSearchHit(**hit) for hit in hits]
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+
+def _csv_cell(value):
+    value = _export_value(value)
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+
+async def _export_chunks(rows, fmt: str):
+    """Serialize rows incrementally, EXPORT_CHUNK_ROWS at a time."""
+    buf = io.StringIO()
+    writer = csv.writer(buf) if fmt == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_FIELDS)
+    count = 0
+    async for doc in rows:
+        if writer:
+            writer.writerow([_csv_cell(doc.get(f)) for f in EXPORT_FIELDS])
+        else:
+            row = {f: _export_value(doc.get(f)) for f in EXPORT_FIELDS if doc.get(f) is not None}
+            buf.write(json.dumps(row, default=str, ensure_ascii=False))
+            buf.write("\n")
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+@router.get("/export")
+async def export_items_endpoint(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    type: Optional[str] = Query(None, description="Only export items of this type"),
+    created_after: Optional[datetime] = Query(None),
+    created_before: Optional[datetime] = Query(None),
+    db: AsyncIOMotorDatabase = Depends(get_db_dep),
+):
+    """
+    Stream all items (or the filtered subset) as NDJSON or CSV. Documents are read
+    through a batched cursor and written out as they arrive, so memory use does
+    not depend on how many items are exported. List and object fields (steps,
+    metadata) are JSON-encoded in CSV cells.
+    """
+    flt: dict = {}
+    if type:
+        flt["type"] = type
+    if created_after or created_before:
+        flt["created_at"] = {}
+        if created_after:
+            flt["created_at"]["$gte"] = created_after
+        if created_before:
+            flt["created_at"]["$lt"] = created_before
+    projection = {f: 1 for f in EXPORT_FIELDS if f != "id"}
+    rows = iter_items(db, flt, projection, batch_size=EXPORT_BATCH_SIZE)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"items.{format}"
+    return StreamingResponse(
+        _export_chunks(rows, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.get("/{item_id}", response_model=ItemOut)
 async def get_item_endpoint(
@@ -223,4 +503,95 @@ async def get_item_endpoint(
         
     # Store in cache for next time
     cache_manager.set_item(item_id, item)
-    return ItemOut(**item)
\ No newline at end of file
+    return ItemOut(**item)
+
+
+def _status_snapshot(item_id: str, item: dict) -> dict:
+    return {
+        "item_id": item_id,
+        "status": item.get("processing_status"),
+        "thumbnail_id": item.get("thumbnail_id"),
+        "processing_error": item.get("processing_error"),
+    }
+
+
+@router.get("/{item_id}/events")
+async def item_events_endpoint(
+    item_id: str,
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db_dep)
+):
+    """
+    Server-Sent Events stream of processing_status transitions for an item.
+    The current status is sent first; the stream ends once a terminal status
+    (anything other than queued/processing) has been delivered.
+    """
+    # subscribe before reading the current state so no transition falls in between
+    queue = status_broker.subscribe(item_id)
+    item = await Get_item(db, item_id)
+    if not item:
+        status_broker.unsubscribe(item_id, queue)
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    async def event_stream():
+        try:
+            snapshot = _status_snapshot(item_id, item)
+            yield format_sse(snapshot)
+            if is_terminal(snapshot["status"]):
+                return
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+                if is_terminal(event.get("status")):
+                    break
+        finally:
+            status_broker.unsubscribe(item_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{item_id}/ws")
+async def item_status_websocket(
+    websocket: WebSocket,
+    item_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db_dep)
+):
+    """
+    WebSocket variant of `/items/{item_id}/events`: sends the current status,
+    then one JSON message per transition, and closes after a terminal status.
+    """
+    await websocket.accept()
+    queue = status_broker.subscribe(item_id)
+    try:
+        item = await Get_item(db, item_id)
+        if not item:
+            await websocket.send_json({"item_id": item_id, "error": "Item not found"})
+            await websocket.close(code=4404)
+            return
+        snapshot = _status_snapshot(item_id, item)
+        await websocket.send_json(snapshot)
+        if is_terminal(snapshot["status"]):
+            await websocket.close()
+            return
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.send_json({"item_id": item_id, "type": "keepalive"})
+                continue
+            await websocket.send_json(event)
+            if is_terminal(event.get("status")):
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+    finally:
+        status_broker.unsubscribe(item_id, queue)
@@ -0,0 +1,25 @@
+# app/routers/jobs.py
+# status of background jobs (asynchronous PDF ingestion)
+
+from fastapi import APIRouter, Depends, HTTPException
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from app.core.db import get_db_dep
+from app.crud.crud_jobs import get_job
+from app.models.schemas import JobOut
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job_endpoint(
+    job_id: str,
+    db: AsyncIOMotorDatabase = Depends(get_db_dep)
+):
+    """
+    Report a background job's status and progress: pages processed out of
+    pages_total, items inserted so far and any errors collected on the way.
+    """
+    job = await get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobOut(**job)
@@ -0,0 +1,192 @@
+# app/utils/admission.py
+#
+# Admission control for Celery enqueues. Routes ask the controller before calling
+# `.delay()`; once the broker queue is above the high-water mark each route applies
+# its own policy instead of letting the backlog (and end-to-end latency) grow
+# without limit:
+#   reject   -> the route answers 429 with Retry-After
+#   degrade  -> the route does the request without the background work
+#   coalesce -> an identical job that is still pending is reused; otherwise 429
+#
+# Coalesce keys are stored hashed and the map is bounded (COALESCE_TTL seconds per
+# entry, at most COALESCE_MAX_KEYS entries, oldest dropped first): keys can carry
+# client-supplied values, so they must not be able to grow process memory.
+import os
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+from fastapi.concurrency import run_in_threadpool
+
+QUEUE_NAME = os.getenv("CELERY_QUEUE_NAME", "celery")
+QUEUE_HIGH_WATER = int(os.getenv("QUEUE_HIGH_WATER", "500"))
+# How long a depth reading is reused; keeps broker round trips off the hot path
+QUEUE_DEPTH_TTL = float(os.getenv("QUEUE_DEPTH_TTL", "1.0"))
+RETRY_AFTER_SECONDS = int(os.getenv("QUEUE_RETRY_AFTER", "5"))
+# Jobs tracked for coalescing are forgotten after this long or past this many
+COALESCE_TTL = float(os.getenv("COALESCE_TTL", "900"))
+COALESCE_MAX_KEYS = int(os.getenv("COALESCE_MAX_KEYS", "1000"))
+
+POLICIES = ("reject", "degrade", "coalesce")
+ROUTE_POLICIES = {
+    "create_item": os.getenv("ADMISSION_POLICY_CREATE_ITEM", "degrade"),
+    "compute_cache": os.getenv("ADMISSION_POLICY_COMPUTE_CACHE", "coalesce"),
+    "ingest_pdf": os.getenv("ADMISSION_POLICY_INGEST_PDF", "reject"),
+}
+
+# Decisions returned by `AdmissionController.admit`
+ENQUEUE = "enqueue"
+REJECT = "reject"
+DEGRADE = "degrade"
+COALESCED = "coalesced"
+
+PENDING_STATES = ("PENDING", "RECEIVED", "STARTED", "RETRY")
+
+
+class AdmissionController:
+    def __init__(self, queue_name: str = QUEUE_NAME, high_water: int = QUEUE_HIGH_WATER, ttl: float = QUEUE_DEPTH_TTL,
+                 coalesce_ttl: float = COALESCE_TTL, coalesce_max_keys: int = COALESCE_MAX_KEYS):
+        self.queue_name = queue_name
+        self.high_water = high_water
+        self.ttl = ttl
+        self.coalesce_ttl = coalesce_ttl
+        self.coalesce_max_keys = coalesce_max_keys
+        self.policies = dict(ROUTE_POLICIES)
+        self._depth: Optional[int] = None
+        self._measured_at = 0.0
+        self._last_error: Optional[str] = None
+        self._lock = asyncio.Lock()
+        # sha256 of coalesce key -> (task id, tracked at) of a job this process
+        # enqueued, oldest first
+        self._pending: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def _measure_depth(self) -> int:
+        # imported here so importing this module never touches Celery/broker config
+        from app.Celery.Celery_worker import celery
+        with celery.connection_for_read() as conn:
+            ok = conn.default_channel.queue_declare(queue=self.queue_name, passive=True)
+            return ok.message_count
+
+    async def depth(self) -> Optional[int]:
+        """
+        Messages waiting in the broker queue (not counting ones already prefetched
+        by workers). Readings are cached for `ttl` seconds and only one request at a
+        time measures; `None` means the broker could not be asked.
+        """
+        if time.monotonic() - self._measured_at < self.ttl:
+            return self._depth
+        async with self._lock:
+            if time.monotonic() - self._measured_at < self.ttl:
+                return self._depth
+            try:
+                self._depth = await run_in_threadpool(self._measure_depth)
+                self._last_error = None
+            except Exception as e:
+                self._depth = None
+                self._last_error = str(e)
+            self._measured_at = time.monotonic()
+            return self._depth
+
+    async def is_saturated(self) -> bool:
+        depth = await self.depth()
+        # fail open: if the broker can't be asked, the enqueue itself will report it
+        return depth is not None and depth >= self.high_water
+
+    def _task_state(self, task_id: str) -> str:
+        from app.Celery.Celery_worker import celery
+        return celery.AsyncResult(task_id).state
+
+    @staticmethod
+    def _digest(coalesce_key: str) -> str:
+        return hashlib.sha256(coalesce_key.encode("utf-8")).hexdigest()
+
+    def _prune(self):
+        """Drop entries past COALESCE_TTL, then the oldest past COALESCE_MAX_KEYS."""
+        cutoff = time.monotonic() - self.coalesce_ttl
+        while self._pending:
+            _, tracked_at = next(iter(self._pending.values()))
+            if tracked_at >= cutoff and len(self._pending) <= self.coalesce_max_keys:
+                break
+            self._pending.popitem(last=False)
+
+    def _forget(self, digest: str, task_id: str):
+        entry = self._pending.get(digest)
+        if entry is not None and entry[0] == task_id:
+            del self._pending[digest]
+
+    async def pending_task(self, coalesce_key: str) -> Optional[str]:
+        """
+        Task id of a still-pending job enqueued under `coalesce_key`, if any. The
+        state lookup is a result-backend round trip, so it runs in the threadpool.
+        """
+        task_id = self.tracked_task(coalesce_key)
+        if task_id is None:
+            return None
+        if await run_in_threadpool(self._task_state, task_id) in PENDING_STATES:
+            return task_id
+        self._forget(self._digest(coalesce_key), task_id)
+        return None
+
+    def tracked_task(self, coalesce_key: str) -> Optional[str]:
+        """Task id last tracked under `coalesce_key` (no state check)."""
+        self._prune()
+        entry = self._pending.get(self._digest(coalesce_key))
+        return entry[0] if entry else None
+
+    def track(self, coalesce_key: str, task_id: str):
+        digest = self._digest(coalesce_key)
+        self._pending[digest] = (task_id, time.monotonic())
+        self._pending.move_to_end(digest)
+        self._prune()
+
+    def _finished(self, entries) -> list:
+        return [(digest, task_id) for digest, task_id in entries
+                if self._task_state(task_id) not in PENDING_STATES]
+
+    async def refresh_pending(self):
+        """
+        Forget tracked jobs that have finished, so `snapshot()["coalescing"]`
+        counts only in-flight ones. One state lookup per entry, in the threadpool.
+        """
+        self._prune()
+        entries = [(digest, task_id) for digest, (task_id, _) in self._pending.items()]
+        if not entries:
+            return
+        try:
+            finished = await run_in_threadpool(self._finished, entries)
+        except Exception as e:
+            self._last_error = str(e)
+            return
+        for digest, task_id in finished:
+            self._forget(digest, task_id)
+
+    async def admit(self, route: str, coalesce_key: Optional[str] = None) -> str:
+        """
+        Decide what a route should do with its next enqueue. Returns one of
+        ENQUEUE, REJECT, DEGRADE or COALESCED.
+        """
+        policy = self.policies.get(route, "reject")
+        if policy == "coalesce" and coalesce_key and await self.pending_task(coalesce_key):
+            return COALESCED
+        if not await self.is_saturated():
+            return ENQUEUE
+        if policy == "degrade":
+            return DEGRADE
+        return REJECT
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._prune()
+        return {
+            "queue": self.queue_name,
+            "depth": self._depth,
+            "high_water": self.high_water,
+            "saturated": self._depth is not None and self._depth >= self.high_water,
+            "age_seconds": round(time.monotonic() - self._measured_at, 3) if self._measured_at else None,
+            "error": self._last_error,
+            "policies": self.policies,
+            "coalescing": len(self._pending),
+        }
+
+
+admission = AdmissionController()
@@ -22,6 +22,13 @@ class CacheManager:
         # ItemOut objects handled by pydantic's model_dump/json
         self.redis.setex(f"item:{item_id}", self.ttl, json.dumps(item_data, default=str))
 
+    def set_items(self, items: list):
+        """Store a batch of items (each with an "id") in cache in one write."""
+        self.redis.setex_many(
+            [(f"item:{item['id']}", json.dumps(item, default=str)) for item in items],
+            self.ttl,
+        )
+
     def invalidate_item(self, item_id: str):
         """Remove an item from cache."""
         self.redis.delete(f"item:{item_id}")
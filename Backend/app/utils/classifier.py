@@ -0,0 +1,123 @@
+# app/utils/classifier.py
+#
+# Keyword classifier for test cases that arrive without a usable 'type'.
+#
+# Behaviour change from the previous classifier, which only knew positive and
+# negative: 'edge' is now a class of its own. Untyped cases matching an edge
+# indicator become 'edge', and a case that already says "type": "edge" keeps it
+# (before, it was reclassified and usually ended up 'positive'). On
+# inputs/output-vinay.pdf that turns 3 cases from positive into edge.
+# CLASSIFIER_EDGE_CLASS=0 restores the previous positive/negative mapping exactly;
+# verify_classifier.py checks both.
+#
+# Indicator sets are normalised once when the classifier is built (lowercased,
+# de-duplicated, and indicators that contain a shorter indicator of the same set
+# dropped, since they can never change the outcome). Matching uses plain substring
+# search, which measured faster than a `re` alternation of the same indicators.
+# It is not faster than the old negative-only check: with the same indicators it
+# runs at about 0.8x its throughput, and about 0.6x with the edge set added (see
+# benchmarks/bench_classifier.py).
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+TYPES = ("positive", "negative", "edge")
+LEGACY_TYPES = ("positive", "negative")
+
+# 0: previous behaviour, no edge class (an existing "edge" type is reclassified)
+CLASSIFIER_EDGE_CLASS = os.getenv("CLASSIFIER_EDGE_CLASS", "1") != "0"
+
+DEFAULT_NEGATIVE_INDICATORS = (
+    "error", "fail", "invalid", "negative", "404", "500",
+    "exception", "unauthorized", "malformed", "wrong", "broken",
+)
+DEFAULT_EDGE_INDICATORS = (
+    "edge", "boundary", "maximum", "minimum", "max length", "min length",
+    "limit", "empty", "zero", "overflow", "extremely", "special character",
+)
+DEFAULT_FIELDS = ("title", "description", "expected_result")
+
+
+def _env_indicators(name: str, default: Sequence[str]) -> Sequence[str]:
+    # comma separated override, e.g. CLASSIFIER_EDGE_INDICATORS="edge,boundary,limit"
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    return tuple(word.strip() for word in raw.split(",") if word.strip())
+
+
+NEGATIVE_INDICATORS = _env_indicators("CLASSIFIER_NEGATIVE_INDICATORS", DEFAULT_NEGATIVE_INDICATORS)
+EDGE_INDICATORS = _env_indicators("CLASSIFIER_EDGE_INDICATORS", DEFAULT_EDGE_INDICATORS)
+
+
+def compile_indicators(indicators: Iterable[str]) -> Tuple[str, ...]:
+    """Lowercase, de-duplicate and drop indicators made redundant by a shorter one."""
+    kept: List[str] = []
+    for word in sorted({w.strip().lower() for w in indicators if w and w.strip()}, key=len):
+        if not any(shorter in word for shorter in kept):
+            kept.append(word)
+    return tuple(kept)
+
+
+class TestCaseClassifier:
+    """
+    Classifies test cases as 'negative', 'edge' or 'positive'.
+
+    An item whose 'type' is already one of TYPES keeps it. Otherwise any negative
+    indicator in its text makes it negative, then any edge indicator makes it edge,
+    and everything else is positive. Indicators are case-insensitive substrings.
+    With `edge_class=False` there is no edge class: only positive/negative types
+    are kept and edge indicators are ignored, as in the previous classifier.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(
+        self,
+        negative: Iterable[str] = NEGATIVE_INDICATORS,
+        edge: Iterable[str] = EDGE_INDICATORS,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        edge_class: bool = CLASSIFIER_EDGE_CLASS,
+    ):
+        self.fields = tuple(fields)
+        self.edge_class = edge_class
+        self.types = TYPES if edge_class else LEGACY_TYPES
+        if not edge_class:
+            edge = ()
+        # checked in order; the first class with a match wins
+        self.rules: Tuple[Tuple[str, Tuple[str, ...]], ...] = tuple(
+            (label, words)
+            for label, words in (("negative", compile_indicators(negative)), ("edge", compile_indicators(edge)))
+            if words
+        )
+
+    def _text(self, item: Dict) -> str:
+        get = item.get
+        try:
+            return " ".join([get(f) or "" for f in self.fields]).lower()
+        except TypeError:
+            # a non-string field value
+            return " ".join([str(get(f) or "") for f in self.fields]).lower()
+
+    def _given_type(self, item: Dict) -> Optional[str]:
+        current = item.get("type")
+        if not isinstance(current, str):
+            return None
+        current = current.lower()
+        return current if current in self.types else None
+
+    def classify(self, item: Dict) -> str:
+        given = self._given_type(item)
+        if given:
+            return given
+        contains = self._text(item).__contains__
+        for label, words in self.rules:
+            if any(map(contains, words)):
+                return label
+        return "positive"
+
+    def classify_batch(self, items: Iterable[Dict]) -> List[str]:
+        """Types for `items`, in order (`classify` applied to each item)."""
+        return list(map(self.classify, items))
+
+
+default_classifier = TestCaseClassifier()
@@ -0,0 +1,276 @@
+# app/utils/dedup_index.py
+#
+# Near-duplicate detection for test cases with MinHash + LSH banding.
+#
+# Each item's title, description and steps are reduced to word 3-gram shingles and
+# a NUM_PERM-value MinHash signature. The signature is split into BANDS bands; items
+# that agree on a whole band land in the same bucket, so a lookup only compares
+# against the few items sharing a bucket instead of the whole collection. Candidates
+# are confirmed by the share of equal signature values (an estimate of the Jaccard
+# similarity of the shingle sets) against THRESHOLD.
+#
+# The index lives in process memory. It is filled lazily from `items` on first use
+# and then kept current by `Create_item`/`Create_items` and by `refresh()`, which picks
+# up other processes' inserts by `created_at`: each refresh re-reads everything created
+# since the previous one started minus DEDUP_REFRESH_OVERLAP seconds, so an insert that
+# commits late (or with a slightly older ObjectId/clock) is still seen on a later pass.
+# Ids already indexed are skipped before hashing.
+#
+# Memory: the index is only built by processes that screen (the first `refresh()`
+# from item creation or a PDF ingest with DEDUP_MODE on), but each of those API
+# processes and Celery workers holds its own copy: about 1.7 KB per item with the
+# defaults (packed 64-bit signature plus a band-hash entry per band), so ~35 MB per
+# process at the default DEDUP_MAX_ITEMS of 20000. Past the cap the oldest items
+# are dropped first and duplicates of them are no longer caught.
+import asyncio
+import hashlib
+import os
+import random
+import re
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from bson import ObjectId
+from fastapi.concurrency import run_in_threadpool
+
+# off: no detection; link: insert and set `duplicate_of`; skip: don't insert duplicates
+DEDUP_MODE = os.getenv("DEDUP_MODE", "off").lower()
+DEDUP_MODES = ("off", "link", "skip")
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+SHINGLE_SIZE = 3
+LOAD_BATCH_SIZE = 1000
+# seconds of inserts each refresh re-reads from before the previous one
+DEDUP_REFRESH_OVERLAP = float(os.getenv("DEDUP_REFRESH_OVERLAP", "30"))
+# most items one process keeps indexed (oldest dropped first); 0 = no limit
+DEDUP_MAX_ITEMS = int(os.getenv("DEDUP_MAX_ITEMS", "20000"))
+
+_TOKEN_RE = re.compile(r"\w+")
+# fixed seed: signatures must not change between processes or restarts
+_MASKS = tuple(random.Random(0x5EED).getrandbits(64) for _ in range(NUM_PERM))
+_PROJECTION = {"title": 1, "description": 1, "steps": 1}
+
+Signature = Tuple[int, ...]
+
+
+def item_text(item: Dict) -> str:
+    """Normalised text the similarity is computed on: title, description and steps."""
+    steps = item.get("steps") or []
+    if isinstance(steps, str):
+        steps = [steps]
+    parts = [str(item.get("title") or ""), str(item.get("description") or "")]
+    parts.extend(str(step) for step in steps)
+    return " ".join(_TOKEN_RE.findall(" ".join(parts).lower()))
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+@lru_cache(maxsize=4096)
+def signature_for_text(text: str) -> Signature:
+    """
+    MinHash signature of the word shingles of `text`. Each "permutation" XORs the
+    64-bit shingle hashes with a random mask, so the inner min runs in C.
+    Cached: ingestion checks an item and then indexes it after the insert.
+    """
+    tokens = text.split()
+    if len(tokens) <= SHINGLE_SIZE:
+        hashes = [_hash64(text)]
+    else:
+        hashes = list({_hash64(" ".join(tokens[i:i + SHINGLE_SIZE])) for i in range(len(tokens) - SHINGLE_SIZE + 1)})
+    return tuple(min(map(mask.__xor__, hashes)) for mask in _MASKS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class DedupIndex:
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, bands: int = BANDS, mode: str = DEDUP_MODE,
+                 max_items: int = DEDUP_MAX_ITEMS, overlap: float = DEDUP_REFRESH_OVERLAP):
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"DEDUP_MODE must be one of {DEDUP_MODES}, got {mode!r}")
+        if NUM_PERM % bands:
+            raise ValueError("DEDUP_NUM_PERM must be a multiple of DEDUP_BANDS")
+        self.mode = mode
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.max_items = max_items
+        self.overlap = timedelta(seconds=overlap)
+        # band hash -> item id, or a list of ids once a second item shares the band
+        self._buckets: List[Dict[int, Union[str, List[str]]]] = [{} for _ in range(bands)]
+        # signatures packed as unsigned 64-bit arrays; insertion order is eviction order
+        self._signatures: Dict[str, array] = {}
+        self.evicted = 0
+        self._refreshed_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._refresh_lock: Optional[asyncio.Lock] = None
+        self.loaded = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _bands(self, sig) -> Iterable[Tuple[int, int]]:
+        # hash() of the band's bytes: in-process only, and a collision just adds a
+        # candidate that the similarity check rejects
+        raw = array("Q", sig).tobytes()
+        step = self.rows * 8
+        for band in range(self.bands):
+            yield band, hash(raw[band * step:(band + 1) * step])
+
+    def add(self, item_id: str, item: Dict):
+        """Index an inserted item (no-op until the index has been loaded)."""
+        if not self.loaded:
+            return
+        self._add(str(item_id), signature_for_text(item_text(item)))
+
+    def _add(self, item_id: str, sig: Signature):
+        with self._lock:
+            if item_id in self._signatures:
+                return
+            self._signatures[item_id] = array("Q", sig)
+            for band, key in self._bands(sig):
+                bucket = self._buckets[band].get(key)
+                if bucket is None:
+                    self._buckets[band][key] = item_id
+                elif isinstance(bucket, str):
+                    self._buckets[band][key] = [bucket, item_id]
+                else:
+                    bucket.append(item_id)
+            if self.max_items and len(self._signatures) > self.max_items:
+                self._evict(next(iter(self._signatures)))
+
+    def _evict(self, item_id: str):
+        sig = self._signatures.pop(item_id)
+        for band, key in self._bands(sig):
+            bucket = self._buckets[band][key]
+            if isinstance(bucket, str):
+                del self._buckets[band][key]
+                continue
+            bucket.remove(item_id)
+            if len(bucket) == 1:
+                self._buckets[band][key] = bucket[0]
+        self.evicted += 1
+
+    def _best(self, sig: Signature, pool: Iterable[Tuple[str, Signature]]) -> Optional[Tuple[str, float]]:
+        best: Optional[Tuple[str, float]] = None
+        for cid, other in pool:
+            score = similarity(sig, other)
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (cid, score)
+        return best
+
+    def _find(self, sig: Signature) -> Optional[Tuple[str, float]]:
+        candidates: Set[str] = set()
+        with self._lock:
+            for band, key in self._bands(sig):
+                bucket = self._buckets[band].get(key, ())
+                if isinstance(bucket, str):
+                    candidates.add(bucket)
+                else:
+                    candidates.update(bucket)
+            pool = [(cid, self._signatures[cid]) for cid in candidates]
+        return self._best(sig, pool)
+
+    def find(self, item: Dict) -> Optional[Tuple[str, float]]:
+        """Best indexed match above the threshold as (item_id, similarity), or None."""
+        return self._find(signature_for_text(item_text(item)))
+
+    def screen(self, items: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Apply the dedup mode to items about to be inserted. Returns the items to
+        insert and how many were skipped; in link mode duplicates are kept with
+        `duplicate_of`/`duplicate_score` set. Duplicates within `items` are caught
+        too: kept items get their `_id` assigned here so later ones can link to them.
+        """
+        if not self.enabled:
+            return items, 0
+        kept: List[Dict] = []
+        batch: Dict[str, Signature] = {}
+        skipped = 0
+        for item in items:
+            sig = signature_for_text(item_text(item))
+            match = self._find(sig) or self._best(sig, batch.items())
+            if match is not None:
+                if self.mode == "skip":
+                    skipped += 1
+                    continue
+                item["duplicate_of"], item["duplicate_score"] = match[0], round(match[1], 3)
+            item.setdefault("_id", ObjectId())
+            batch[str(item["_id"])] = sig
+            kept.append(item)
+        return kept, skipped
+
+    def _load_docs(self, docs: Iterable[Dict]):
+        for doc in docs:
+            item_id = str(doc["_id"])
+            # the overlap window re-reads recent inserts; don't hash them again
+            if item_id not in self._signatures:
+                self._add(item_id, signature_for_text(item_text(doc)))
+
+    def _new_docs_query(self) -> Tuple[Dict, datetime]:
+        """
+        Query for items created since the last refresh began, minus the overlap,
+        and the time to record for this refresh. The first refresh reads everything.
+        """
+        started = datetime.now(timezone.utc)
+        if self._refreshed_at is None:
+            return {}, started
+        return {"created_at": {"$gte": self._refreshed_at - self.overlap}}, started
+
+    async def refresh(self, db):
+        """Load items inserted since the last refresh (everything on first use)."""
+        if not self.enabled:
+            return
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            query, started = self._new_docs_query()
+            cursor = db.items.find(query, _PROJECTION).sort("_id", 1).batch_size(LOAD_BATCH_SIZE)
+            batch = []
+            async for doc in cursor:
+                batch.append(doc)
+                if len(batch) >= LOAD_BATCH_SIZE:
+                    # hashing is CPU-bound; keep the event loop free during a cold load
+                    await run_in_threadpool(self._load_docs, batch)
+                    batch = []
+            await run_in_threadpool(self._load_docs, batch)
+            self._refreshed_at = started
+            self.loaded = True
+
+    def refresh_sync(self, db):
+        """`refresh` for a synchronous pymongo database (Celery workers)."""
+        if not self.enabled:
+            return
+        query, started = self._new_docs_query()
+        cursor = db.items.find(query, _PROJECTION).sort("_id", 1).batch_size(LOAD_BATCH_SIZE)
+        self._load_docs(cursor)
+        self._refreshed_at = started
+        self.loaded = True
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "loaded": self.loaded,
+            "items": len(self._signatures),
+            "max_items": self.max_items,
+            "evicted": self.evicted,
+            "bands": self.bands,
+            "rows": self.rows,
+            "buckets": sum(len(b) for b in self._buckets),
+        }
+
+
+dedup_index = DedupIndex()
@@ -0,0 +1,218 @@
+# app/utils/json_scanner.py
+#
+# Single-pass scanner for JSON-like objects embedded in free text (PDF extractions).
+#
+# Only the structural characters ({ } [ ] " , \ and line breaks) are visited, via
+# one regex pass, so the cost is linear in the text length no matter how many
+# braces it contains. String and escape state is tracked inside objects, so braces
+# in string values don't unbalance the scan, and trailing commas are recorded
+# while scanning so the repair needs no second pass. The scanner is resumable:
+# text can be fed page by page and completed objects come out as soon as their
+# closing brace is seen.
+#
+# A '{' in prose is not taken for an object: an object must open with '"' or '}'
+# and its strings may not cross a line break. An outer brace that breaks either
+# rule is dropped and the scan restarts just after it; otherwise an odd quote in
+# the prose would hide every object that follows.
+import bisect
+import json
+import re
+from typing import Callable, Dict, Iterator, List, Optional
+
+_SMART_QUOTES = (("“", '"'), ("”", '"'), ("‘", "'"), ("’", "'"))
+_TOKEN_RE = re.compile(r'[{}\[\]",\\\n]')
+_NON_SPACE_RE = re.compile(r"\S")
+
+# An open object spanning more than this many characters is given up on (its
+# already-closed children are still tried); bounds memory on stray '{' in the text.
+DEFAULT_MAX_OBJECT_CHARS = 200_000
+
+
+def _is_test_case(data) -> bool:
+    return isinstance(data, dict) and "title" in data
+
+
+class _Node:
+    __slots__ = ("start", "end", "children")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.end = -1
+        self.children: List["_Node"] = []
+
+
+class JsonBlockScanner:
+    """
+    Incremental scanner. `feed()` text in order and collect the accepted objects it
+    returns, then call `close()` to flush objects nested in braces that never closed.
+
+    A balanced `{...}` is parsed once (with trailing commas removed); if it is not
+    accepted, the objects nested directly inside it are tried instead, which
+    matches the old "rescan from every '{'" behaviour without the rescans.
+    """
+
+    def __init__(self, accept: Callable[[object], bool] = _is_test_case, max_object_chars: int = DEFAULT_MAX_OBJECT_CHARS):
+        self.accept = accept
+        self.max_object_chars = max_object_chars
+        self._buf = ""
+        self._base = 0            # absolute offset of self._buf[0]
+        self._pos = 0             # absolute position scanning resumes from
+        self._frames: List[_Node] = []  # open objects, outermost first
+        self._in_string = False
+        self._escape_until = -1   # absolute position the current escape covers
+        self._last_comma = -1
+        self._commas: List[int] = []    # absolute positions of trailing commas to drop
+
+    def feed(self, text: str) -> List[Dict]:
+        """Scan the next piece of text; returns objects completed by it."""
+        if text:
+            # chained str.replace is much faster than str.translate for this
+            for smart, plain in _SMART_QUOTES:
+                text = text.replace(smart, plain)
+            self._buf += text
+        found: List[Dict] = []
+        self._scan(found)
+        self._abandon_oversized(found, self._base + len(self._buf))
+        self._compact()
+        return found
+
+    def close(self) -> List[Dict]:
+        """End of input: resolve whatever is nested inside still-open braces."""
+        found: List[Dict] = []
+        for frame in self._frames:
+            for child in frame.children:
+                self._resolve(child, found)
+        self._frames = []
+        self._in_string = False
+        self._commas = []
+        self._compact()
+        return found
+
+    def _scan(self, found: List[Dict]):
+        while self._scan_from(found):
+            pass
+
+    def _scan_from(self, found: List[Dict]) -> bool:
+        """Scan from self._pos; True means an outer brace was dropped and the scan must restart."""
+        buf = self._buf
+        base = self._base
+        frames = self._frames
+        for m in _TOKEN_RE.finditer(buf, self._pos - base):
+            c = m.group()
+            pos = m.start() + base
+
+            if self._in_string:
+                if c == "\n":
+                    # JSON strings never span lines: the outer brace was not an object
+                    self._drop_outer()
+                    return True
+                if pos < self._escape_until:
+                    continue
+                if c == "\\":
+                    self._escape_until = pos + 2
+                elif c == '"':
+                    self._in_string = False
+                continue
+
+            if not frames:
+                # outside any object only an opening brace matters, and only if
+                # what follows it can start an object
+                if c == "{":
+                    nxt = _NON_SPACE_RE.search(buf, pos - base + 1)
+                    if nxt is None:
+                        # decide once the next piece of text arrives
+                        self._pos = pos
+                        return False
+                    if nxt.group() in '"}':
+                        frames.append(_Node(pos))
+                continue
+
+            if c == "\n":
+                continue
+            if c == '"':
+                self._in_string = True
+            elif c == ",":
+                self._last_comma = pos
+            elif c == "{":
+                frames.append(_Node(pos))
+                if pos - frames[0].start > self.max_object_chars:
+                    self._abandon_oversized(found, pos)
+            elif c in "}]":
+                lc = self._last_comma
+                if lc != -1 and (lc + 1 == pos or buf[lc + 1 - base:pos - base].isspace()):
+                    self._commas.append(lc)
+                self._last_comma = -1
+                if c == "}":
+                    node = frames.pop()
+                    node.end = pos + 1
+                    if frames:
+                        frames[-1].children.append(node)
+                    else:
+                        self._resolve(node, found)
+        self._pos = base + len(buf)
+        return False
+
+    def _drop_outer(self):
+        """Forget the open objects and resume scanning just after the outermost '{'."""
+        start = self._frames[0].start
+        self._frames.clear()
+        self._in_string = False
+        self._escape_until = -1
+        self._last_comma = -1
+        self._commas = self._commas[:bisect.bisect_left(self._commas, start)]
+        self._pos = start + 1
+
+    def _abandon_oversized(self, found: List[Dict], pos: int):
+        frames = self._frames
+        while frames and pos - frames[0].start > self.max_object_chars:
+            frame = frames.pop(0)
+            for child in frame.children:
+                self._resolve(child, found)
+        if not frames:
+            self._in_string = False
+            self._last_comma = -1
+
+    def _slice(self, start: int, end: int) -> str:
+        """Text of [start, end) with the recorded trailing commas removed."""
+        base = self._base
+        lo = bisect.bisect_left(self._commas, start)
+        hi = bisect.bisect_left(self._commas, end, lo)
+        if lo == hi:
+            return self._buf[start - base:end - base]
+        parts = []
+        prev = start
+        for comma in self._commas[lo:hi]:
+            parts.append(self._buf[prev - base:comma - base])
+            prev = comma + 1
+        parts.append(self._buf[prev - base:end - base])
+        return "".join(parts)
+
+    def _resolve(self, node: _Node, found: List[Dict]):
+        try:
+            data = json.loads(self._slice(node.start, node.end))
+        except ValueError:
+            data = None
+        if data is not None and self.accept(data):
+            found.append(data)
+            return
+        for child in node.children:
+            self._resolve(child, found)
+
+    def _compact(self):
+        # drop text nothing can refer to any more
+        keep_from = self._frames[0].start if self._frames else self._pos
+        if not self._frames:
+            self._last_comma = -1
+        if keep_from > self._base:
+            self._buf = self._buf[keep_from - self._base:]
+            self._base = keep_from
+            if self._commas and self._commas[0] < keep_from:
+                self._commas = self._commas[bisect.bisect_left(self._commas, keep_from):]
+
+
+def iter_json_objects(text: str, chunk_size: int = 1 << 16, accept: Optional[Callable[[object], bool]] = None) -> Iterator[Dict]:
+    """Yield accepted JSON objects from `text` as the scan reaches them."""
+    scanner = JsonBlockScanner(accept=accept) if accept else JsonBlockScanner()
+    for i in range(0, len(text), chunk_size):
+        yield from scanner.feed(text[i:i + chunk_size])
+    yield from scanner.close()
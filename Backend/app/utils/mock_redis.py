@@ -51,6 +51,15 @@ class MockRedis:
         self._write_cache(data)
         return True
 
+    def setex_many(self, items, time_seconds):
+        """Set several keys with one read/write of the cache file."""
+        data = self._read_cache()
+        expiry = time.time() + time_seconds
+        for key, value in items:
+            data[key] = {"value": value, "expiry": expiry}
+        self._write_cache(data)
+        return True
+
     def delete(self, key):
         data = self._read_cache()
         if key in data:
@@ -0,0 +1,128 @@
+# app/utils/parse_cache.py
+#
+# On-disk cache of parsed PDF results, keyed by a hash of the file bytes and the
+# parser version, so re-uploads of the same test plan skip pypdf extraction and the
+# JSON scan entirely. Entries are small JSON files; the directory is kept under
+# PARSE_CACHE_MAX_BYTES by evicting the least recently used entries (mtime is
+# bumped on every hit).
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from app.utils.pdf_handler import PARSER_VERSION, iter_pdf_test_cases
+
+PARSE_CACHE_DIR = os.getenv("PDF_PARSE_CACHE_DIR", os.path.join(os.getcwd(), ".cache", "pdf_parse"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PDF_PARSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+PARSE_CACHE_ENABLED = os.getenv("PDF_PARSE_CACHE", "1") != "0"
+
+
+def content_digest(file_bytes: bytes) -> str:
+    """sha256 of the uploaded file; identifies an upload independent of its filename."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class ParseCache:
+    def __init__(self, directory: str = PARSE_CACHE_DIR, max_bytes: int = PARSE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, digest: str) -> str:
+        # the parser version is part of the key: a parser change never serves stale results
+        return os.path.join(self.directory, f"{digest}.v{PARSER_VERSION}.json")
+
+    def get(self, digest: str) -> Optional[Tuple[List[Dict], Optional[int]]]:
+        """Cached (items, page count) for `digest`; the page count is None for old entries."""
+        path = self._path(digest)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # LRU bookkeeping
+        except (OSError, ValueError):
+            return None
+        if isinstance(entry, list):
+            # written before page counts were stored
+            return entry, None
+        return entry["items"], entry.get("pages")
+
+    def put(self, digest: str, items: List[Dict], pages: Optional[int] = None):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"pages": pages, "items": items}, f, separators=(",", ":"), default=str)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Failed to write parse cache entry {digest}: {e}")
+            return
+        self._evict()
+
+    def invalidate(self, digest: str):
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+parse_cache = ParseCache()
+
+
+def iter_test_cases_cached(
+    file_bytes: bytes,
+    digest: Optional[str] = None,
+    on_page: Optional[Callable[[int, int], None]] = None,
+    **kwargs,
+) -> Iterator[Dict]:
+    """
+    `iter_pdf_test_cases` with the parse cache in front. On a hit the cached cases
+    are replayed without touching pypdf, and `on_page` is called once with the
+    stored page count so progress still reads all pages processed; on a miss the
+    document is parsed as usual and the result (with its page count) is stored
+    once the whole file has been consumed.
+    """
+    if not PARSE_CACHE_ENABLED:
+        yield from iter_pdf_test_cases(file_bytes, on_page=on_page, **kwargs)
+        return
+    digest = digest or content_digest(file_bytes)
+    cached = parse_cache.get(digest)
+    if cached is not None:
+        items, pages = cached
+        if on_page and pages:
+            on_page(pages, pages)
+        yield from items
+        return
+
+    page_count = {"total": None}
+
+    def count_pages(done: int, total: int):
+        page_count["total"] = total
+        if on_page:
+            on_page(done, total)
+
+    collected: List[Dict] = []
+    for item in iter_pdf_test_cases(file_bytes, on_page=count_pages, **kwargs):
+        # keep a copy: callers add fields (_id, created_at, ...) to the yielded dict
+        collected.append(dict(item))
+        yield item
+    parse_cache.put(digest, collected, page_count["total"])
@@ -1,105 +1,197 @@
 # app/utils/pdf_handler.py
 import pypdf
-import json
-import re
 import io
-from typing import List, Dict
+import os
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Tuple, Iterator, Callable
+from app.utils.json_scanner import iter_json_objects, JsonBlockScanner
+from app.utils.classifier import CLASSIFIER_EDGE_CLASS, default_classifier
+
+# Bump whenever extraction/scanning/classification changes what gets returned;
+# it is part of the parsed-result cache key (see app.utils.parse_cache). Parses
+# made with the previous positive/negative mapping are cached separately.
+PARSER_VERSION = "2" if CLASSIFIER_EDGE_CLASS else "2-legacy"
+
+# Parallel text extraction: page ranges of PDF_EXTRACT_CHUNK_PAGES pages are spread
+# over one process-wide pool of PDF_EXTRACT_WORKERS processes once a document has
+# at least PDF_PARALLEL_MIN_PAGES pages. The pool is shared by every request, so
+# concurrent uploads queue for the same workers instead of each starting its own.
+# PDF_EXTRACT_WORKERS=1 disables it (0 means one worker per CPU).
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", "0")) or (os.cpu_count() or 1)
+PDF_EXTRACT_CHUNK_PAGES = int(os.getenv("PDF_EXTRACT_CHUNK_PAGES", "16"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "32"))
+# forkserver/spawn: the API process runs threads (motor, threadpool), plain fork is unsafe
+PDF_EXTRACT_START_METHOD = os.getenv(
+    "PDF_EXTRACT_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# In each pool process: reader of the document it last worked on
+_worker_path: Optional[str] = None
+_worker_reader: Optional[pypdf.PdfReader] = None
+
+
+def _extract_page_range(task: Tuple[str, int, int]) -> List[str]:
+    global _worker_path, _worker_reader
+    path, start, stop = task
+    if path != _worker_path:
+        # documents are handed over as temp files, so only the path is pickled per range
+        with open(path, "rb") as f:
+            _worker_reader = pypdf.PdfReader(io.BytesIO(f.read()))
+        _worker_path = path
+    return [_worker_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def get_extract_pool() -> ProcessPoolExecutor:
+    """The process-wide extraction pool, started on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context(PDF_EXTRACT_START_METHOD),
+            )
+        return _pool
+
+
+def shutdown_extract_pool():
+    """Stop the extraction pool (app shutdown); the next parallel extraction starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _discard_broken_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_page_texts(
+    file_bytes: bytes,
+    workers: Optional[int] = None,
+    chunk_pages: Optional[int] = None,
+    on_page: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[str]:
+    """
+    Yield the text of every page, in page order.
+
+    Small documents (or workers=1) are extracted inline. Larger ones are written to
+    a temp file, split into ranges of `chunk_pages` pages and extracted on the
+    shared pool (see `get_extract_pool`, sized by PDF_EXTRACT_WORKERS); each pool
+    process reads the file once and then handles whole ranges. Ranges are yielded
+    as soon as they (and every range before them) are done.
+
+    `on_page(pages_done, pages_total)` is called after each page has been consumed.
+    """
+    workers = workers or PDF_EXTRACT_WORKERS
+    chunk_pages = max(1, chunk_pages or PDF_EXTRACT_CHUNK_PAGES)
+    reader = pypdf.PdfReader(io.BytesIO(file_bytes))
+    page_count = len(reader.pages)
+
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        for n, page in enumerate(reader.pages, start=1):
+            yield page.extract_text() or ""
+            if on_page:
+                on_page(n, page_count)
+        return
+
+    fd, path = tempfile.mkstemp(prefix="pdf_extract_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(file_bytes)
+        pool = get_extract_pool()
+        ranges = [(path, i, min(i + chunk_pages, page_count)) for i in range(0, page_count, chunk_pages)]
+        n = 0
+        try:
+            for chunk in pool.map(_extract_page_range, ranges):
+                for text in chunk:
+                    yield text
+                    n += 1
+                    if on_page:
+                        on_page(n, page_count)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM); let the next call start a fresh pool
+            _discard_broken_pool(pool)
+            raise
+    finally:
+        os.unlink(path)
+
+
+def extract_page_texts(file_bytes: bytes, workers: Optional[int] = None, chunk_pages: Optional[int] = None) -> List[str]:
+    """Extract the text of every page, in page order (see `iter_page_texts`)."""
+    return list(iter_page_texts(file_bytes, workers=workers, chunk_pages=chunk_pages))
 
 def extract_json_from_text(text: str) -> List[Dict]:
     """
     The function `extract_json_from_text` extracts JSON-like objects from raw text, handling potential
     PDF extraction artifacts.
     
-    :param text: Thank you for providing the function code. It seems like you want to extract JSON-like
-    objects from raw text, handling potential PDF extraction artifacts. To help you further, could you
-    please provide an example of the raw text from which you want to extract JSON-like objects?
+    :param text: The raw text extracted from a PDF, possibly containing smart quotes, trailing commas
+    and braces inside string values
     :type text: str
     :return: The function `extract_json_from_text` returns a list of dictionaries containing JSON-like
     objects extracted from the raw text input.
     
-    Extracts JSON-like objects from raw text.
-    Handles potential PDF extraction artifacts.
+    Extracts JSON-like objects from raw text in a single linear pass
+    (see `app.utils.json_scanner`).
     """
-    items = []
-    # Replace smart quotes often found in PDFs
-    text = text.replace('“', '"').replace('”', '"').replace('‘', "'").replace('’', "'")
-    
-    # Find all starting positions of potential JSON objects
-    start_indices = [m.start() for m in re.finditer(r'\{', text)]
-    
-    processed_until = 0
-    for start in start_indices:
-        if start < processed_until:
-            continue
-            
-        stack = 0
-        end = -1
-        for i in range(start, len(text)):
-            if text[i] == '{':
-                stack += 1
-            elif text[i] == '}':
-                stack -= 1
-                if stack == 0:
-                    end = i + 1
-                    break
-        
-        if end != -1:
-            potential_json = text[start:end]
-            try:
-                # Clean up interior newlines and extra spaces that might break json.loads
-                # This is risky but often necessary for PDF text
-                data = json.loads(potential_json)
-                if isinstance(data, dict) and "title" in data:
-                    items.append(data)
-                    processed_until = end
-            except json.JSONDecodeError:
-                # Try a more aggressive cleanup if simple load fails
-                try:
-                    # Remove trailing commas before closing braces/brackets
-                    cleaned = re.sub(r',\s*([\]}])', r'\1', potential_json)
-                    data = json.loads(cleaned)
-                    if isinstance(data, dict) and "title" in data:
-                        items.append(data)
-                        processed_until = end
-                except json.JSONDecodeError:
-                    continue
-    return items
+    return list(iter_json_objects(text))
 
 def classify_test_case(item: Dict) -> str:
     """
-    The function `classify_test_case` classifies a test case as 'positive' or 'negative' based on the
-    content and type field.
+    The function `classify_test_case` classifies a test case as 'positive', 'negative' or 'edge'
+    based on the content and type field.
     
     :param item: The `item` parameter is a dictionary containing information about a test case. It
-    typically includes fields such as 'type', 'title', 'description', and 'expected_result'. The
-    function `classify_test_case` classifies the test case as 'positive' or 'negative' based on the
-    content of
+    typically includes fields such as 'type', 'title', 'description', and 'expected_result'.
     :type item: Dict
-    :return: The function `classify_test_case` returns a string value of either "positive" or "negative"
-    based on the content of the test case item. If the 'type' field in the item is already set to
-    "positive" or "negative", it returns that value. Otherwise, it uses a heuristic approach to
-    determine the classification based on the presence of certain negative indicators in the content of
-    the test
-    
-    Classifies a test case as 'positive' or 'negative' based on content 
-    if the 'type' field is missing or generic.
+    :return: The function `classify_test_case` returns "positive", "negative" or "edge". If the
+    'type' field in the item is already one of those, it returns that value. Otherwise negative
+    indicators in the content win, then edge indicators, and anything else is positive (see
+    `app.utils.classifier` for the indicator sets).
     """
-    current_type = item.get("type", "").lower()
-    if current_type in ["positive", "negative"]:
-        return current_type
-        
-    # Heuristic classification
-    content = f"{item.get('title', '')} {item.get('description', '')} {item.get('expected_result', '')}".lower()
-    negative_indicators = [
-        "error", "fail", "invalid", "negative", "404", "500", 
-        "exception", "unauthorized", "malformed", "wrong", "broken"
-    ]
-    
-    if any(indicator in content for indicator in negative_indicators):
-        return "negative"
-    return "positive"
+    return default_classifier.classify(item)
 
-def parse_pdf_test_cases(file_bytes: bytes) -> List[Dict]:
+def iter_pdf_test_cases(
+    file_bytes: bytes,
+    workers: Optional[int] = None,
+    chunk_pages: Optional[int] = None,
+    on_page: Optional[Callable[[int, int], None]] = None,
+) -> Iterator[Dict]:
+    """
+    Generator version of `parse_pdf_test_cases`: pages are fed to an incremental
+    JSON scanner as they are extracted, and each test case is classified and
+    yielded as soon as its closing brace has been read. Objects spanning a page
+    break are completed by the next page; the full text is never assembled.
+    `on_page(pages_done, pages_total)` reports progress (see `iter_page_texts`).
+    """
+    scanner = JsonBlockScanner()
+    for text in iter_page_texts(file_bytes, workers=workers, chunk_pages=chunk_pages, on_page=on_page):
+        if not text:
+            continue
+        yield from _classified(scanner.feed(text + "\n"))
+    yield from _classified(scanner.close())
+
+
+def _classified(items: List[Dict]) -> List[Dict]:
+    for item, kind in zip(items, default_classifier.classify_batch(items)):
+        item["type"] = kind
+    return items
+
+
+def parse_pdf_test_cases(file_bytes: bytes, workers: Optional[int] = None, chunk_pages: Optional[int] = None) -> List[Dict]:
     """
     The function `parse_pdf_test_cases` reads a PDF file, extracts text, identifies JSON test cases
     within the text, classifies them, and returns a list of dictionaries containing the test cases with
@@ -110,24 +202,16 @@ def parse_pdf_test_cases(file_bytes: bytes) -> List[Dict]:
     which means the content of the PDF file should be read as bytes before passing it to this function
     for processing
     :type file_bytes: bytes
+    :param workers: 1 extracts inline; anything else uses the shared extraction pool of
+    `PDF_EXTRACT_WORKERS` processes (defaults to `PDF_EXTRACT_WORKERS`)
+    :type workers: Optional[int]
+    :param chunk_pages: Number of consecutive pages each worker extracts per task (defaults to
+    `PDF_EXTRACT_CHUNK_PAGES`)
+    :type chunk_pages: Optional[int]
     :return: The function `parse_pdf_test_cases` takes in a `bytes` object representing a PDF file,
     reads the PDF, extracts text from it, finds JSON test cases within the text, classifies each test
     case, and returns a list of dictionaries where each dictionary represents a test case with an
     additional "type" key indicating its classification.
     Reads a PDF, extracts text, finds JSON test cases, and classifies them.
     """
-    reader = pypdf.PdfReader(io.BytesIO(file_bytes))
-    full_text = ""
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            full_text += text + "\n"
-            
-    raw_items = extract_json_from_text(full_text)
-    
-    final_items = []
-    for item in raw_items:
-        item["type"] = classify_test_case(item)
-        final_items.append(item)
-        
-    return final_items
+    return list(iter_pdf_test_cases(file_bytes, workers=workers, chunk_pages=chunk_pages))
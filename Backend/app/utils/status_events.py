@@ -0,0 +1,144 @@
+# app/utils/status_events.py
+#
+# Lightweight local pub/sub for item processing_status transitions.
+#
+# Publishers (Celery tasks, the API) append one JSON line per transition to a shared
+# event log next to the filesystem broker. Each API process runs a single tailer that
+# reads new lines and fans them out to in-process asyncio queues, one per SSE /
+# WebSocket subscriber, so N connected clients cost one file poll per process
+# instead of N database polls.
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Set, Optional, Any
+
+EVENTS_FILE = os.getenv("STATUS_EVENTS_FILE", os.path.join(os.getcwd(), ".celery", "events", "status.ndjson"))
+EVENTS_MAX_BYTES = int(os.getenv("STATUS_EVENTS_MAX_BYTES", str(5 * 1024 * 1024)))
+POLL_INTERVAL = float(os.getenv("STATUS_EVENTS_POLL_INTERVAL", "0.2"))
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Statuses after which no further transition is expected
+PENDING_STATUSES = {"queued", "processing"}
+
+
+def is_terminal(status: Optional[str]) -> bool:
+    return status not in PENDING_STATUSES
+
+
+def publish_status(item_id: str, status: str, **fields: Any):
+    """
+    Append a status transition to the event log. A single O_APPEND write per
+    event keeps concurrent publishers from interleaving lines.
+    """
+    event = {"item_id": item_id, "status": status, "ts": time.time(), **fields}
+    line = (json.dumps(event, default=str) + "\n").encode("utf-8")
+    try:
+        os.makedirs(os.path.dirname(EVENTS_FILE), exist_ok=True)
+        fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # keep the log bounded; tailers notice the shrink and start over
+            if os.fstat(fd).st_size > EVENTS_MAX_BYTES:
+                os.ftruncate(fd, 0)
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        # status events are best effort; the DB remains the source of truth
+        print(f"Failed to publish status event for {item_id}: {e}")
+
+
+class StatusBroker:
+    """In-process fan-out of status events to any number of subscribers per item."""
+
+    def __init__(self, path: str = EVENTS_FILE):
+        self.path = path
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._offset = 0
+
+    def subscribe(self, item_id: str) -> asyncio.Queue:
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(item_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, item_id: str, queue: asyncio.Queue):
+        subs = self._subscribers.get(item_id)
+        if subs is None:
+            return
+        subs.discard(queue)
+        if not subs:
+            self._subscribers.pop(item_id, None)
+
+    def subscriber_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+    def dispatch(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers.get(event.get("item_id"), ())):
+            if queue.full():
+                # slow consumer: drop the oldest event, the latest status matters most
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def start(self):
+        """Start the tailer (idempotent); only events published from now on are delivered."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._offset = os.path.getsize(self.path)
+        except OSError:
+            self._offset = 0
+        self._task = asyncio.get_running_loop().create_task(self._tail())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _read_new_lines(self) -> list:
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self._offset:
+            # log was truncated by a publisher
+            self._offset = 0
+        if size == self._offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+        # only consume complete lines; a partial trailing write is picked up next poll
+        last_nl = data.rfind(b"\n")
+        if last_nl == -1:
+            return []
+        self._offset += last_nl + 1
+        return data[: last_nl + 1].splitlines()
+
+    async def _tail(self):
+        while True:
+            if self._subscribers:
+                for raw in self._read_new_lines():
+                    try:
+                        self.dispatch(json.loads(raw))
+                    except (ValueError, AttributeError):
+                        continue
+            else:
+                # nobody listening: just keep the offset at EOF
+                try:
+                    self._offset = os.path.getsize(self.path)
+                except OSError:
+                    self._offset = 0
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+def format_sse(event: Dict[str, Any], event_type: str = "status") -> str:
+    return f"event: {event_type}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+status_broker = StatusBroker()
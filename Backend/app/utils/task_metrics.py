@@ -0,0 +1,117 @@
+# app/utils/task_metrics.py
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Iterable
+
+# Percentiles reported by the admin endpoint
+PERCENTILES = (50, 90, 99)
+
+
+class StageTimer:
+    """
+    Collects per-stage wall times (in milliseconds) for a single Celery task run.
+
+    Usage:
+        timer = StageTimer("process_image", enqueued_at=enqueued_at)
+        with timer.stage("gridfs_read"):
+            ...
+        timer.as_dict()
+    """
+
+    def __init__(self, task_name: str, enqueued_at: Optional[float] = None):
+        self.task_name = task_name
+        self.enqueued_at = enqueued_at
+        self.started_at = time.time()
+        self.stages: Dict[str, float] = {}
+        self._t0 = time.perf_counter()
+
+    @property
+    def queue_wait_ms(self) -> Optional[float]:
+        """Time between enqueue (API side) and the task starting on a worker."""
+        if self.enqueued_at is None:
+            return None
+        return round(max(0.0, self.started_at - self.enqueued_at) * 1000, 3)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the wrapped block; repeated stages accumulate."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - t) * 1000
+            self.stages[name] = round(self.stages.get(name, 0.0) + elapsed, 3)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self._t0) * 1000, 3)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "task": self.task_name,
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc),
+            "queue_wait_ms": self.queue_wait_ms,
+            "total_ms": self.total_ms(),
+            "stages": dict(self.stages),
+        }
+
+
+def record_task_metrics(db, timer: StageTimer, outcome: str, **extra):
+    """Insert one timing record into the `task_metrics` collection (sync pymongo db)."""
+    try:
+        db.task_metrics.insert_one({**timer.as_dict(), "outcome": outcome, **extra})
+    except Exception as exc:
+        # metrics must never fail the task itself
+        print(f"[DEBUG] Failed to record task metrics: {exc}")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile of `values` (pct in 0..100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (pct / 100) * (len(ordered) - 1)
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return round(ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo), 3)
+
+
+def _distribution(values: List[float]) -> Dict[str, Any]:
+    dist: Dict[str, Any] = {"count": len(values)}
+    for pct in PERCENTILES:
+        dist[f"p{pct}"] = percentile(values, pct)
+    dist["max"] = max(values) if values else None
+    return dist
+
+
+def summarize_task_metrics(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate raw timing records (as produced by `StageTimer.as_dict`) into
+    per-task percentiles for queue wait, total time and every recorded stage.
+    """
+    grouped: Dict[str, Dict[str, Any]] = {}
+    for rec in records:
+        task = rec.get("task", "unknown")
+        g = grouped.setdefault(task, {"queue_wait_ms": [], "total_ms": [], "stages": {}, "outcomes": {}})
+        if rec.get("queue_wait_ms") is not None:
+            g["queue_wait_ms"].append(rec["queue_wait_ms"])
+        if rec.get("total_ms") is not None:
+            g["total_ms"].append(rec["total_ms"])
+        for name, ms in (rec.get("stages") or {}).items():
+            g["stages"].setdefault(name, []).append(ms)
+        outcome = rec.get("outcome")
+        if outcome:
+            g["outcomes"][outcome] = g["outcomes"].get(outcome, 0) + 1
+
+    summary: Dict[str, Any] = {}
+    for task, g in grouped.items():
+        summary[task] = {
+            "runs": len(g["total_ms"]),
+            "outcomes": g["outcomes"],
+            "queue_wait_ms": _distribution(g["queue_wait_ms"]),
+            "total_ms": _distribution(g["total_ms"]),
+            "stages": {name: _distribution(v) for name, v in g["stages"].items()},
+        }
+    return summary
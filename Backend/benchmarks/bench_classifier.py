@@ -0,0 +1,124 @@
+# benchmarks/bench_classifier.py
+#
+# Classifying untyped test cases: the previous per-item `any(... in content)` loop,
+# a single compiled alternation regex, and TestCaseClassifier (per item and batched).
+#
+# Run from the Backend directory:
+#   python -m benchmarks.bench_classifier --items 100000
+import argparse
+import random
+import re
+import time
+
+from app.utils.classifier import TestCaseClassifier, DEFAULT_NEGATIVE_INDICATORS, DEFAULT_EDGE_INDICATORS
+
+WORDS = (
+    "user opens the page and submits the form with valid data the dashboard shows "
+    "the updated profile settings are saved notification appears login works"
+).split()
+MARKERS = ("error", "invalid input", "unauthorized", "boundary", "maximum length", "empty list")
+
+
+def legacy_classify_test_case(item):
+    """The pre-compiled implementation (positive/negative only)."""
+    current_type = item.get("type", "").lower()
+    if current_type in ["positive", "negative"]:
+        return current_type
+    content = f"{item.get('title', '')} {item.get('description', '')} {item.get('expected_result', '')}".lower()
+    negative_indicators = [
+        "error", "fail", "invalid", "negative", "404", "500",
+        "exception", "unauthorized", "malformed", "wrong", "broken"
+    ]
+    if any(indicator in content for indicator in negative_indicators):
+        return "negative"
+    return "positive"
+
+
+def make_regex_classifier(negative, edge):
+    """One alternation regex per class, for comparison with substring search."""
+    patterns = [
+        (label, re.compile("|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))))
+        for label, words in (("negative", negative), ("edge", edge))
+    ]
+
+    def classify(item):
+        current = str(item.get("type") or "").lower()
+        if current in ("positive", "negative", "edge"):
+            return current
+        text = f"{item.get('title') or ''} {item.get('description') or ''} {item.get('expected_result') or ''}".lower()
+        for label, pattern in patterns:
+            if pattern.search(text):
+                return label
+        return "positive"
+
+    return classify
+
+
+def make_items(count: int, seed: int = 7):
+    rng = random.Random(seed)
+
+    def sentence(n):
+        words = [rng.choice(WORDS) for _ in range(n)]
+        if rng.random() < 0.3:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(MARKERS))
+        return " ".join(words).capitalize()
+
+    items = []
+    for _ in range(count):
+        item = {"title": sentence(6), "description": sentence(25), "expected_result": sentence(10)}
+        if rng.random() < 0.1:
+            item["type"] = rng.choice(["positive", "negative", "edge"])
+        items.append(item)
+    return items
+
+
+def _time(fn):
+    t = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000, help="items per classify_batch call")
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    classifier = TestCaseClassifier()
+    # same indicator set as the legacy code, to check the results match
+    negative_only = TestCaseClassifier(negative=DEFAULT_NEGATIVE_INDICATORS, edge=())
+
+    legacy_t, legacy = _time(lambda: [legacy_classify_test_case(i) for i in items])
+    regex_classify = make_regex_classifier(DEFAULT_NEGATIVE_INDICATORS, DEFAULT_EDGE_INDICATORS)
+    regex_t, regex = _time(lambda: [regex_classify(i) for i in items])
+    single_t, single = _time(lambda: [classifier.classify(i) for i in items])
+    batch_t, batch = _time(lambda: [
+        kind
+        for start in range(0, len(items), args.batch)
+        for kind in classifier.classify_batch(items[start:start + args.batch])
+    ])
+    compat_t, compat = _time(lambda: negative_only.classify_batch(items))
+
+    def row(name, elapsed):
+        print(f"{name:24} {elapsed:7.3f}s  {len(items) / elapsed / 1000:8.1f}k items/s  ({legacy_t / elapsed:4.1f}x)")
+
+    print(f"{len(items)} items")
+    row("legacy (negative only)", legacy_t)
+    row("batch, negative only", compat_t)
+    row("regex alternation", regex_t)
+    row("classify", single_t)
+    row(f"classify_batch({args.batch})", batch_t)
+    print("types:", {t: batch.count(t) for t in ("positive", "negative", "edge")})
+
+    assert batch == single == regex, "classifiers disagree"
+    # the legacy code ignored an existing 'edge' type; compare everything else
+    mismatched = [
+        i for i, (old, new) in enumerate(zip(legacy, compat))
+        if old != new and items[i].get("type") != "edge"
+    ]
+    assert not mismatched, f"{len(mismatched)} items differ from the legacy classifier"
+
+
+if __name__ == "__main__":
+    main()
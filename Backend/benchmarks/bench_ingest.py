@@ -0,0 +1,198 @@
+# benchmarks/bench_ingest.py
+#
+# Stage-by-stage timings of the PDF ingest pipeline on synthetic test plans:
+#   extract   pypdf page text extraction (iter_page_texts)
+#   scan      JSON object scanning (JsonBlockScanner, page by page)
+#   classify  TestCaseClassifier.classify_batch
+#   insert    Create_items in PDF_INSERT_BATCH_SIZE batches (or Create_item per case)
+#   pipeline  iter_pdf_test_cases end to end, without the insert
+#
+# Every size runs in its own child process so the reported peak RSS belongs to
+# that size alone. Inserts go to an in-memory stand-in unless --mongo-uri is given,
+# so the suite runs offline.
+#
+# Run from the Backend directory:
+#   python -m benchmarks.bench_ingest --sizes 10,100,1000,10000
+#   python -m benchmarks.bench_ingest --sizes 1000 --mongo-uri mongodb://localhost:27017 --json
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from bson import ObjectId
+
+from app.crud.crud_items import Create_item, Create_items
+from app.utils.classifier import default_classifier
+from app.utils.json_scanner import JsonBlockScanner
+from app.utils.pdf_handler import iter_page_texts, iter_pdf_test_cases
+from benchmarks.synthetic_pdf import make_test_plan_pdf
+
+DEFAULT_SIZES = "10,100,1000,10000"
+INSERT_BATCH_SIZE = int(os.getenv("PDF_INSERT_BATCH_SIZE", "50"))
+
+
+class _InsertOneResult:
+    def __init__(self, inserted_id):
+        self.inserted_id = inserted_id
+
+
+class _InsertManyResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class MemoryCollection:
+    """Just enough of a Motor collection for the insert paths."""
+
+    def __init__(self):
+        self.docs: Dict[ObjectId, dict] = {}
+
+    async def insert_one(self, doc: dict):
+        doc.setdefault("_id", ObjectId())
+        self.docs[doc["_id"]] = dict(doc)
+        return _InsertOneResult(doc["_id"])
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True):
+        ids = []
+        for doc in docs:
+            doc.setdefault("_id", ObjectId())
+            self.docs[doc["_id"]] = dict(doc)
+            ids.append(doc["_id"])
+        return _InsertManyResult(ids)
+
+    async def find_one(self, query: dict):
+        doc = self.docs.get(query.get("_id"))
+        return dict(doc) if doc is not None else None
+
+
+class MemoryDatabase:
+    def __init__(self):
+        self.items = MemoryCollection()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _timed(stages: Dict[str, float], name: str, fn):
+    t = time.perf_counter()
+    result = fn()
+    stages[name] = time.perf_counter() - t
+    return result
+
+
+async def _insert(db, cases: List[dict], per_item: bool):
+    if per_item:
+        for case in cases:
+            await Create_item(db, case)
+        return
+    for start in range(0, len(cases), INSERT_BATCH_SIZE):
+        await Create_items(db, cases[start:start + INSERT_BATCH_SIZE])
+
+
+def run_size(cases: int, workers: int, per_item: bool, mongo_uri: str = None) -> Dict:
+    """Benchmark one document size in this process and return the measurements."""
+    pdf = make_test_plan_pdf(cases)
+    stages: Dict[str, float] = {}
+
+    pages = _timed(stages, "extract", lambda: list(iter_page_texts(pdf, workers=workers)))
+
+    def scan():
+        scanner = JsonBlockScanner()
+        found = []
+        for text in pages:
+            found.extend(scanner.feed(text + "\n"))
+        found.extend(scanner.close())
+        return found
+
+    found = _timed(stages, "scan", scan)
+    for item in found:
+        item.pop("type", None)
+    kinds = _timed(stages, "classify", lambda: default_classifier.classify_batch(found))
+    for item, kind in zip(found, kinds):
+        item["type"] = kind
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_uri)
+        db = client[os.getenv("BENCH_MONGO_DB", "bench_ingest")]
+    else:
+        client, db = None, MemoryDatabase()
+    _timed(stages, "insert", lambda: asyncio.run(_insert(db, found, per_item)))
+    if client is not None:
+        asyncio.run(db.items.drop())
+        client.close()
+
+    streamed = _timed(stages, "pipeline", lambda: sum(1 for _ in iter_pdf_test_cases(pdf, workers=workers)))
+
+    return {
+        "cases": cases,
+        "found": len(found),
+        "streamed": streamed,
+        "pages": len(pages),
+        "pdf_kb": round(len(pdf) / 1024, 1),
+        "text_mb": round(sum(len(p) for p in pages) / (1024 * 1024), 3),
+        "insert": ("Create_item" if per_item else f"Create_items x{INSERT_BATCH_SIZE}")
+                  + (" (mongo)" if mongo_uri else " (memory)"),
+        "seconds": {name: round(s, 4) for name, s in stages.items()},
+        "cases_per_s": {name: round(len(found) / s) if s else None for name, s in stages.items()},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _print_report(results: List[Dict]):
+    stages = ("extract", "scan", "classify", "insert", "pipeline")
+    print(f"{'cases':>6} {'pages':>6} {'pdf KB':>8} " + " ".join(f"{s:>17}" for s in stages) + f" {'peak RSS':>9}")
+    for r in results:
+        cells = " ".join(
+            f"{r['seconds'][s]:7.3f}s {r['cases_per_s'][s] or 0:>7}/s" for s in stages
+        )
+        print(f"{r['cases']:>6} {r['pages']:>6} {r['pdf_kb']:>8} {cells} {r['peak_rss_mb']:>6.1f} MB")
+    if results:
+        print(f"insert path: {results[0]['insert']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF ingest pipeline benchmark")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated test case counts")
+    parser.add_argument("--workers", type=int, default=1, help="extraction processes (1 = inline)")
+    parser.add_argument("--per-item", action="store_true", help="insert with Create_item one case at a time")
+    parser.add_argument("--mongo-uri", default=None, help="insert into a real MongoDB instead of memory")
+    parser.add_argument("--json", action="store_true", help="print one JSON line per size")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for cases in sizes:
+        if args.in_process:
+            result = run_size(cases, args.workers, args.per_item, args.mongo_uri)
+        else:
+            cmd = [sys.executable, "-m", "benchmarks.bench_ingest", "--in-process", "--json",
+                   "--sizes", str(cases), "--workers", str(args.workers)]
+            if args.per_item:
+                cmd.append("--per-item")
+            if args.mongo_uri:
+                cmd += ["--mongo-uri", args.mongo_uri]
+            out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+        if result["found"] != cases or result["streamed"] != cases:
+            print(f"warning: {cases} cases embedded, {result['found']} scanned, {result['streamed']} streamed",
+                  file=sys.stderr)
+        results.append(result)
+        if args.json:
+            print(json.dumps(result), flush=True)
+
+    if not args.json:
+        _print_report(results)
+
+
+if __name__ == "__main__":
+    main()
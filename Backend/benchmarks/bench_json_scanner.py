@@ -0,0 +1,122 @@
+# benchmarks/bench_json_scanner.py
+#
+# Times `extract_json_from_text` on multi-megabyte synthetic PDF text and compares it
+# with the previous quadratic implementation (kept below for reference).
+#
+# Run from the Backend directory:
+#   python -m benchmarks.bench_json_scanner --mb 4
+import argparse
+import json
+import random
+import re
+import time
+
+from app.utils.pdf_handler import extract_json_from_text
+
+
+def legacy_extract_json_from_text(text: str):
+    """The pre-scanner implementation: rescans forward from every '{'."""
+    items = []
+    text = text.replace('“', '"').replace('”', '"').replace('‘', "'").replace('’', "'")
+    start_indices = [m.start() for m in re.finditer(r'\{', text)]
+    processed_until = 0
+    for start in start_indices:
+        if start < processed_until:
+            continue
+        stack = 0
+        end = -1
+        for i in range(start, len(text)):
+            if text[i] == '{':
+                stack += 1
+            elif text[i] == '}':
+                stack -= 1
+                if stack == 0:
+                    end = i + 1
+                    break
+        if end != -1:
+            potential_json = text[start:end]
+            try:
+                data = json.loads(potential_json)
+                if isinstance(data, dict) and "title" in data:
+                    items.append(data)
+                    processed_until = end
+            except json.JSONDecodeError:
+                try:
+                    cleaned = re.sub(r',\s*([\]}])', r'\1', potential_json)
+                    data = json.loads(cleaned)
+                    if isinstance(data, dict) and "title" in data:
+                        items.append(data)
+                        processed_until = end
+                except json.JSONDecodeError:
+                    continue
+    return items
+
+
+def _test_case(i: int, rng: random.Random) -> str:
+    case = {
+        "id": i,
+        "type": rng.choice(["positive", "negative", "edge"]),
+        "title": f"Verify scenario {i}",
+        "description": f"Checks behaviour {i} with {{braces}} in the text",
+        "expected_result": "Page shows the result",
+        "steps": [f"Step {n}" for n in range(rng.randint(2, 6))],
+    }
+    text = json.dumps(case, indent=2)
+    if rng.random() < 0.3:
+        text = text.replace('"Step 0"', '"Step 0",', 1)  # trailing comma
+    if rng.random() < 0.3:
+        text = text.replace('"title": "', '"title": “', 1).replace(f'{i}",\n  "description"', f'{i}”,\n  "description"', 1)
+    return text
+
+
+def make_text(target_bytes: int, seed: int = 7, noise: str = "prose") -> str:
+    """
+    Synthetic extracted text: test-case objects separated by prose. With
+    noise="braces", the prose is littered with unmatched '{' - the input that made
+    the old scanner quadratic.
+    """
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        if noise == "braces":
+            filler = "Section {" + " lorem {ipsum" * rng.randint(1, 8) + "\n"
+        else:
+            filler = "Lorem ipsum dolor sit amet, {placeholder} consectetur.\n" * rng.randint(1, 4)
+        chunk = filler + _test_case(i, rng) + "\n"
+        parts.append(chunk)
+        size += len(chunk)
+        i += 1
+    return "".join(parts)
+
+
+def _time(fn, text):
+    t = time.perf_counter()
+    result = fn(text)
+    return time.perf_counter() - t, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=float, default=4.0, help="size of the synthetic text in MB")
+    parser.add_argument("--legacy-mb", type=float, default=0.25,
+                        help="size used for the legacy comparison (it is quadratic on brace noise)")
+    args = parser.parse_args()
+
+    for noise in ("prose", "braces"):
+        text = make_text(int(args.mb * 1024 * 1024), noise=noise)
+        elapsed, found = _time(extract_json_from_text, text)
+        mb = len(text) / (1024 * 1024)
+        print(f"[{noise:6}] scanner   {mb:6.2f} MB  {elapsed:7.3f}s  {mb / elapsed:7.2f} MB/s  {len(found)} objects")
+
+        small = make_text(int(args.legacy_mb * 1024 * 1024), noise=noise)
+        new_t, new_found = _time(extract_json_from_text, small)
+        old_t, old_found = _time(legacy_extract_json_from_text, small)
+        small_mb = len(small) / (1024 * 1024)
+        print(f"[{noise:6}] legacy    {small_mb:6.2f} MB  {old_t:7.3f}s vs scanner {new_t:7.3f}s "
+              f"({old_t / new_t:5.1f}x)  objects {len(old_found)} / {len(new_found)}")
+
+
+if __name__ == "__main__":
+    main()
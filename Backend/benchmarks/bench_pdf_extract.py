@@ -0,0 +1,52 @@
+# benchmarks/bench_pdf_extract.py
+#
+# Serial vs shared-process-pool text extraction for large test-plan PDFs. The
+# first pooled run includes starting the pool; later runs (like later uploads to
+# the same API process) reuse it.
+#
+# Run from the Backend directory:
+#   python -m benchmarks.bench_pdf_extract --cases 5000 --workers 4
+import argparse
+import time
+
+from app.utils import pdf_handler
+from app.utils.pdf_handler import parse_pdf_test_cases, shutdown_extract_pool
+from benchmarks.synthetic_pdf import make_test_plan_pdf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cases", type=int, default=3000, help="test cases embedded in the PDF")
+    parser.add_argument("--workers", type=int, default=4, help="size of the shared extraction pool")
+    parser.add_argument("--chunk-pages", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=3, help="pooled runs after the first")
+    args = parser.parse_args()
+    pdf_handler.PDF_EXTRACT_WORKERS = args.workers
+
+    pdf = make_test_plan_pdf(args.cases)
+    print(f"PDF: {len(pdf) / 1024:.0f} KB, {args.cases} test cases")
+
+    t = time.perf_counter()
+    serial = parse_pdf_test_cases(pdf, workers=1)
+    serial_s = time.perf_counter() - t
+    print(f"serial                  {serial_s:7.3f}s  {len(serial)} cases")
+
+    try:
+        t = time.perf_counter()
+        parallel = parse_pdf_test_cases(pdf, workers=args.workers, chunk_pages=args.chunk_pages)
+        first_s = time.perf_counter() - t
+        print(f"pool of {args.workers}, first run   {first_s:7.3f}s  ({serial_s / first_s:.2f}x, includes pool start)")
+        assert parallel == serial, "parallel extraction changed the result"
+
+        for run in range(args.runs):
+            t = time.perf_counter()
+            parallel = parse_pdf_test_cases(pdf, workers=args.workers, chunk_pages=args.chunk_pages)
+            warm_s = time.perf_counter() - t
+            print(f"pool of {args.workers}, reused      {warm_s:7.3f}s  ({serial_s / warm_s:.2f}x)")
+            assert parallel == serial, "parallel extraction changed the result"
+    finally:
+        shutdown_extract_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/synthetic_pdf.py
+#
+# Builds synthetic "test plan" PDFs for the ingest benchmarks without any PDF
+# writing dependency: plain Helvetica text pages, one JSON test case after another,
+# with the artifacts real exports have (smart quotes, trailing commas, objects that
+# run across a page break).
+import json
+import random
+from typing import List
+
+LINES_PER_PAGE = 60
+LEADING = 12
+
+
+def _pdf_string(line: str) -> bytes:
+    """Encode a line as a PDF literal string in WinAnsiEncoding."""
+    out = bytearray(b"(")
+    for ch in line:
+        if ch in "\\()":
+            out += b"\\" + ch.encode("latin-1")
+        elif ch == "“":
+            out += b"\\223"
+        elif ch == "”":
+            out += b"\\224"
+        else:
+            out += ch.encode("latin-1", errors="replace")
+    out += b")"
+    return bytes(out)
+
+
+def _content_stream(lines: List[str]) -> bytes:
+    parts = [b"BT /F1 9 Tf %d TL 40 800 Td" % LEADING]
+    for line in lines:
+        parts.append(_pdf_string(line) + b" Tj T*")
+    parts.append(b"ET")
+    return b"\n".join(parts)
+
+
+def build_pdf(lines: List[str], lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """Lay `lines` out over as many pages as needed and return the PDF bytes."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects: List[bytes] = []
+    page_count = len(pages)
+    first_page_obj = 4
+    kids = " ".join(f"{first_page_obj + 2 * i} 0 R" for i in range(page_count))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for i, page_lines in enumerate(pages):
+        content_obj = first_page_obj + 2 * i + 1
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_obj} 0 R >>".encode()
+        )
+        stream = _content_stream(page_lines)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % n + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return bytes(out)
+
+
+def make_test_case_lines(count: int, seed: int = 42) -> List[str]:
+    """
+    Text lines for `count` test cases separated by prose. Roughly a quarter use
+    smart quotes, a quarter carry a trailing comma, and some have braces in values.
+    """
+    rng = random.Random(seed)
+    lines: List[str] = ["Test Plan", "Generated test cases follow.", ""]
+    for i in range(count):
+        kind = rng.choice(["positive", "negative", "edge"])
+        case = {
+            "id": i + 1,
+            "type": kind,
+            "title": f"Verify {kind} flow number {i + 1}",
+            "description": f"Checks the {kind} path of feature {i % 37} with input {{value}}",
+            "expected_result": "Error message is shown" if kind == "negative" else "Page updates correctly",
+            "steps": [f"Open page {i % 11}", "Fill the form", "Click Submit"][: rng.randint(1, 3)],
+        }
+        block = json.dumps(case, indent=2).splitlines()
+        if rng.random() < 0.25:
+            block = [ln.replace('"', "“", 1).replace('"', "”", 1) if '"title"' in ln else ln for ln in block]
+        if rng.random() < 0.25:
+            # trailing comma after the last step
+            idx = max(j for j, ln in enumerate(block) if ln.strip() == "]") - 1
+            block[idx] += ","
+        lines.extend(block)
+        if rng.random() < 0.3:
+            lines.append(f"Note: case {i + 1} reviewed.")
+    return lines
+
+
+def make_test_plan_pdf(count: int, seed: int = 42, lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """A PDF with `count` embedded test cases; many of them straddle page breaks."""
+    return build_pdf(make_test_case_lines(count, seed=seed), lines_per_page=lines_per_page)
@@ -0,0 +1,61 @@
+"""
+Checks the test-case classifier (app/utils/classifier.py) against the previous
+positive/negative-only one: where the edge class changes results (on
+inputs/output-vinay.pdf and synthetic cases) and that CLASSIFIER_EDGE_CLASS=0
+gives exactly the previous results.
+Run (from the Backend directory): python verify_classifier.py
+"""
+
+import os
+
+from app.utils.classifier import TestCaseClassifier
+from app.utils.pdf_handler import extract_json_from_text, extract_page_texts
+from benchmarks.bench_classifier import legacy_classify_test_case, make_items
+
+SAMPLE_PDF = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inputs", "output-vinay.pdf")
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def sample_items():
+    """Test cases of the sample PDF as parsed, before classification."""
+    with open(SAMPLE_PDF, "rb") as f:
+        texts = extract_page_texts(f.read(), workers=1)
+    return extract_json_from_text("\n".join(texts))
+
+
+def verify_classifier():
+    results = []
+    current = TestCaseClassifier(edge_class=True)
+    legacy_mode = TestCaseClassifier(edge_class=False)
+
+    print("--- inputs/output-vinay.pdf ---")
+    items = sample_items()
+    old = [legacy_classify_test_case(dict(i)) for i in items]
+    new = current.classify_batch(items)
+    changed = [(i.get("title"), o, n) for i, o, n in zip(items, old, new) if o != n]
+    for title, o, n in changed:
+        print(f" {o} -> {n}: {title}")
+    results.append(check(len(changed) == 3 and all(o == "positive" and n == "edge" for _, o, n in changed),
+                         f"{len(items)} cases, {len(changed)} change, all positive -> edge"))
+    results.append(check(all(i.get("type") == "edge" for i, o, n in zip(items, old, new) if o != n),
+                         "the changed cases are typed \"edge\" in the PDF"))
+    results.append(check(legacy_mode.classify_batch(items) == old, "CLASSIFIER_EDGE_CLASS=0 matches the previous classifier"))
+
+    print("\n--- Synthetic cases ---")
+    items = make_items(5000)
+    old = [legacy_classify_test_case(dict(i)) for i in items]
+    new = current.classify_batch(items)
+    results.append(check(all(n == o for o, n in zip(old, new) if n != "edge"),
+                         f"only edge results differ ({new.count('edge')} of {len(items)})"))
+    results.append(check(legacy_mode.classify_batch(items) == old, "CLASSIFIER_EDGE_CLASS=0 matches the previous classifier"))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_classifier() else 1)
@@ -0,0 +1,76 @@
+"""
+Checks the JSON block scanner used for PDF ingestion (app/utils/json_scanner.py)
+against the previous extractor: same objects on tricky text, the same result
+however the text is split into pages, and linear time on brace noise.
+Run (from the Backend directory): python verify_json_scanner.py
+"""
+
+import time
+
+from app.utils.json_scanner import JsonBlockScanner
+from app.utils.pdf_handler import extract_json_from_text
+from benchmarks.bench_json_scanner import legacy_extract_json_from_text, make_text
+
+# text -> titles of the objects it should yield
+CASES = {
+    "prose brace then odd quote": ('Intro: use {placeholder syntax for "quotes. \n{"title": "A", "steps": ["x",]}\n{"title": "B"}',
+                                   ["A", "B"]),
+    "odd quote in an unfinished object": ('Note {"hint": "unclosed quote. \n{"title": "A"}\n{"title": "B"}', ["A", "B"]),
+    # the previous extractor lost this one (it counted braces inside strings)
+    "braces in string values": ('{"title": "Braces } and { inside", "steps": ["a}", "{b"]}', ["Braces } and { inside"]),
+    "trailing commas": ('{"title": "T", "steps": ["a", "b",], "extra": {"k": 1,},}', ["T"]),
+    "smart quotes": ('{“title”: “Smart”, “type”: “positive”}', ["Smart"]),
+    "nested object without title": ('{"suite": "x", "case": {"title": "Inner"}}', ["Inner"]),
+    "escaped quotes": ('{"title": "He said \\"hi\\"", "steps": []} then {"title": "Next"}', ['He said "hi"', "Next"]),
+    "no objects": ('Plain text with {braces} and "quotes" only {', []),
+}
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def scan_in_pieces(text: str, size: int):
+    scanner = JsonBlockScanner()
+    found = []
+    for i in range(0, len(text), size):
+        found.extend(scanner.feed(text[i:i + size]))
+    return found + scanner.close()
+
+
+def verify_json_scanner():
+    results = []
+
+    print("--- Tricky text ---")
+    for name, (text, titles) in CASES.items():
+        found = [o.get("title") for o in extract_json_from_text(text)]
+        old = [o.get("title") for o in legacy_extract_json_from_text(text)]
+        results.append(check(found == titles, f"{name}: {found} (previous extractor: {old})"))
+
+    print("\n--- Page splits ---")
+    ok = all(scan_in_pieces(text, size) == extract_json_from_text(text)
+             for text, _ in CASES.values() for size in range(1, 12))
+    results.append(check(ok, "every split of every case gives the same objects"))
+    sample = make_text(64 * 1024, noise="prose")
+    whole = extract_json_from_text(sample)
+    results.append(check(all(scan_in_pieces(sample, size) == whole for size in (97, 1000, 4096)),
+                         f"{len(whole)} objects from synthetic text however it is split"))
+
+    print("\n--- Synthetic text, same objects as the previous extractor ---")
+    for noise in ("prose", "braces"):
+        text = make_text(48 * 1024, noise=noise)
+        t = time.perf_counter()
+        new = extract_json_from_text(text)
+        new_t = time.perf_counter() - t
+        t = time.perf_counter()
+        old = legacy_extract_json_from_text(text)
+        old_t = time.perf_counter() - t
+        results.append(check(new == old, f"{noise}: {len(new)} objects, {new_t:.3f}s vs {old_t:.3f}s before"))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_json_scanner() else 1)
@@ -0,0 +1,288 @@
+"""
+Resumable batch generation for Marcus Intelligence.
+Reads URLs from a JSONL file and runs fetch -> extract -> generate for each as a
+pipeline: every stage has its own worker pool and concurrency limit, and
+bounded queues between stages keep a slow stage from piling up work.
+
+Progress is checkpointed per URL in the output directory:
+    results.jsonl   one line per finished URL (ok or error), appended as it happens
+    extracted/      extraction of every URL that got that far
+    suites/         generated test cases per URL
+A rerun with the same output directory skips URLs already in results.jsonl as
+ok (and reuses saved extractions), so a crash resumes where it left off.
+
+Input lines are objects with a "url" (optional "id" and "coverage") or bare URLs:
+    {"id": "shop", "url": "https://shop.example", "coverage": "comprehensive"}
+
+Run: python batch_cli.py urls.jsonl --out batch_output --fetch-concurrency 8 --llm-concurrency 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Set
+
+from generation_planner import iter_test_cases
+from http_cache import normalize_url
+from scrape import (
+    ExtractedWebsiteData,
+    extract_page,
+    fetch_page,
+    generate_test_cases,
+    validate_and_normalize_url,
+)
+
+BATCH_FETCH_CONCURRENCY = int(os.getenv("BATCH_FETCH_CONCURRENCY", "8"))
+BATCH_PARSE_CONCURRENCY = int(os.getenv("BATCH_PARSE_CONCURRENCY", "2"))
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+
+
+@dataclass
+class BatchJob:
+    """One URL to process, plus its timings as it moves through the stages."""
+    url: str
+    id: str
+    coverage: str
+    line: int
+    timings: Dict[str, float] = field(default_factory=dict)
+    resumed: bool = False  # extraction loaded from an earlier run
+
+
+def job_key(url: str) -> str:
+    """File-name-safe key for a URL: host plus a short hash of the normalized URL."""
+    normalized = normalize_url(url)
+    host = normalized.split("/")[2].replace(":", "_")
+    return f"{host}-{hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12]}"
+
+
+def read_jobs(path: str, default_coverage: str) -> List[BatchJob]:
+    """
+    Parse the input file; invalid and duplicate URLs are reported and skipped.
+
+    Args:
+        path: JSONL file of {"url": ...} objects or bare URLs
+        default_coverage: Coverage for lines without one
+
+    Returns:
+        Jobs in file order
+    """
+    jobs: List[BatchJob] = []
+    seen: Set[str] = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for n, raw in enumerate(f, 1):
+            raw = raw.strip()
+            if not raw or raw.startswith("#"):
+                continue
+            try:
+                entry = json.loads(raw) if raw.startswith("{") else {"url": raw}
+            except json.JSONDecodeError as e:
+                print(f" line {n}: invalid JSON ({e}), skipped")
+                continue
+            if not isinstance(entry, dict) or len(str(entry.get("url") or "").split()) != 1:
+                print(f" line {n}: no valid url, skipped")
+                continue
+            ok, url = validate_and_normalize_url(str(entry.get("url") or ""))
+            if not ok:
+                print(f" line {n}: no valid url, skipped")
+                continue
+            key = normalize_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            jobs.append(BatchJob(url, str(entry.get("id") or key), entry.get("coverage") or default_coverage, n))
+    return jobs
+
+
+def _write_json_atomic(path: str, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+class BatchRunner:
+    """
+    Pipelined fetch/extract/generate over a list of jobs, checkpointing to `out_dir`.
+
+    Each stage runs its blocking calls on its own thread pool, sized to the
+    stage's concurrency limit, so a slow stage never starves the others of threads.
+    """
+
+    def __init__(self, out_dir: str, fetch_concurrency: int = BATCH_FETCH_CONCURRENCY,
+                 parse_concurrency: int = BATCH_PARSE_CONCURRENCY, llm_concurrency: int = BATCH_LLM_CONCURRENCY,
+                 refresh: bool = False, sharded: bool = False):
+        self.out_dir = out_dir
+        self.limits = {"fetch": fetch_concurrency, "parse": parse_concurrency, "llm": llm_concurrency}
+        self.refresh = refresh
+        self.sharded = sharded
+        self.results_path = os.path.join(out_dir, "results.jsonl")
+        self.extracted_dir = os.path.join(out_dir, "extracted")
+        self.suites_dir = os.path.join(out_dir, "suites")
+        for d in (self.extracted_dir, self.suites_dir):
+            os.makedirs(d, exist_ok=True)
+        self.counts = {"ok": 0, "error": 0}
+        self._total = 0
+
+    def completed(self) -> Dict[str, str]:
+        """Status of every URL already in results.jsonl (last line wins; torn lines ignored)."""
+        status: Dict[str, str] = {}
+        if not os.path.exists(self.results_path):
+            return status
+        with open(self.results_path, "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    entry = json.loads(raw)
+                    status[normalize_url(entry["url"])] = entry["status"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return status
+
+    def _record(self, job: BatchJob, status: str, **extra):
+        entry = {"id": job.id, "url": job.url, "status": status, "coverage": job.coverage,
+                 "timings": {k: round(v, 3) for k, v in job.timings.items()}, "resumed": job.resumed, **extra}
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.counts[status] += 1
+        done = self.counts["ok"] + self.counts["error"]
+        detail = f"{extra.get('test_cases')} cases" if status == "ok" else f"{extra.get('stage')}: {extra.get('error')}"
+        print(f"[{done}/{self._total}] {status} {job.url} - {detail}")
+
+    def _load_extracted(self, job: BatchJob) -> Optional[ExtractedWebsiteData]:
+        path = os.path.join(self.extracted_dir, job_key(job.url) + ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return ExtractedWebsiteData(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _generate(self, extracted: ExtractedWebsiteData, coverage: str) -> List[Dict]:
+        if self.sharded:
+            return list(iter_test_cases(extracted, coverage, refresh=self.refresh))
+        return generate_test_cases(extracted, coverage, refresh=self.refresh)
+
+    async def _stage(self, name: str, pool: ThreadPoolExecutor, inbox: asyncio.Queue,
+                     outbox: Optional[asyncio.Queue], handle):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await inbox.get()
+            try:
+                if item is None:
+                    return
+                job, payload = item
+                t = time.perf_counter()
+                try:
+                    result = await loop.run_in_executor(pool, handle, job, payload)
+                except Exception as e:
+                    job.timings[name] = time.perf_counter() - t
+                    self._record(job, "error", stage=name, error=f"{type(e).__name__}: {e}")
+                    continue
+                job.timings[name] = time.perf_counter() - t
+                if outbox is not None:
+                    await outbox.put((job, result))
+                else:
+                    self._record(job, "ok", **result)
+            finally:
+                inbox.task_done()
+
+    def _fetch(self, job: BatchJob, _):
+        return fetch_page(job.url)
+
+    def _parse(self, job: BatchJob, page):
+        extracted = extract_page(page)
+        _write_json_atomic(os.path.join(self.extracted_dir, job_key(job.url) + ".json"), asdict(extracted))
+        return extracted
+
+    def _llm(self, job: BatchJob, extracted: ExtractedWebsiteData) -> Dict:
+        test_cases = self._generate(extracted, job.coverage)
+        suite = os.path.join(self.suites_dir, job_key(job.url) + ".json")
+        _write_json_atomic(suite, test_cases)
+        return {"test_cases": len(test_cases), "suite": os.path.relpath(suite, self.out_dir),
+                "extraction_errors": extracted.errors}
+
+    async def run(self, jobs: List[BatchJob], retry_failed: bool = True) -> Dict[str, int]:
+        """
+        Process every job not already finished in `out_dir`.
+
+        Args:
+            jobs: From read_jobs
+            retry_failed: Also rerun URLs whose last recorded result is an error
+
+        Returns:
+            Counts of ok / error results written by this run, plus skipped
+        """
+        done = self.completed()
+        skip = {"ok"} if retry_failed else {"ok", "error"}
+        todo = [j for j in jobs if done.get(normalize_url(j.url)) not in skip]
+        self._total = len(todo)
+        print(f"{len(jobs)} URLs, {len(jobs) - len(todo)} already done, {len(todo)} to process "
+              f"(fetch {self.limits['fetch']}, parse {self.limits['parse']}, llm {self.limits['llm']})")
+
+        fetch_q: asyncio.Queue = asyncio.Queue()
+        parse_q: asyncio.Queue = asyncio.Queue(maxsize=self.limits["parse"] * 2)
+        llm_q: asyncio.Queue = asyncio.Queue(maxsize=self.limits["llm"] * 2)
+        pools = {name: ThreadPoolExecutor(max_workers=n, thread_name_prefix=f"batch-{name}")
+                 for name, n in self.limits.items()}
+        stages = [
+            ("fetch", fetch_q, parse_q, self._fetch),
+            ("parse", parse_q, llm_q, self._parse),
+            ("llm", llm_q, None, self._llm),
+        ]
+        try:
+            workers = {name: [asyncio.create_task(self._stage(name, pools[name], inbox, outbox, handle))
+                              for _ in range(self.limits[name])]
+                       for name, inbox, outbox, handle in stages}
+            resumed = []
+            for job in todo:
+                extracted = self._load_extracted(job)
+                if extracted is None:
+                    fetch_q.put_nowait((job, None))
+                else:
+                    job.resumed = True
+                    resumed.append((job, extracted))
+            # URLs extracted by an earlier run go straight to the LLM stage
+            for item in resumed:
+                await llm_q.put(item)
+            # drain stage by stage, then stop that stage's workers
+            for name, inbox, _, _ in stages:
+                await inbox.join()
+                for _ in workers[name]:
+                    inbox.put_nowait(None)
+                await asyncio.gather(*workers[name])
+        finally:
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+        return {**self.counts, "skipped": len(jobs) - len(todo)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate test suites for many URLs, resumably")
+    parser.add_argument("input", help="JSONL file of {\"url\": ...} objects or bare URLs")
+    parser.add_argument("--out", default="batch_output", help="output and checkpoint directory")
+    parser.add_argument("--coverage", default="standard", choices=["basic", "standard", "comprehensive"])
+    parser.add_argument("--fetch-concurrency", type=int, default=BATCH_FETCH_CONCURRENCY)
+    parser.add_argument("--parse-concurrency", type=int, default=BATCH_PARSE_CONCURRENCY)
+    parser.add_argument("--llm-concurrency", type=int, default=BATCH_LLM_CONCURRENCY)
+    parser.add_argument("--skip-failed", action="store_true", help="do not retry URLs that failed in an earlier run")
+    parser.add_argument("--refresh", action="store_true", help="ignore cached generations")
+    parser.add_argument("--sharded", action="store_true", help="shard each generation by feature area")
+    args = parser.parse_args()
+
+    jobs = read_jobs(args.input, args.coverage)
+    runner = BatchRunner(args.out, args.fetch_concurrency, args.parse_concurrency, args.llm_concurrency,
+                         refresh=args.refresh, sharded=args.sharded)
+    t = time.perf_counter()
+    counts = asyncio.run(runner.run(jobs, retry_failed=not args.skip_failed))
+    print(f"Done in {time.perf_counter() - t:.1f}s: {counts['ok']} ok, {counts['error']} failed, "
+          f"{counts['skipped']} already done. Results in {runner.results_path}")
+    return 0 if counts["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
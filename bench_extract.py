@@ -0,0 +1,111 @@
+"""
+Benchmark for extract_website_intelligence: bs4/html.parser vs the single-pass
+lxml engine, with a field-by-field parity check.
+
+Pages are generated to look like large real-world HTML (inline scripts and
+styles, mega-menus, product grids, forms, comments, malformed markup); saved
+pages or live URLs can be added.
+
+Run: python bench_extract.py [--sizes 200,1000,4000] [--file page.html ...] [--url https://...]
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import asdict
+
+from scrape import _extract_bs4, _extract_lxml, scrape_website
+
+WORDS = (
+    "shop new arrivals free shipping on orders over fifty dollars customer reviews "
+    "sign in to your account track order help centre gift cards sustainability our "
+    "story careers press accessibility privacy terms cookies newsletter weekly deals"
+).split()
+
+
+def make_page(blocks: int, seed: int = 3) -> str:
+    """A storefront-like page with roughly `blocks` product cards."""
+    rng = random.Random(seed)
+
+    def words(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    parts = [
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>",
+        "<title> Big Store &amp; Co — Home </title>",
+        '<meta name="description" content="Everything you need, delivered.">',
+        "<link rel='stylesheet' href='/main.css'><style>" + ".c{color:red}" * 200 + "</style>",
+        "<script>window.__STATE__=" + json.dumps({"items": list(range(2000))}) + ";</script>",
+        "</head><body><header><nav class='mega-menu'><ul>",
+    ]
+    for i in range(60):
+        parts.append(f"<li><a href='/c/{i}' class='nav-link'>{words(2)}</a><ul>"
+                     + "".join(f"<li><a href='/c/{i}/{j}'>{words(1)}</a></li>" for j in range(8)) + "</ul></li>")
+    parts.append("</ul></nav><form role='search' action='/search'><input type='search' name='q' "
+                 "placeholder='Search products'><button>Search</button></form></header><main>")
+    for i in range(blocks):
+        parts.append(
+            f"<article class='product-card' data-sku='{i}'><a href='/p/{i}'><img src='/i/{i}.jpg' alt='{words(3)}'>"
+            f"<h3>{words(4)}</h3></a><span class=price>${rng.randint(5, 500)}.99</span>"
+            f"<p>{words(30)}</p><!-- rating widget {i} --><button class='add-to-cart' value='add'>Add to cart</button>"
+            + ("<p>unclosed paragraph <b>bold" if i % 50 == 0 else "")
+            + "</article>"
+        )
+        if i % 100 == 0:
+            parts.append(f"<section><h2>{words(3)}</h2><p>{words(60)}</p></section>")
+    parts.append(
+        "</main><section class='newsletter'><form method='post' action='/subscribe'>"
+        "<input type='email' name='email' required placeholder='you@example.com'>"
+        "<select name='freq'><option>weekly</option><option>daily</option></select>"
+        "<textarea name='note'></textarea><input type='submit' value='Subscribe'></form></section>"
+        "<noscript><a href='/nojs'>Enable JavaScript</a></noscript>"
+        f"<footer><p>{words(40)}</p><a href='/login'>Sign in</a></footer>"
+        "<script>console.log('tail')</script></body></html>"
+    )
+    return "".join(parts)
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def compare(name: str, html: str, repeat: int) -> bool:
+    legacy = asdict(_extract_bs4(html, name))
+    fast = asdict(_extract_lxml(html, name))
+    diff = [k for k in legacy if legacy[k] != fast[k]]
+
+    t_bs4 = _best_of(lambda: _extract_bs4(html, name), repeat)
+    t_lxml = _best_of(lambda: _extract_lxml(html, name), repeat)
+    print(f"{name:<28} {len(html) / 1e6:>7.2f} MB  bs4 {t_bs4 * 1000:>8.1f} ms  "
+          f"lxml {t_lxml * 1000:>7.1f} ms  x{t_bs4 / t_lxml:>5.1f}  "
+          f"{'identical' if not diff else 'differs: ' + ', '.join(diff)}")
+    return not diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="200,1000,4000", help="product cards per generated page")
+    parser.add_argument("--file", action="append", default=[], help="saved HTML page to include")
+    parser.add_argument("--url", action="append", default=[], help="live page to fetch and include")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = [(f"generated-{n}", make_page(int(n))) for n in args.sizes.split(",") if n]
+    for path in args.file:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((path, f.read()))
+    for url in args.url:
+        pages.append((url, scrape_website(url)))
+
+    ok = all([compare(name, html, args.repeat) for name, html in pages])
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,445 @@
+"""
+Concurrent same-origin crawler for Marcus Intelligence.
+Follows links from a landing page breadth-first, extracts every page with
+extract_website_intelligence and merges the results into one ExtractedWebsiteData,
+so test generation sees the whole site instead of the landing page only.
+"""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_cache import normalize_url
+from scrape import DEFAULT_HEADERS, SCRAPE_MAX_BYTES, ExtractedWebsiteData, extract_website_intelligence, truncation_note
+
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", "20"))
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", "2"))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "8"))
+CRAWL_PER_HOST = int(os.getenv("CRAWL_PER_HOST", "2"))
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0.25"))
+CRAWL_TIMEOUT = float(os.getenv("CRAWL_TIMEOUT", "20"))
+
+# Limits of the merged result (per-page extraction keeps its own limits)
+MERGED_MAX_FORMS = 20
+MERGED_MAX_BUTTONS = 40
+MERGED_TEXT_CHARS = 16000
+
+# Links to these are never HTML pages worth extracting
+SKIP_EXTENSIONS = (
+    ".pdf", ".zip", ".gz", ".tar", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico",
+    ".css", ".js", ".json", ".xml", ".mp4", ".mp3", ".woff", ".woff2", ".ttf", ".exe", ".dmg",
+)
+
+# httpx negotiates its own encodings (brotli only if installed)
+CRAWL_HEADERS = {k: v for k, v in DEFAULT_HEADERS.items() if k not in ("Accept-Encoding", "Connection")}
+
+
+@dataclass
+class CrawlConfig:
+    """Crawl limits and politeness settings."""
+    max_pages: int = CRAWL_MAX_PAGES
+    max_depth: int = CRAWL_MAX_DEPTH
+    concurrency: int = CRAWL_CONCURRENCY
+    per_host: int = CRAWL_PER_HOST
+    delay: float = CRAWL_DELAY
+    timeout: float = CRAWL_TIMEOUT
+    max_bytes: int = SCRAPE_MAX_BYTES  # per-page body cap, 0 = none
+    respect_robots: bool = True
+
+
+@dataclass
+class PageResult:
+    """Outcome of fetching and extracting one page."""
+    url: str
+    depth: int
+    status: Optional[int] = None
+    extracted: Optional[ExtractedWebsiteData] = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class CrawlResult:
+    """All crawled pages plus their merged extraction."""
+    root_url: str
+    pages: List[PageResult]
+    merged: ExtractedWebsiteData
+    elapsed: float
+    skipped_robots: List[str] = field(default_factory=list)
+
+
+async def _read_body(resp: httpx.Response, max_bytes: int) -> Tuple[bytes, bool]:
+    """Read a streamed body up to max_bytes; returns (body, truncated)."""
+    chunks = []
+    size = 0
+    async for chunk in resp.aiter_bytes():
+        if max_bytes and size + len(chunk) > max_bytes:
+            chunks.append(chunk[:max_bytes - size])
+            return b"".join(chunks), True
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks), False
+
+
+def _origin(url: str) -> Tuple[str, str]:
+    parsed = urlparse(normalize_url(url))
+    return parsed.scheme, parsed.netloc
+
+
+def extract_links(html: str, base_url: str) -> List[str]:
+    """
+    Same-document-order list of absolute, normalized http(s) links in `html`.
+
+    Args:
+        html: Raw HTML content
+        base_url: URL the HTML was fetched from (after redirects)
+
+    Returns:
+        Normalized URLs, without duplicates
+    """
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer(["a", "base"]))
+    base_tag = soup.find("base", href=True)
+    base = urljoin(base_url, base_tag["href"]) if base_tag else base_url
+    links: List[str] = []
+    seen: Set[str] = set()
+    for a in soup.find_all("a", href=True):
+        href = a["href"].strip()
+        if not href or href.startswith(("#", "mailto:", "tel:", "javascript:", "data:")):
+            continue
+        absolute = urljoin(base, href)
+        if urlparse(absolute).scheme not in ("http", "https"):
+            continue
+        if urlparse(absolute).path.lower().endswith(SKIP_EXTENSIONS):
+            continue
+        normalized = normalize_url(absolute)
+        if normalized not in seen:
+            seen.add(normalized)
+            links.append(normalized)
+    return links
+
+
+class HostThrottle:
+    """Per-host concurrency limit plus a minimum delay between request starts."""
+
+    def __init__(self, per_host: int, delay: float):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+        self._delays: Dict[str, float] = {}
+
+    def set_delay(self, host: str, delay: float):
+        """Per-host override, e.g. a robots.txt Crawl-delay."""
+        self._delays[host] = max(self.delay, delay)
+
+    def semaphore(self, host: str) -> asyncio.Semaphore:
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.per_host)
+            self._locks[host] = asyncio.Lock()
+        return self._semaphores[host]
+
+    async def wait_turn(self, host: str):
+        """Sleep until this host may receive the next request."""
+        self.semaphore(host)
+        async with self._locks[host]:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, 0.0))
+            self._next_start[host] = start + self._delays.get(host, self.delay)
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class SiteCrawler:
+    """
+    Breadth-first crawler over one origin.
+
+    A fixed pool of worker tasks takes URLs from the frontier queue; every URL is
+    admitted to the frontier at most once and only while the page budget lasts.
+    All requests share one keep-alive connection pool.
+    """
+
+    def __init__(self, root_url: str, config: Optional[CrawlConfig] = None, client: Optional[httpx.AsyncClient] = None):
+        self.root_url = normalize_url(root_url)
+        self.origin = _origin(self.root_url)
+        self.config = config or CrawlConfig()
+        self._client = client
+        self._owns_client = client is None
+        self.throttle = HostThrottle(self.config.per_host, self.config.delay)
+        self._robots: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_lock = asyncio.Lock()
+        self._seen: Set[str] = set()
+        self._queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+        self.pages: List[PageResult] = []
+        self.skipped_robots: List[str] = []
+
+    def _admit(self, url: str, depth: int) -> bool:
+        """Add `url` to the frontier unless seen, off-origin, too deep or over budget."""
+        if url in self._seen or depth > self.config.max_depth:
+            return False
+        if _origin(url) != self.origin:
+            return False
+        if len(self._seen) >= self.config.max_pages:
+            return False
+        self._seen.add(url)
+        self._queue.put_nowait((url, depth))
+        return True
+
+    async def _robots_for(self, url: str) -> Optional[RobotFileParser]:
+        scheme, host = _origin(url)
+        if host in self._robots:
+            return self._robots[host]
+        async with self._robots_lock:
+            if host in self._robots:
+                return self._robots[host]
+            parser: Optional[RobotFileParser] = None
+            try:
+                resp = await self._client.get(f"{scheme}://{host}/robots.txt")
+                if resp.status_code == 200:
+                    parser = RobotFileParser()
+                    parser.parse(resp.text.splitlines())
+                    crawl_delay = parser.crawl_delay(CRAWL_HEADERS["User-Agent"])
+                    if crawl_delay:
+                        self.throttle.set_delay(host, float(crawl_delay))
+            except httpx.HTTPError:
+                parser = None  # unreachable robots.txt: allow everything
+            self._robots[host] = parser
+            return parser
+
+    async def _allowed(self, url: str) -> bool:
+        if not self.config.respect_robots:
+            return True
+        parser = await self._robots_for(url)
+        return parser is None or parser.can_fetch(CRAWL_HEADERS["User-Agent"], url)
+
+    async def _fetch(self, url: str, depth: int) -> PageResult:
+        result = PageResult(url=url, depth=depth)
+        host = _origin(url)[1]
+        t = time.perf_counter()
+        try:
+            async with self.throttle.semaphore(host):
+                await self.throttle.wait_turn(host)
+                # streamed, so skipped and oversized bodies are never downloaded in full
+                async with self._client.stream("GET", url) as resp:
+                    result.status = resp.status_code
+                    resp.raise_for_status()
+                    content_type = resp.headers.get("content-type", "")
+                    if "html" not in content_type:
+                        result.error = f"skipped non-HTML content ({content_type or 'unknown'})"
+                        return result
+                    final_url = normalize_url(str(resp.url))
+                    if _origin(final_url) != self.origin:
+                        result.error = f"redirected off-site to {final_url}"
+                        return result
+                    body, truncated = await _read_body(resp, self.config.max_bytes)
+            self._seen.add(final_url)
+            html = body.decode(resp.encoding or "utf-8", errors="replace")
+            # parsing is CPU-bound; keep the event loop fetching meanwhile
+            result.extracted = await asyncio.to_thread(extract_website_intelligence, html, final_url)
+            if truncated:
+                result.extracted.errors.insert(0, truncation_note(len(body), self.config.max_bytes, "CrawlConfig.max_bytes"))
+            if depth < self.config.max_depth:
+                for link in await asyncio.to_thread(extract_links, html, final_url):
+                    self._admit(link, depth + 1)
+        except httpx.HTTPStatusError as e:
+            result.error = f"HTTP {e.response.status_code}"
+        except httpx.HTTPError as e:
+            result.error = f"{type(e).__name__}: {e}"
+        finally:
+            result.elapsed = time.perf_counter() - t
+        return result
+
+    async def _worker(self):
+        while True:
+            url, depth = await self._queue.get()
+            try:
+                if await self._allowed(url):
+                    self.pages.append(await self._fetch(url, depth))
+                else:
+                    self.skipped_robots.append(url)
+            except Exception as e:
+                self.pages.append(PageResult(url=url, depth=depth, error=f"{type(e).__name__}: {e}"))
+            finally:
+                self._queue.task_done()
+
+    async def run(self) -> CrawlResult:
+        t = time.perf_counter()
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=self.config.concurrency,
+                max_keepalive_connections=self.config.concurrency,
+            )
+            self._client = httpx.AsyncClient(
+                headers=CRAWL_HEADERS,
+                timeout=self.config.timeout,
+                limits=limits,
+                follow_redirects=True,
+            )
+        workers = [asyncio.create_task(self._worker()) for _ in range(max(1, self.config.concurrency))]
+        try:
+            self._admit(self.root_url, 0)
+            await self._queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if self._owns_client:
+                await self._client.aclose()
+        # breadth-first order, landing page first
+        self.pages.sort(key=lambda p: (p.depth, p.url != self.root_url))
+        merged = merge_extractions(self.root_url, self.pages)
+        return CrawlResult(
+            root_url=self.root_url,
+            pages=self.pages,
+            merged=merged,
+            elapsed=time.perf_counter() - t,
+            skipped_robots=self.skipped_robots,
+        )
+
+
+def merge_extractions(root_url: str, pages: List[PageResult]) -> ExtractedWebsiteData:
+    """
+    Merge per-page extractions into one ExtractedWebsiteData.
+
+    Args:
+        root_url: URL of the landing page
+        pages: Crawled pages, landing page first
+
+    Returns:
+        Title/description from the landing page (or the first page that has them),
+        forms and buttons deduplicated across pages, features OR-ed, page texts
+        sharing the text budget, and fetch/extraction errors prefixed with their URL
+    """
+    extracted = [p.extracted for p in pages if p.extracted is not None]
+    errors: List[str] = []
+    for p in pages:
+        if p.error and p.extracted is None:
+            errors.append(f"{p.url}: {p.error}")
+        if p.extracted is not None:
+            errors.extend(f"{p.url}: {e}" for e in p.extracted.errors)
+
+    if not extracted:
+        return ExtractedWebsiteData(
+            url=root_url, title="Untitled", description="", forms=[], buttons=[], features={},
+            text_summary="", dom_structure="{}", errors=errors or [f"{root_url}: no page could be crawled"],
+        )
+
+    title = next((e.title for e in extracted if e.title and e.title != "Untitled"), "Untitled")
+    description = next((e.description for e in extracted if e.description), "")
+
+    forms: List[Dict] = []
+    form_keys = set()
+    for e in extracted:
+        path = urlparse(e.url).path or "/"
+        for form in e.forms:
+            key = (form.get("method"), form.get("action"), tuple(i.get("name") for i in form.get("inputs", [])))
+            if key in form_keys:
+                continue
+            form_keys.add(key)
+            forms.append({**form, "page": path})
+    forms = forms[:MERGED_MAX_FORMS]
+
+    buttons: List[str] = []
+    button_set = set()
+    for e in extracted:
+        for b in e.buttons:
+            if b not in button_set:
+                button_set.add(b)
+                buttons.append(b)
+    buttons = buttons[:MERGED_MAX_BUTTONS]
+
+    features: Dict[str, bool] = {}
+    for e in extracted:
+        for k, v in e.features.items():
+            features[k] = features.get(k, False) or bool(v)
+
+    # every page gets an equal share of the text budget; unused share rolls over
+    remaining = MERGED_TEXT_CHARS
+    parts: List[str] = []
+    for n, e in enumerate(extracted):
+        share = remaining // (len(extracted) - n)
+        header = f"[{urlparse(e.url).path or '/'}] "
+        chunk = (header + e.text_summary)[:share]
+        parts.append(chunk)
+        remaining -= len(chunk) + 1
+    text_summary = "\n".join(parts)
+
+    structure: Dict[str, object] = {"pages_crawled": len(extracted)}
+    for e in extracted:
+        try:
+            dom = json.loads(e.dom_structure)
+        except ValueError:
+            continue
+        for k, v in dom.items():
+            if isinstance(v, bool):
+                structure[k] = bool(structure.get(k)) or v
+            elif isinstance(v, (int, float)):
+                structure[k] = structure.get(k, 0) + v
+
+    return ExtractedWebsiteData(
+        url=root_url,
+        title=title,
+        description=description,
+        forms=forms,
+        buttons=buttons,
+        features={k: v for k, v in features.items() if v},
+        text_summary=text_summary,
+        dom_structure=json.dumps(structure, indent=2),
+        errors=errors,
+    )
+
+
+async def crawl_site(url: str, config: Optional[CrawlConfig] = None, client: Optional[httpx.AsyncClient] = None) -> CrawlResult:
+    """
+    Crawl `url` and its same-origin links.
+
+    Args:
+        url: Landing page URL
+        config: Crawl limits (defaults from CRAWL_* environment variables)
+        client: Optional shared httpx.AsyncClient (created and closed here otherwise)
+
+    Returns:
+        CrawlResult with every page and the merged extraction
+    """
+    return await SiteCrawler(url, config=config, client=client).run()
+
+
+def crawl_website(url: str, **config) -> ExtractedWebsiteData:
+    """
+    Synchronous entry point: crawl and return the merged extraction.
+
+    Args:
+        url: Landing page URL
+        **config: CrawlConfig fields (max_pages, max_depth, ...)
+
+    Returns:
+        Merged ExtractedWebsiteData for the site
+    """
+    result = asyncio.run(crawl_site(url, CrawlConfig(**config)))
+    print(f" Crawled {len(result.pages)} pages in {result.elapsed:.1f}s")
+    return result.merged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Crawl a site and print the merged extraction summary")
+    parser.add_argument("url")
+    parser.add_argument("--pages", type=int, default=CRAWL_MAX_PAGES)
+    parser.add_argument("--depth", type=int, default=CRAWL_MAX_DEPTH)
+    parser.add_argument("--concurrency", type=int, default=CRAWL_CONCURRENCY)
+    args = parser.parse_args()
+
+    res = asyncio.run(crawl_site(args.url, CrawlConfig(max_pages=args.pages, max_depth=args.depth, concurrency=args.concurrency)))
+    for page in res.pages:
+        print(f"  d{page.depth} {page.status or '---'} {page.elapsed:6.2f}s {page.url} {page.error or ''}")
+    m = res.merged
+    print(f"{len(res.pages)} pages in {res.elapsed:.2f}s: {len(m.forms)} forms, {len(m.buttons)} buttons, features={list(m.features)}")
@@ -0,0 +1,159 @@
+"""
+Small size-bounded on-disk cache for Marcus Intelligence.
+One JSON file per key; least recently used entries are evicted once the
+directory grows past max_bytes, and entries can carry an expiry time.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """
+    JSON-value cache stored under `directory`.
+
+    Reads refresh an entry's mtime, so eviction (oldest mtime first) is LRU.
+    Writes go to a uniquely named temporary file that is renamed into place, so
+    readers never see a half-written entry and concurrent writers (threads or
+    processes) of the same key cannot mix their data; the last rename wins.
+    Writes are best-effort: a failed one (disk full, permissions) is reported
+    and leaves the cache without the entry.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, default_ttl: Optional[float] = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._bytes_since_evict = 0
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored value for `key`, or None if missing, expired or unreadable.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The value passed to set()
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Store a JSON-serializable value.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until the entry expires (default_ttl if None; no expiry if both None)
+
+        Returns:
+            True if the entry was written
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        entry = {
+            "key": key,
+            "stored_at": time.time(),
+            "expires_at": time.time() + ttl if ttl is not None else None,
+            "value": value,
+        }
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+            with open(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f" Cache write skipped ({type(e).__name__}: {e})")
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            return False
+        self._bytes_since_evict += len(data)
+        # a full directory scan per write would dominate small writes
+        if self._bytes_since_evict >= self.max_bytes // 20:
+            self.evict()
+        return True
+
+    def touch(self, key: str):
+        """Mark an entry as recently used without reading it."""
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    os.remove(os.path.join(root, name))
+                except OSError:
+                    pass
+
+    def size(self) -> int:
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+        return total
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        self._bytes_since_evict = 0
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
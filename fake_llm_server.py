@@ -0,0 +1,172 @@
+"""
+Local OpenAI-compatible chat completions server for Marcus Intelligence checks.
+Answers POST /v1/chat/completions with a deterministic JSON array of test cases
+(as many as the lower bound of "Generate N-M test cases" in the prompt) and
+reports token usage, so generation code can be exercised without an API key.
+With "stream": true the array is sent as server-sent event chunks, a few
+characters per token, like the real streaming API.
+
+Run: python fake_llm_server.py --port 8099
+then OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=fake streamlit run main.py
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+TYPES = ("positive", "negative", "edge")
+
+
+def fake_test_cases(prompt: str) -> List[Dict]:
+    """
+    Deterministic test cases for a prompt. The first case is the same for every
+    prompt, like the "page loads" case real models open most answers with.
+    """
+    m = re.search(r"Generate (\d+)(?:-\d+)? test cases", prompt)
+    count = int(m.group(1)) if m else 5
+    tag = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:6]
+    return [
+        {
+            "id": i,
+            "type": TYPES[(i - 1) % len(TYPES)],
+            "title": "Page loads successfully" if i == 1 else f"Check {tag} scenario {i}",
+            "description": f"Scenario {i} for prompt {tag}",
+            "expected_result": "Page responds as described",
+            "steps": ["Open the page", f"Perform action {i} ({tag})"],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that records every request body it answers."""
+
+    def __init__(self, address, delay: float = 0.0, token_delay: float = 0.0):
+        super().__init__(address, FakeLLMHandler)
+        self.delay = delay              # before the first token
+        self.token_delay = token_delay  # between streamed tokens
+        self.requests: List[Dict] = []
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_on: Optional[str] = None  # answer 400 to prompts containing this text
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up mid-response are expected
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": "not found"}})
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests.append(body)
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        try:
+            self._complete(body)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _complete(self, body: Dict):
+        prompt = "\n".join(m.get("content") or "" for m in body.get("messages", []))
+        if self.server.fail_on and self.server.fail_on in prompt:
+            return self._json(400, {"error": {"message": "rejected by fake server", "type": "invalid_request_error"}})
+        content = json.dumps(fake_test_cases(prompt), indent=2)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        usage = {"prompt_tokens": _tokens(prompt), "completion_tokens": _tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage")
+            return self._stream(body.get("model", "fake"), content, usage if include_usage else None)
+        if self.server.token_delay:
+            time.sleep(self.server.token_delay * -(-len(content) // 4))  # whole completion is generated first
+        self._json(200, {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _stream(self, model: str, content: str, usage=None):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, **extra):
+            chunk = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i in range(0, len(content), 4):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            event([{"index": 0, "delta": {"content": content[i:i + 4]}, "finish_reason": None}])
+        event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if usage:
+            event([], usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _json(self, status: int, payload: Dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_llm_server(port: int = 0, delay: float = 0.0, token_delay: float = 0.0) -> Tuple[FakeLLMServer, str]:
+    """
+    Start the server on a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        delay: Seconds to wait before answering each request
+        token_delay: Seconds between streamed tokens
+
+    Returns:
+        (server, base_url) - pass base_url as OPENAI_BASE_URL; call server.shutdown() when done
+    """
+    server = FakeLLMServer(("127.0.0.1", port), delay=delay, token_delay=token_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible fake LLM server")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed tokens")
+    args = parser.parse_args()
+    server = FakeLLMServer(("127.0.0.1", args.port), delay=args.delay, token_delay=args.token_delay)
+    print(f"Fake LLM listening on {server.base_url}")
+    server.serve_forever()
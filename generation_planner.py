@@ -0,0 +1,198 @@
+"""
+Sharded test generation for Marcus Intelligence.
+Large coverage levels are split into one LLM request per detected feature area
+(navigation, forms, auth, search, content). The requests run concurrently and
+their results are merged, deduplicated and renumbered, so wall time is close
+to that of the largest shard instead of one long 70-80 case completion.
+"""
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Set
+
+from scrape import COVERAGE_MAP, ExtractedWebsiteData, generate_test_cases, site_prompt, stream_test_cases
+
+GENERATION_SHARDING = os.getenv("GENERATION_SHARDING", "1") != "0"
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "4"))
+# Coverage levels asking for fewer cases than this go out as a single request
+GENERATION_SHARD_MIN_CASES = int(os.getenv("GENERATION_SHARD_MIN_CASES", "50"))
+SHARD_MIN_COUNT = 5
+
+# Focus instructions per area, in the order shards are planned
+AREAS = {
+    "navigation": "Navigation and page structure: page load, header/nav/footer links, menus, buttons and layout",
+    "forms": "Form inputs and validation (other than login and search): required fields, input types, "
+             "boundary values and error messages",
+    "auth": "Login, sign-up and account flows without payment: valid and invalid credentials, "
+            "empty fields, password handling, logout",
+    "search": "Search: queries with results, no results, special characters, very long input, empty query",
+    "content": "Content display and read-only interactions: text, listings, product or article pages, "
+               "comments and reviews",
+}
+
+# Relative share of the test case budget
+AREA_WEIGHTS = {"navigation": 3, "forms": 2, "auth": 2, "search": 1, "content": 2}
+
+
+@dataclass
+class Shard:
+    """One generation request: a feature area and how many cases to ask for."""
+    area: str
+    focus: str
+    count: int
+
+
+def _input_types(form: Dict) -> Set[str]:
+    return {str(i.get("type") or "").lower() for i in form.get("inputs", [])}
+
+
+def _is_search_form(form: Dict) -> bool:
+    names = {str(i.get("name") or "").lower() for i in form.get("inputs", [])}
+    return "search" in _input_types(form) or bool(names & {"q", "query", "search", "s"})
+
+
+def _is_auth_form(form: Dict) -> bool:
+    return "password" in _input_types(form)
+
+
+def detect_areas(extracted: ExtractedWebsiteData) -> List[str]:
+    """
+    Feature areas worth a shard, from the extracted features, forms and text.
+
+    Navigation is always included.
+    """
+    features = extracted.features or {}
+    forms = extracted.forms or []
+    areas = ["navigation"]
+    if any(not _is_search_form(f) and not _is_auth_form(f) for f in forms):
+        areas.append("forms")
+    if features.get("has_auth") or any(_is_auth_form(f) for f in forms):
+        areas.append("auth")
+    if features.get("has_search") or any(_is_search_form(f) for f in forms):
+        areas.append("search")
+    if features.get("is_ecommerce") or features.get("has_comments") or len(extracted.text_summary or "") > 500:
+        areas.append("content")
+    return areas
+
+
+def plan_shards(extracted: ExtractedWebsiteData, coverage: str) -> List[Shard]:
+    """
+    Split a coverage level into per-area requests.
+
+    The lower bound of the coverage range is shared between the detected areas
+    by AREA_WEIGHTS (largest remainder, at least SHARD_MIN_COUNT each). Small
+    coverage levels, sites with a single area and GENERATION_SHARDING=0 give an
+    empty plan, meaning one unsharded request.
+
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+
+    Returns:
+        Shards in AREAS order, or [] for a single request
+    """
+    total = int(COVERAGE_MAP.get(coverage, "30-40").split("-")[0])
+    areas = detect_areas(extracted)
+    if not GENERATION_SHARDING or total < GENERATION_SHARD_MIN_CASES or len(areas) < 2:
+        return []
+
+    weights = {a: AREA_WEIGHTS[a] for a in areas}
+    spare = total - SHARD_MIN_COUNT * len(areas)
+    exact = {a: spare * w / sum(weights.values()) for a, w in weights.items()}
+    counts = {a: SHARD_MIN_COUNT + int(exact[a]) for a in areas}
+    for a in sorted(areas, key=lambda a: exact[a] - int(exact[a]), reverse=True)[:total - sum(counts.values())]:
+        counts[a] += 1
+    return [Shard(a, AREAS[a], counts[a]) for a in areas]
+
+
+def _dedup_keys(test_case: Dict) -> List[str]:
+    def norm(text) -> str:
+        return re.sub(r"[^a-z0-9]+", " ", str(text or "").lower()).strip()
+
+    keys = ["title:" + norm(test_case.get("title"))]
+    steps = test_case.get("steps") or []
+    if len(steps) > 1:
+        # same actions with the same expectation under a different title
+        keys.append("steps:" + "|".join(norm(s) for s in steps) + "=>" + norm(test_case.get("expected_result")))
+    return keys
+
+
+def generate_sharded(extracted: ExtractedWebsiteData, coverage: str, shards: List[Shard],
+                     refresh: bool = False, concurrency: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Run the shards concurrently and yield merged test cases as shards finish.
+
+    Cases are tagged with their "area", renumbered 1..N in the order they are
+    yielded, and dropped when their title, or their steps together with the
+    expected result, repeat a case already yielded. Each shard is cached
+    separately (see generate_test_cases).
+
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+        shards: From plan_shards
+        refresh: Ignore cached generations
+        concurrency: Requests in flight at once (defaults to GENERATION_CONCURRENCY)
+
+    Yields:
+        Test case dictionaries
+
+    Raises:
+        Exception: The first shard's error, if every shard failed
+    """
+    workers = max(1, min(concurrency or GENERATION_CONCURRENCY, len(shards)))
+    seen: Set[str] = set()
+    errors: List[Exception] = []
+    next_id = 1
+    # every shard sends the same site section; build it once
+    site = site_prompt(extracted)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gen-shard") as pool:
+        futures = {
+            pool.submit(generate_test_cases, extracted, coverage, refresh, shard.focus, shard.count, site): shard
+            for shard in shards
+        }
+        try:
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    cases = future.result()
+                except Exception as e:
+                    print(f" Shard '{shard.area}' failed: {e}")
+                    errors.append(e)
+                    continue
+                for tc in cases:
+                    keys = _dedup_keys(tc)
+                    if any(k in seen for k in keys):
+                        continue
+                    seen.update(keys)
+                    yield {**tc, "id": next_id, "area": shard.area}
+                    next_id += 1
+        finally:
+            # consumer stopped early: do not start shards that are still queued
+            for future in futures:
+                future.cancel()
+    if errors and len(errors) == len(shards):
+        raise errors[0]
+
+
+def iter_test_cases(extracted: ExtractedWebsiteData, coverage: str, refresh: bool = False) -> Iterator[Dict]:
+    """
+    Test cases for a site, sharded by feature area when the plan calls for it
+    and streamed from a single request otherwise.
+
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+        refresh: Ignore cached generations
+
+    Yields:
+        Test case dictionaries
+    """
+    shards = plan_shards(extracted, coverage)
+    if not shards:
+        yield from stream_test_cases(extracted, coverage, refresh=refresh)
+        return
+    print(f" Generating in {len(shards)} shards: " + ", ".join(f"{s.area}={s.count}" for s in shards))
+    yield from generate_sharded(extracted, coverage, shards, refresh=refresh)
@@ -0,0 +1,250 @@
+"""
+Conditional-request HTTP cache for scraped pages.
+Responses are stored on disk by normalized URL together with their validators
+(ETag, Last-Modified) and freshness (Cache-Control max-age / Expires). Fresh
+entries are served without a request; stale ones are revalidated with
+If-None-Match / If-Modified-Since, so an unchanged page costs a 304 and no body.
+"""
+
+import codecs
+import os
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+import requests
+
+from disk_cache import DiskCache
+
+HTTP_CACHE_ENABLED = os.getenv("SCRAPE_CACHE", "1") != "0"
+HTTP_CACHE_DIR = os.getenv("SCRAPE_CACHE_DIR", os.path.join(".cache", "http"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("SCRAPE_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL, used as cache key and for crawl-frontier dedup.
+
+    Lowercases scheme and host, drops default ports and the fragment, and turns an
+    empty path into "/".
+
+    Examples:
+        >>> normalize_url("HTTPS://Example.com:443/a#top")
+        'https://example.com/a'
+        >>> normalize_url("http://example.com")
+        'http://example.com/'
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    return urlunparse((scheme, host, parsed.path or "/", "", parsed.query, ""))
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """
+    Parse a Cache-Control header into {directive: argument}.
+
+    Examples:
+        >>> parse_cache_control('public, max-age=300, no-cache="set-cookie"')
+        {'public': None, 'max-age': '300', 'no-cache': 'set-cookie'}
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition("=")
+        directives[name.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def freshness_lifetime(headers) -> Optional[float]:
+    """
+    Seconds a response may be served without revalidation: Cache-Control max-age,
+    else Expires minus Date. None if the response says nothing about freshness.
+    """
+    cc = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-cache" in cc:
+        return 0.0
+    if "max-age" in cc:
+        try:
+            return max(0.0, float(cc["max-age"]))
+        except (TypeError, ValueError):
+            return 0.0
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            date = headers.get("Date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0.0
+    return None
+
+
+def read_capped(response: requests.Response, max_bytes: Optional[int] = None,
+                should_stop: Optional[Callable[[str], bool]] = None) -> Tuple[str, int, bool]:
+    """
+    Read and decode a streamed (stream=True) response body chunk by chunk.
+
+    Args:
+        response: Response opened with stream=True; closed on return
+        max_bytes: Stop after this many body bytes (None or 0: no cap)
+        should_stop: Called with each decoded piece; returning True stops the read
+
+    Returns:
+        (text, bytes_read, truncated) where truncated means the body was not read to the end
+    """
+    encoding = response.encoding or "utf-8"
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pieces = []
+    bytes_read = 0
+    truncated = False
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            if max_bytes and bytes_read + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - bytes_read]
+                truncated = True
+            bytes_read += len(chunk)
+            piece = decoder.decode(chunk)
+            pieces.append(piece)
+            if truncated:
+                break
+            if should_stop and piece and should_stop(piece):
+                truncated = True
+                break
+        if not truncated:
+            pieces.append(decoder.decode(b"", final=True))
+    finally:
+        response.close()
+    return "".join(pieces), bytes_read, truncated
+
+
+@dataclass
+class CachedResponse:
+    """Body of a fetch plus how the cache was involved."""
+    url: str
+    status: int
+    text: str
+    from_cache: bool      # body came from disk
+    revalidated: bool     # a conditional request was answered with 304
+    bytes_read: int = 0   # body bytes downloaded (0 when served from disk)
+    truncated: bool = False  # body was cut short by max_bytes / should_stop
+
+
+class HTTPCache:
+    """
+    Disk-backed HTTP cache in front of a requests.Session.
+
+    Only successful GET responses are stored, and only when they carry a validator
+    or a freshness lifetime; `Cache-Control: no-store` is honoured. Truncated
+    bodies are never stored.
+    """
+
+    def __init__(self, cache: DiskCache, session: Optional[requests.Session] = None):
+        self.cache = cache
+        self.session = session or requests.Session()
+        self.stats = {"fresh_hits": 0, "revalidated": 0, "misses": 0, "stored": 0}
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, max_bytes: Optional[int] = None,
+            should_stop: Optional[Callable[[str], bool]] = None, **kwargs) -> CachedResponse:
+        """
+        GET `url` through the cache.
+
+        Args:
+            url: URL to fetch
+            headers: Request headers
+            max_bytes: Stream the body and stop after this many bytes (see read_capped)
+            should_stop: Streamed-body callback that can end the download early
+            **kwargs: Passed to requests.Session.get (timeout, allow_redirects, ...)
+
+        Returns:
+            CachedResponse with the page body
+
+        Raises:
+            requests.HTTPError: For error statuses (never cached)
+        """
+        key = normalize_url(url)
+        entry = self.cache.get(key)
+        now = time.time()
+
+        if entry and entry.get("fresh_until") and now < entry["fresh_until"]:
+            self.stats["fresh_hits"] += 1
+            return CachedResponse(entry["url"], entry["status"], entry["text"], from_cache=True, revalidated=False)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        stream = bool(max_bytes or should_stop)
+        response = self.session.get(url, headers=request_headers, stream=stream, **kwargs)
+
+        if response.status_code == 304 and entry:
+            response.close()
+            self.stats["revalidated"] += 1
+            # a 304 may update validators and freshness
+            entry["etag"] = response.headers.get("ETag") or entry.get("etag")
+            entry["last_modified"] = response.headers.get("Last-Modified") or entry.get("last_modified")
+            lifetime = freshness_lifetime(response.headers)
+            entry["fresh_until"] = now + lifetime if lifetime else None
+            self.cache.set(key, entry)
+            return CachedResponse(entry["url"], entry["status"], entry["text"], from_cache=True, revalidated=True)
+
+        if not response.ok:
+            response.close()
+        response.raise_for_status()
+        self.stats["misses"] += 1
+        if stream:
+            text, bytes_read, truncated = read_capped(response, max_bytes, should_stop)
+        else:
+            text, bytes_read, truncated = response.text, len(response.content), False
+        if not truncated:
+            self._store(key, response, text, now)
+        return CachedResponse(response.url, response.status_code, text, from_cache=False, revalidated=False,
+                              bytes_read=bytes_read, truncated=truncated)
+
+    def _store(self, key: str, response: requests.Response, text: str, now: float):
+        if response.status_code != 200:
+            return
+        cc = parse_cache_control(response.headers.get("Cache-Control", ""))
+        if "no-store" in cc:
+            self.cache.delete(key)
+            return
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        lifetime = freshness_lifetime(response.headers)
+        if not etag and not last_modified and not lifetime:
+            # nothing to revalidate with and not fresh for any time: useless entry
+            return
+        self.cache.set(key, {
+            "url": response.url,
+            "status": response.status_code,
+            "text": text,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh_until": now + lifetime if lifetime else None,
+        })
+        self.stats["stored"] += 1
+
+
+_http_cache: Optional[HTTPCache] = None
+
+
+def get_http_cache() -> HTTPCache:
+    """Process-wide cache (and keep-alive session) used by scrape_website."""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HTTPCache(DiskCache(HTTP_CACHE_DIR, HTTP_CACHE_MAX_BYTES))
+    return _http_cache
@@ -0,0 +1,101 @@
+"""
+Persistent cache of generated test cases for Marcus Intelligence.
+Generations are stored on disk under a stable hash of everything that shapes
+the LLM call (prompt inputs, coverage, model, temperature, prompt version), so
+a repeat run for the same site returns immediately without spending tokens.
+
+Run: python llm_cache.py stats | clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from disk_cache import DiskCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join(".cache", "llm"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # 0 = never expire
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def cache_key(**inputs: Any) -> str:
+    """
+    Stable hash of JSON-serializable call inputs; key order does not matter.
+
+    Examples:
+        >>> cache_key(a=1, b=[2]) == cache_key(b=[2], a=1)
+        True
+    """
+    blob = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Test-case generations on a DiskCache, expiring after `ttl` seconds.
+
+    Stats count hits and misses for this process and the tokens hits avoided
+    (the usage recorded when each entry was generated).
+    """
+
+    def __init__(self, cache: DiskCache, ttl: Optional[float] = None):
+        self.cache = cache
+        self.ttl = ttl or None
+        self.stats = {"hits": 0, "misses": 0, "tokens_saved": 0}
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Cached test cases for `key`, or None."""
+        entry = self.cache.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.stats["tokens_saved"] += (entry.get("usage") or {}).get("total_tokens", 0)
+        return entry["test_cases"]
+
+    def set(self, key: str, test_cases: List[Dict], usage: Optional[Dict[str, int]] = None,
+            ttl: Optional[float] = None):
+        """
+        Store a generation.
+
+        Args:
+            key: From cache_key
+            test_cases: Parsed test cases
+            usage: Token usage of the call that produced them
+            ttl: Seconds to keep the entry (defaults to the cache's ttl)
+        """
+        self.cache.set(key, {"test_cases": test_cases, "usage": usage or {}}, ttl=ttl or self.ttl)
+
+    def invalidate(self, key: str):
+        """Forget one generation so the next call regenerates it."""
+        self.cache.delete(key)
+
+    def clear(self):
+        """Forget every cached generation."""
+        self.cache.clear()
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache used by generate_test_cases."""
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = LLMCache(DiskCache(LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES), LLM_CACHE_TTL)
+    return _llm_cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the test-case generation cache")
+    parser.add_argument("command", choices=["stats", "clear"])
+    args = parser.parse_args()
+    cache = get_llm_cache()
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared {LLM_CACHE_DIR}")
+    else:
+        print(f"{LLM_CACHE_DIR}: {cache.cache.size():,} bytes (limit {LLM_CACHE_MAX_BYTES:,}, ttl {LLM_CACHE_TTL:.0f}s)")
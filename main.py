@@ -1,5 +1,7 @@
 import streamlit as st
-from scrape import scrape_website, extract_website_intelligence, generate_test_cases
+from scrape import fetch_page, extract_page
+from crawler import crawl_website
+from generation_planner import iter_test_cases
 
 st.set_page_config(page_title="AI Webscraper Agent", layout="wide")
 st.title("AI Webscraper Agent")
@@ -10,6 +12,19 @@ coverage = st.selectbox(
     ["basic", "standard", "comprehensive"],
     index=1,
 )
+crawl = st.checkbox("Crawl linked pages on the same site")
+max_pages = st.slider("Max pages to crawl", 2, 50, 10) if crawl else 1
+regenerate = st.checkbox("Regenerate (ignore cached test cases)")
+
+
+def render_test_case(tc: dict):
+    with st.expander(f"TC{tc['id']:02d} - {tc['title']}"):
+        st.markdown(f"**Type:** {tc['type'].upper()}")
+        st.markdown(f"**Description:** {tc['description']}")
+        st.markdown(f"**Expected:** {tc['expected_result']}")
+        st.markdown("**Steps:**")
+        for step in tc["steps"]:
+            st.markdown(f"- {step}")
 
 
 def ensure_https(u: str) -> str:
@@ -21,36 +36,39 @@ def ensure_https(u: str) -> str:
 if st.button("Scrape & Generate Tests") and url:
     url = ensure_https(url)
 
-    with st.spinner("Scraping website..."):
-        html = scrape_website(url)
-
-    with st.spinner("Extracting structure & features..."):
-        extracted = extract_website_intelligence(html, url)
+    if crawl:
+        with st.spinner(f"Crawling up to {max_pages} pages..."):
+            extracted = crawl_website(url, max_pages=max_pages)
+    else:
+        with st.spinner("Scraping website..."):
+            page = fetch_page(url)
+        if page.truncated:
+            st.warning(page.errors[0])
 
-    with st.spinner("Generating test cases"):
-        tests = generate_test_cases(extracted, coverage)
+        with st.spinner("Extracting structure & features..."):
+            extracted = extract_page(page)
 
-    st.success(f"Generated {len(tests)} test cases")
+    st.subheader("Test Cases")
+    summary = st.empty()
+    status = st.empty()
+    tests = []
+    # each case is rendered as soon as it is complete (or its shard is)
+    for tc in iter_test_cases(extracted, coverage, refresh=regenerate):
+        tests.append(tc)
+        status.info(f"Generating test cases... {len(tests)} so far")
+        render_test_case(tc)
+    status.success(f"Generated {len(tests)} test cases")
 
     pos = sum(1 for t in tests if t["type"] == "positive")
     neg = sum(1 for t in tests if t["type"] == "negative")
     edge = sum(1 for t in tests if t["type"] == "edge")
 
-    c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Total", len(tests))
-    c2.metric("Positive", pos)
-    c3.metric("Negative", neg)
-    c4.metric("Edge", edge)
-
-    st.subheader("Test Cases")
-    for tc in tests:
-        with st.expander(f"TC{tc['id']:02d} - {tc['title']}"):
-            st.markdown(f"**Type:** {tc['type'].upper()}")
-            st.markdown(f"**Description:** {tc['description']}")
-            st.markdown(f"**Expected:** {tc['expected_result']}")
-            st.markdown("**Steps:**")
-            for step in tc["steps"]:
-                st.markdown(f"- {step}")
+    with summary.container():
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Total", len(tests))
+        c2.metric("Positive", pos)
+        c3.metric("Negative", neg)
+        c4.metric("Edge", edge)
     st.write("Running tests...")
     # Save tests to file or pass directly
     import json
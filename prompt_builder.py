@@ -0,0 +1,374 @@
+"""
+Token-budgeted prompt data for Marcus Intelligence test generation.
+Serializes the extracted website data compactly, ranks and deduplicates form
+inputs and buttons by how likely they are to matter for a test, and trims the
+least useful parts until the site section fits PROMPT_TOKEN_BUDGET tokens.
+
+Tokens are counted locally with tiktoken when it is installed and estimated
+otherwise.
+
+Run: python prompt_builder.py https://example.com
+"""
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to estimate_tokens
+    tiktoken = None
+
+# Tokens allowed for the website data section of the generation prompt (0 = no limit)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1200"))
+
+# Upper limits before any budget trimming (the old prompt used the same ones)
+MAX_BUTTONS = 20
+MAX_CONTENT_CHARS = 2000
+# Trimming never goes below these
+MIN_BUTTONS = 8
+MIN_CONTENT_CHARS = 300
+MIN_FORM_INPUTS = 3
+
+# Inputs that carry no test-relevant information of their own
+SKIP_INPUT_TYPES = {"hidden", "submit", "button", "reset", "image"}
+
+INPUT_TYPE_SALIENCE = {
+    "password": 6, "email": 5, "search": 5, "tel": 4, "number": 4, "date": 4,
+    "file": 4, "url": 3, "text": 3, "textarea": 3, "select": 3,
+    "checkbox": 2, "radio": 2, "range": 1, "color": 1,
+}
+
+# Button labels that name an action worth testing, strongest first
+BUTTON_KEYWORDS = [
+    (5, ("log in", "login", "sign in", "signin", "sign up", "signup", "register", "log out", "logout")),
+    (4, ("search", "submit", "send", "subscribe", "add to cart", "cart", "checkout", "buy", "contact")),
+    (3, ("next", "previous", "more", "menu", "filter", "sort", "save", "continue", "apply", "book")),
+    (2, ("home", "about", "help", "faq", "account", "profile", "settings", "download")),
+]
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough BPE token count: one per punctuation mark, one per word plus one
+    per further 6 characters of long words.
+
+    Examples:
+        >>> estimate_tokens('{"type":"email","required":true}')
+        16
+    """
+    return sum(1 + (len(w) - 1) // 6 if w[0].isalnum() or w[0] == "_" else 1
+               for w in re.findall(r"\w+|[^\w\s]", text))
+
+
+def count_tokens(text: str, model: str = "gpt-4.1") -> int:
+    """Tokens in `text` for `model` (tiktoken if installed, else estimate_tokens)."""
+    if tiktoken is None:
+        return estimate_tokens(text)
+    return len(_encoding(model).encode(text, disallowed_special=()))
+
+
+def compact_json(obj: Any) -> str:
+    """JSON without whitespace between tokens; non-ASCII text kept as is."""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _norm(text: Any) -> str:
+    return " ".join(str(text or "").split())
+
+
+def input_salience(inp: Dict) -> int:
+    """How much a form input matters for test design; 0 means leave it out."""
+    kind = str(inp.get("type") or "text").lower()
+    if kind in SKIP_INPUT_TYPES:
+        return 0
+    score = INPUT_TYPE_SALIENCE.get(kind, 2)
+    if inp.get("required"):
+        score += 3
+    if inp.get("name") or inp.get("placeholder"):
+        score += 1
+    return score
+
+
+def compact_input(inp: Dict) -> Dict:
+    """Input with empty fields, default flags and placeholders repeating the name dropped."""
+    out = {"type": str(inp.get("type") or "text").lower()}
+    name = _norm(inp.get("name"))
+    placeholder = _norm(inp.get("placeholder"))
+    if name:
+        out["name"] = name
+    if placeholder and placeholder.lower() != name.lower():
+        out["placeholder"] = placeholder
+    if inp.get("required"):
+        out["required"] = True
+    return out
+
+
+def rank_forms(forms: List[Dict]) -> List[Dict]:
+    """
+    Forms with their inputs compacted, deduplicated and sorted by salience.
+    Forms are ordered by their most salient input, then by total salience, so
+    a login form comes before a long contact form. Repeated forms (same method, action and inputs,
+    e.g. a newsletter box in header and footer) are kept once.
+    """
+    ranked: List[Tuple[Tuple[int, int], int, Dict]] = []
+    seen = set()
+    for position, form in enumerate(forms or []):
+        inputs = {}
+        for inp in form.get("inputs") or []:
+            score = input_salience(inp)
+            compact = compact_input(inp)
+            key = (compact["type"], compact.get("name", ""), compact.get("placeholder", ""))
+            if score and score > inputs.get(key, (0, None))[0]:
+                inputs[key] = (score, compact)
+        ordered = sorted(inputs.values(), key=lambda s: -s[0])
+        out = {"method": str(form.get("method") or "GET").upper()}
+        if form.get("action"):
+            out["action"] = form["action"]
+        out["inputs"] = [compact for _, compact in ordered]
+        signature = compact_json(out)
+        if signature in seen:
+            continue
+        seen.add(signature)
+        scores = [s for s, _ in ordered]
+        ranked.append(((max(scores, default=0), sum(scores)), position, out))
+    ranked.sort(key=lambda r: (-r[0][0], -r[0][1], r[1]))
+    return [form for _, _, form in ranked]
+
+
+def button_salience(label: str) -> int:
+    """Action keywords score highest; very long, numeric or one-character labels lowest."""
+    lower = label.lower()
+    score = next((s for s, words in BUTTON_KEYWORDS if any(w in lower for w in words)), 1)
+    if len(label) < 2 or label.replace(" ", "").isdigit():
+        score -= 1
+    if len(label) > 25:
+        score -= 1
+    return score
+
+
+def rank_buttons(buttons: List[str]) -> List[str]:
+    """Buttons deduplicated case- and whitespace-insensitively, most salient first."""
+    seen = set()
+    unique = []
+    for label in buttons or []:
+        label = _norm(label)
+        if label and label.lower() not in seen:
+            seen.add(label.lower())
+            unique.append(label)
+    return sorted(unique, key=button_salience, reverse=True)
+
+
+def _truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    return cut[:cut.rfind(" ")] if " " in cut[limit // 2:] else cut
+
+
+def _dom(dom_structure: str) -> str:
+    try:
+        return compact_json(json.loads(dom_structure))
+    except (TypeError, ValueError):
+        return _norm(dom_structure)
+
+
+@dataclass
+class SitePrompt:
+    """
+    Website data section of the generation prompt.
+
+    `inputs` holds the fields actually sent (hashed into the generation cache
+    key); `baseline_tokens` is what the same data cost before compaction.
+    When compaction would not make the section smaller, the uncompacted text
+    is sent and `inputs` is just that text.
+    """
+    inputs: Dict[str, Any]
+    text: str
+    tokens: int
+    baseline_tokens: int
+    budget: int
+    trimmed: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.baseline_tokens - self.tokens
+
+    @property
+    def savings(self) -> float:
+        return self.saved_tokens / self.baseline_tokens if self.baseline_tokens else 0.0
+
+    def report(self) -> str:
+        trimmed = ", ".join(f"{n} {k}" for k, n in self.trimmed.items() if n)
+        if self.saved_tokens > 0:
+            change = f"{self.saved_tokens} fewer than uncompacted ({self.savings:.0%})"
+        elif self.saved_tokens < 0:
+            change = f"{-self.saved_tokens} more than uncompacted (+{-self.savings:.0%})"
+        else:
+            change = "same as uncompacted"
+        return (f"site data {self.tokens} tokens (budget {self.budget or 'none'}), {change}"
+                + (f"; trimmed {trimmed}" if trimmed else ""))
+
+
+def render_site(inputs: Dict[str, Any]) -> str:
+    """Prompt text for the fields from build_site_prompt."""
+    lines = [
+        "WEBSITE:",
+        f"- URL: {inputs['url']}",
+        f"- Title: {inputs['title']}",
+        f"- Description: {inputs['description']}",
+        "",
+        f"DETECTED FEATURES: {', '.join(inputs['features']) or 'none'}",
+        "",
+        "FORMS:",
+        compact_json(inputs["forms"]),
+        "",
+        "BUTTONS:",
+        " | ".join(inputs["buttons"]),
+        "",
+        f"DOM STRUCTURE: {inputs['dom_structure']}",
+        "",
+        "CONTENT SAMPLE:",
+        inputs["content_sample"],
+    ]
+    return "\n".join(lines)
+
+
+def render_site_uncompacted(extracted) -> str:
+    """The site section as the prompt sent it before compaction (for savings reports)."""
+    return f"""WEBSITE:
+- URL: {extracted.url}
+- Title: {extracted.title}
+- Description: {extracted.description}
+
+DETECTED FEATURES:
+{json.dumps(extracted.features, indent=2)}
+
+FORMS:
+{json.dumps(extracted.forms, indent=2)}
+
+BUTTONS:
+{', '.join(extracted.buttons[:MAX_BUTTONS])}
+
+DOM STRUCTURE:
+{extracted.dom_structure}
+
+CONTENT SAMPLE:
+{extracted.text_summary[:MAX_CONTENT_CHARS]}"""
+
+
+def _trim_steps(inputs: Dict[str, Any]):
+    """
+    Reductions in the order they are tried, least useful data first: the
+    content sample down to MIN_CONTENT_CHARS, buttons down to MIN_BUTTONS, low
+    salience inputs of each form down to MIN_FORM_INPUTS, lower ranked forms,
+    then the rest of the content sample. Each yields the trimmed field's name.
+    """
+    while len(inputs["content_sample"]) > MIN_CONTENT_CHARS:
+        limit = max(MIN_CONTENT_CHARS, len(inputs["content_sample"]) * 3 // 4)
+        inputs["content_sample"] = _truncate(inputs["content_sample"], limit)
+        yield "content chars"
+    while len(inputs["buttons"]) > MIN_BUTTONS:
+        inputs["buttons"].pop()
+        yield "buttons"
+    while True:
+        widest = max(inputs["forms"], key=lambda f: len(f["inputs"]), default=None)
+        if widest is None or len(widest["inputs"]) <= MIN_FORM_INPUTS:
+            break
+        widest["inputs"].pop()
+        yield "form inputs"
+    while len(inputs["forms"]) > 1:
+        inputs["forms"].pop()
+        yield "forms"
+    if inputs["content_sample"]:
+        inputs["content_sample"] = ""
+        yield "content chars"
+
+
+def build_site_prompt(extracted, budget: Optional[int] = None, model: str = "gpt-4.1") -> SitePrompt:
+    """
+    Compact, ranked website data fitted to a token budget.
+
+    Nothing is trimmed when the compact form already fits. Otherwise the
+    reductions in _trim_steps are applied one at a time until it does (or
+    nothing more can go), so the most salient forms, inputs and buttons are
+    the last to be dropped. Whenever the result is not smaller than the
+    uncompacted text (small pages, or trimming that could not get below it),
+    the uncompacted text is sent instead.
+
+    Args:
+        extracted: ExtractedWebsiteData
+        budget: Token limit for the section (defaults to PROMPT_TOKEN_BUDGET; 0 = no limit)
+        model: Model whose tokenizer counts tokens
+
+    Returns:
+        SitePrompt with the fields, text and token counts
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    inputs = {
+        "url": extracted.url,
+        "title": _norm(extracted.title),
+        "description": _norm(extracted.description),
+        "features": sorted(k for k, v in (extracted.features or {}).items() if v),
+        "forms": rank_forms(extracted.forms),
+        "buttons": rank_buttons(extracted.buttons)[:MAX_BUTTONS],
+        "dom_structure": _dom(extracted.dom_structure),
+        "content_sample": _truncate(_norm(extracted.text_summary), MAX_CONTENT_CHARS),
+    }
+    before = {"content chars": len(inputs["content_sample"]), "buttons": len(inputs["buttons"]),
+              "form inputs": sum(len(f["inputs"]) for f in inputs["forms"]), "forms": len(inputs["forms"])}
+    text = render_site(inputs)
+    tokens = count_tokens(text, model)
+    if budget and tokens > budget:
+        for _ in _trim_steps(inputs):
+            text = render_site(inputs)
+            tokens = count_tokens(text, model)
+            if tokens <= budget:
+                break
+    after = {"content chars": len(inputs["content_sample"]), "buttons": len(inputs["buttons"]),
+             "form inputs": sum(len(f["inputs"]) for f in inputs["forms"]), "forms": len(inputs["forms"])}
+    trimmed = {k: before[k] - after[k] for k in before}
+    baseline = render_site_uncompacted(extracted)
+    baseline_tokens = count_tokens(baseline, model)
+    if tokens >= baseline_tokens:
+        inputs, text, tokens = {"uncompacted": baseline}, baseline, baseline_tokens
+        trimmed = dict.fromkeys(trimmed, 0)
+    return SitePrompt(
+        inputs=inputs,
+        text=text,
+        tokens=tokens,
+        baseline_tokens=baseline_tokens,
+        budget=budget,
+        trimmed=trimmed,
+    )
+
+
+def main():
+    import argparse
+
+    from scrape import MODEL_NAME, extract_page, fetch_page
+
+    parser = argparse.ArgumentParser(description="Show the compacted prompt data for a URL and its token savings")
+    parser.add_argument("url")
+    parser.add_argument("--budget", type=int, default=None, help=f"token budget (default {PROMPT_TOKEN_BUDGET})")
+    args = parser.parse_args()
+
+    site = build_site_prompt(extract_page(fetch_page(args.url)), args.budget, MODEL_NAME)
+    print(site.text)
+    print(f"\n{site.report()}")
+    print("Token counts from " + ("tiktoken" if tiktoken is not None else "the built-in estimate (pip install tiktoken)"))
+
+
+if __name__ == "__main__":
+    main()
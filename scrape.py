@@ -7,7 +7,7 @@ import time
 import re
 import json
 from dataclasses import dataclass, field
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Iterator, List, Dict, Tuple, Optional
 from urllib.parse import urlparse
 import os
 
@@ -17,10 +17,58 @@ from openai import OpenAI
 from tenacity import retry, stop_after_attempt, wait_exponential
 from dotenv import load_dotenv
 
+from http_cache import HTTP_CACHE_ENABLED, get_http_cache, read_capped
+from llm_cache import LLM_CACHE_ENABLED, cache_key, get_llm_cache
+from prompt_builder import SitePrompt, build_site_prompt
+
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL_NAME = os.getenv("MODEL_NAME", "gpt-4.1")
+GENERATION_TEMPERATURE = 0.4
+# Bump whenever the generation prompts change so cached generations are not reused
+PROMPT_VERSION = "3"
+
+# Browser-like request headers shared by the scraper and the crawler
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Keep-alive session for uncached fetches (the HTTP cache has its own)
+_session = requests.Session()
+
+# Page bodies are streamed and cut off after this many bytes (0 = no cap)
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(5 * 1024 * 1024)))
+# Parse while downloading and stop once the page has produced a full text summary
+SCRAPE_EARLY_STOP = os.getenv("SCRAPE_EARLY_STOP", "0") == "1"
+
+# Characters of page text kept in ExtractedWebsiteData.text_summary
+TEXT_SUMMARY_CHARS = 16000
+
+# Substrings that switch a feature on when they appear anywhere in the page markup
+FEATURE_KEYWORDS = {
+    "has_search": ["search", 'type="search"'],
+    "has_auth": ["login", "signin", "signup", "register", "auth"],
+    "is_ecommerce": ["product", "cart", "checkout", "price", "shop"],
+    "has_comments": ["comment", "review"],
+}
+
+# Elements dropped before extraction
+NOISE_TAGS = ("script", "style", "meta", "link", "noscript")
+
+# Extraction engine: "lxml" (single pass, default when lxml is installed) or "bs4"
+EXTRACT_ENGINE = os.getenv("EXTRACT_ENGINE", "lxml")
+
+try:
+    from lxml import etree
+except ImportError:  # optional: fall back to BeautifulSoup's html.parser
+    etree = None
+
 
 @dataclass
 class ExtractedWebsiteData:
@@ -36,6 +84,17 @@ class ExtractedWebsiteData:
     errors: List[str] = field(default_factory=list)
 
 
+@dataclass
+class FetchResult:
+    """A downloaded page body plus what the streaming fetch had to leave out."""
+    url: str
+    html: str
+    bytes_read: int = 0
+    truncated: bool = False
+    errors: List[str] = field(default_factory=list)
+    tree: Any = field(default=None, repr=False)  # lxml tree parsed during an early-stop fetch
+
+
 def validate_and_normalize_url(url: str) -> Tuple[bool, str]:
     """
     Validate and normalize URL.
@@ -74,46 +133,131 @@ def validate_and_normalize_url(url: str) -> Tuple[bool, str]:
         return False, ""
 
 
+class _EarlyStop:
+    """
+    should_stop callback for read_capped: feeds the body to an lxml pull parser as
+    it arrives and asks to stop once closed elements hold enough text to fill
+    text_summary. The parsed tree is kept so extraction does not parse again.
+    """
+
+    def __init__(self, min_chars: int = TEXT_SUMMARY_CHARS):
+        self.min_chars = min_chars
+        self.parser = etree.HTMLPullParser(events=("start", "end"), encoding="utf-8")
+        self.chars = 0
+        self.noise = 0
+        self.stopped = False
+
+    def __call__(self, piece: str) -> bool:
+        self.parser.feed(piece.encode("utf-8", "replace"))
+        for event, el in self.parser.read_events():
+            if not isinstance(el.tag, str):
+                continue
+            if event == "start":
+                if self.noise or el.tag in NOISE_TAGS:
+                    self.noise += 1
+                continue
+            if self.noise:
+                self.noise -= 1
+                continue
+            # text directly inside el is complete once it closes
+            for s in [el.text] + [child.tail for child in el]:
+                if s:
+                    self.chars += sum(len(w) + 1 for w in s.split())
+        self.stopped = self.chars >= self.min_chars
+        return self.stopped
+
+    def close(self):
+        try:
+            return self.parser.close()
+        except etree.LxmlError:
+            return None
+
+
+def truncation_note(bytes_read: int, max_bytes: int, setting: str) -> str:
+    """
+    Error text for a page body cut off at its byte cap.
+
+    Args:
+        bytes_read: Bytes kept before the cut
+        max_bytes: The cap that was applied
+        setting: Name of the caller's override, reported when it differs from SCRAPE_MAX_BYTES
+
+    Returns:
+        e.g. "Page body truncated at 262,144 bytes (max_bytes=262,144)"
+    """
+    source = "SCRAPE_MAX_BYTES" if max_bytes == SCRAPE_MAX_BYTES else setting
+    return f"Page body truncated at {bytes_read:,} bytes ({source}={max_bytes:,})"
+
+
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=2, max=10))
-def scrape_website(url: str) -> str:
+def fetch_page(url: str, max_bytes: Optional[int] = None, early_stop: Optional[bool] = None) -> FetchResult:
     """
-    Scrape website using requests (simple HTTP).
+    Download a page body, streaming it in chunks up to a byte cap.
+    
+    Pages are fetched through the on-disk HTTP cache (see http_cache.py): a fresh
+    copy is used as is, a stale one is revalidated with If-None-Match /
+    If-Modified-Since. Set SCRAPE_CACHE=0 to always download.
     
     Args:
         url: Website URL to scrape
+        max_bytes: Body byte cap (defaults to SCRAPE_MAX_BYTES; 0 disables it)
+        early_stop: Parse while downloading and stop once the text summary is full
+            (defaults to SCRAPE_EARLY_STOP; needs lxml)
         
     Returns:
-        HTML content as string
+        FetchResult; a cut-short body is flagged and explained in its errors
         
     Raises:
         requests.Timeout: If request times out
         requests.RequestException: If request fails
     """
     print(f" Loading website: {url}")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1'
-    }
+    max_bytes = SCRAPE_MAX_BYTES if max_bytes is None else max_bytes
+    early_stop = SCRAPE_EARLY_STOP if early_stop is None else early_stop
+    stopper = _EarlyStop() if early_stop and etree is not None and EXTRACT_ENGINE == "lxml" else None
     
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            timeout=30,
-            allow_redirects=True,
-            verify=True
-        )
-        response.raise_for_status()
+        if HTTP_CACHE_ENABLED:
+            response = get_http_cache().get(
+                url,
+                headers=DEFAULT_HEADERS,
+                max_bytes=max_bytes,
+                should_stop=stopper,
+                timeout=30,
+                allow_redirects=True,
+                verify=True
+            )
+            page = FetchResult(url, response.text, response.bytes_read, response.truncated)
+            if response.revalidated:
+                print(" Not modified since last visit (304), using cached copy")
+            elif response.from_cache:
+                print(" Using fresh cached copy")
+        else:
+            response = _session.get(
+                url, 
+                headers=DEFAULT_HEADERS, 
+                timeout=30,
+                allow_redirects=True,
+                verify=True,
+                stream=True
+            )
+            response.raise_for_status()
+            html, bytes_read, truncated = read_capped(response, max_bytes, stopper)
+            page = FetchResult(url, html, bytes_read, truncated)
         
-        html = response.text
+        # the pull parser only saw the body if it was downloaded just now
+        if stopper is not None and (page.bytes_read or page.truncated):
+            page.tree = stopper.close()
+        if page.truncated:
+            if stopper is not None and stopper.stopped:
+                page.errors.append(f"Download stopped early after {page.bytes_read:,} bytes "
+                                   f"(text summary already full)")
+            else:
+                page.errors.append(truncation_note(page.bytes_read, max_bytes, "max_bytes"))
+            print(f" {page.errors[-1]}")
         
-        print(f" Successfully loaded {len(html):,} characters")
-        return html
+        print(f" Successfully loaded {len(page.html):,} characters")
+        return page
         
     except requests.Timeout:
         print(f" Timeout loading {url}")
@@ -126,22 +270,38 @@ def scrape_website(url: str) -> str:
         raise
 
 
-def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
+def scrape_website(url: str) -> str:
     """
-    Extract structured data from HTML.
+    Scrape website using requests (simple HTTP).
     
     Args:
-        html: Raw HTML content
-        url: Website URL
+        url: Website URL to scrape
         
     Returns:
-        ExtractedWebsiteData with all extracted information
+        HTML content as string (at most SCRAPE_MAX_BYTES of it, see fetch_page)
+        
+    Raises:
+        requests.Timeout: If request times out
+        requests.RequestException: If request fails
     """
+    return fetch_page(url).html
+
+
+def _extract_bs4(html: str, url: str) -> ExtractedWebsiteData:
+    """BeautifulSoup/html.parser engine: one tree walk per extracted field."""
     errors = []
     soup = BeautifulSoup(html, "html.parser")
     
+    # Extract description (before <meta> is dropped as noise)
+    try:
+        desc_tag = soup.find("meta", attrs={"name": "description"})
+        description = desc_tag["content"].strip() if desc_tag and desc_tag.get("content") else ""
+    except Exception as e:
+        description = ""
+        errors.append(f"Description extraction: {e}")
+    
     # Remove noise
-    for tag in soup(["script", "style", "meta", "link", "noscript"]):
+    for tag in soup(list(NOISE_TAGS)):
         tag.decompose()
     
     # Extract title
@@ -151,14 +311,6 @@ def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
         title = "Untitled"
         errors.append(f"Title extraction: {e}")
     
-    # Extract description
-    try:
-        desc_tag = soup.find("meta", attrs={"name": "description"})
-        description = desc_tag["content"].strip() if desc_tag and desc_tag.get("content") else ""
-    except Exception as e:
-        description = ""
-        errors.append(f"Description extraction: {e}")
-    
     # Extract forms
     forms = []
     try:
@@ -193,7 +345,7 @@ def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
     # Extract text content
     try:
         text = " ".join(soup.get_text(separator=" ", strip=True).split())
-        text_summary = text[:16000]
+        text_summary = text[:TEXT_SUMMARY_CHARS]
     except Exception as e:
         text_summary = ""
         errors.append(f"Text extraction: {e}")
@@ -201,13 +353,9 @@ def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
     # Detect features
     try:
         lower_html = str(soup).lower()
-        features = {
-            "has_forms": bool(forms),
-            "has_search": any(k in lower_html for k in ["search", 'type="search"']),
-            "has_auth": any(k in lower_html for k in ["login", "signin", "signup", "register", "auth"]),
-            "is_ecommerce": any(k in lower_html for k in ["product", "cart", "checkout", "price", "shop"]),
-            "has_comments": "comment" in lower_html or "review" in lower_html,
-        }
+        features = {"has_forms": bool(forms)}
+        for name, keywords in FEATURE_KEYWORDS.items():
+            features[name] = any(k in lower_html for k in keywords)
     except Exception as e:
         features = {}
         errors.append(f"Feature detection: {e}")
@@ -226,8 +374,6 @@ def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
         dom_structure = "{}"
         errors.append(f"DOM structure: {e}")
     
-    print(f" Extracted: {len(forms)} forms, {len(buttons)} buttons, {len(features)} features")
-    
     return ExtractedWebsiteData(
         url=url,
         title=title,
@@ -241,35 +387,200 @@ def extract_website_intelligence(html: str, url: str) -> ExtractedWebsiteData:
     )
 
 
-def generate_test_cases(extracted: ExtractedWebsiteData, coverage: str) -> List[Dict]:
+def _extract_lxml(html: str, url: str) -> ExtractedWebsiteData:
     """
-    Generate test cases using OpenAI.
+    lxml engine: parse once with libxml2 and collect every field in a single
+    walk over the tree (see _extract_tree).
+    """
+    parser = etree.HTMLParser(encoding="utf-8")
+    return _extract_tree(etree.fromstring(html.encode("utf-8", "replace"), parser), url)
+
+
+def _extract_tree(root, url: str) -> ExtractedWebsiteData:
+    """
+    Single-walk extraction over a parsed lxml tree (None for an empty document).
+    
+    Produces the same fields as _extract_bs4. The keyword features are matched
+    against the tag names, attributes, text and comments collected during the
+    walk instead of a re-serialized copy of the document.
+    """
+    title = None
+    description = ""
+    forms = []
+    open_forms = []       # form dict (or None past the 10th form) per enclosing <form>
+    buttons = set()
+    open_buttons = []     # text parts per enclosing <a>/<button>
+    words = []
+    text_len = 0
+    fragments = []        # markup seen by keyword feature detection
+    landmarks = {"header": False, "nav": False, "main": False, "footer": False}
+    sections = articles = 0
+    noise = 0             # depth inside NOISE_TAGS elements
+    
+    def add_text(s):
+        nonlocal text_len
+        fragments.append(s)
+        for parts in open_buttons:
+            parts.append(s)
+        if text_len < TEXT_SUMMARY_CHARS:
+            for w in s.split():
+                words.append(w)
+                text_len += len(w) + 1
+    
+    events = etree.iterwalk(root, events=("start", "end", "comment")) if root is not None else ()
+    for event, el in events:
+        tag = el.tag
+        if event == "comment":
+            if not noise:
+                fragments.append(el.text or "")
+                if el.tail:
+                    add_text(el.tail)
+            continue
+        if not isinstance(tag, str):  # processing instructions
+            continue
+        
+        if event == "start":
+            if noise or tag in NOISE_TAGS:
+                noise += 1
+                if tag == "meta" and not description and el.get("name") == "description":
+                    description = (el.get("content") or "").strip()
+                continue
+            fragments.append(tag)
+            for k, v in el.items():
+                fragments.append(k)
+                fragments.append(v)
+            
+            if tag == "form":
+                if len(forms) < 10:
+                    form_data = {
+                        "method": (el.get("method") or "GET").upper(),
+                        "action": el.get("action") or "",
+                        "inputs": [],
+                    }
+                    forms.append(form_data)
+                    open_forms.append(form_data)
+                else:
+                    open_forms.append(None)
+            elif tag in ("input", "textarea", "select"):
+                for form_data in open_forms:
+                    if form_data is not None and len(form_data["inputs"]) < 15:
+                        form_data["inputs"].append({
+                            "type": el.get("type") or tag,
+                            "name": el.get("name") or "",
+                            "placeholder": el.get("placeholder") or "",
+                            "required": el.get("required") is not None,
+                        })
+                if tag == "input":
+                    value = (el.get("value") or "").strip()
+                    if 0 < len(value) <= 40:
+                        buttons.add(value)
+            elif tag in ("a", "button"):
+                open_buttons.append([])
+            elif tag == "title":
+                if title is None:
+                    title = el.text.strip() if el.text else "Untitled"
+            elif tag in landmarks:
+                landmarks[tag] = True
+            elif tag == "section":
+                sections += 1
+            elif tag == "article":
+                articles += 1
+            
+            if el.text:
+                add_text(el.text)
+        else:
+            if noise:
+                noise -= 1
+            elif tag == "form":
+                open_forms.pop()
+            elif tag in ("a", "button"):
+                text = ("".join(open_buttons.pop()) or el.get("value") or "").strip()
+                if 0 < len(text) <= 40:
+                    buttons.add(text)
+            if el.tail and not noise:
+                add_text(el.tail)
+    
+    lower_html = " ".join(fragments).lower()
+    features = {"has_forms": bool(forms)}
+    for name, keywords in FEATURE_KEYWORDS.items():
+        features[name] = any(k in lower_html for k in keywords)
+    
+    dom_structure = json.dumps({
+        **landmarks,
+        "sections": sections,
+        "articles": articles,
+    }, indent=2)
+    
+    return ExtractedWebsiteData(
+        url=url,
+        title=title if title is not None else "Untitled",
+        description=description,
+        forms=forms,
+        buttons=sorted(buttons)[:30],
+        features={k: v for k, v in features.items() if v},
+        text_summary=" ".join(words)[:TEXT_SUMMARY_CHARS],
+        dom_structure=dom_structure,
+        errors=[]
+    )
+
+
+def extract_website_intelligence(html: str, url: str, engine: Optional[str] = None) -> ExtractedWebsiteData:
+    """
+    Extract structured data from HTML.
     
     Args:
-        extracted: Extracted website data
-        coverage: basic/standard/comprehensive
+        html: Raw HTML content
+        url: Website URL
+        engine: "lxml" or "bs4" (defaults to EXTRACT_ENGINE). The lxml engine
+            falls back to bs4 if lxml is not installed or fails on the document.
         
     Returns:
-        List of test case dictionaries
-        
-    Raises:
-        RuntimeError: If OPENAI_API_KEY not set
-        ValueError: If LLM doesn't return valid JSON
+        ExtractedWebsiteData with all extracted information
     """
-    if not OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY not set in environment")
+    engine = engine or EXTRACT_ENGINE
+    data = None
+    if engine == "lxml" and etree is not None:
+        try:
+            data = _extract_lxml(html, url)
+        except Exception as e:
+            print(f" lxml extraction failed ({e}), falling back to html.parser")
+    if data is None:
+        data = _extract_bs4(html, url)
     
-    # Thread-safe client initialization
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    print(f" Extracted: {len(data.forms)} forms, {len(data.buttons)} buttons, {len(data.features)} features")
+    return data
+
+
+def extract_page(page: FetchResult, engine: Optional[str] = None) -> ExtractedWebsiteData:
+    """
+    Extract structured data from a fetched page.
     
-    coverage_map = {
-        "basic": "30-40",
-        "standard": "50-60",
-        "comprehensive": "70-80",
-    }
-    coverage_label = coverage_map.get(coverage, "30-40")
+    Reuses the tree parsed during an early-stop fetch when the lxml engine is in
+    use, and puts the fetch's truncation notes at the front of the errors.
     
-    system_prompt = '''You are a senior QA automation engineer with 15+ years of experience specializing in web application testing. 
+    Args:
+        page: Result of fetch_page
+        engine: See extract_website_intelligence
+        
+    Returns:
+        ExtractedWebsiteData with all extracted information
+    """
+    if page.tree is not None and (engine or EXTRACT_ENGINE) == "lxml":
+        data = _extract_tree(page.tree, page.url)
+        print(f" Extracted: {len(data.forms)} forms, {len(data.buttons)} buttons, {len(data.features)} features")
+    else:
+        data = extract_website_intelligence(page.html, page.url, engine)
+    data.errors = page.errors + data.errors
+    return data
+
+
+COVERAGE_MAP = {
+    "basic": "30-40",
+    "standard": "50-60",
+    "comprehensive": "70-80",
+}
+
+SYSTEM_PROMPT = '''You are a senior QA automation engineer with 15+ years of experience specializing in web application testing. 
 Your expertise includes functional testing, edge case detection, and creating test cases that can be executed by AI agents such as browser-use agent.
 Given website data, generate comprehensive, executable test cases in valid JSON format only.
 Focus on real-world scenarios, security considerations, and user experience flows.
@@ -284,28 +595,72 @@ CRITICAL SAFETY RULES:
 - Focus ONLY on: navigation, search, login (without payment), content display
 - If payment elements detected, test ONLY page load + basic navigation
 '''
-    
-    user_prompt = f"""Generate {coverage_label} test cases for this website.
 
-WEBSITE:
-- URL: {extracted.url}
-- Title: {extracted.title}
-- Description: {extracted.description}
 
-DETECTED FEATURES:
-{json.dumps(extracted.features, indent=2)}
+def site_prompt(extracted: ExtractedWebsiteData) -> SitePrompt:
+    """Website data section of the generation prompt, under PROMPT_TOKEN_BUDGET."""
+    return build_site_prompt(extracted, model=MODEL_NAME)
 
-FORMS:
-{json.dumps(extracted.forms, indent=2)}
 
-BUTTONS:
-{', '.join(extracted.buttons[:20])}
+def prompt_inputs(extracted: ExtractedWebsiteData, site: Optional[SitePrompt] = None) -> Dict:
+    """
+    The parts of ExtractedWebsiteData that the generation prompt uses.
+    
+    Args:
+        extracted: Extracted website data
+        site: Already built site section (built from `extracted` if omitted)
+        
+    Returns:
+        Dict of prompt fields (also hashed into the generation cache key),
+        compacted and fitted to PROMPT_TOKEN_BUDGET (see prompt_builder.py)
+    """
+    return (site or site_prompt(extracted)).inputs
 
-DOM STRUCTURE:
-{extracted.dom_structure}
 
-CONTENT SAMPLE:
-{extracted.text_summary[:2000]}
+def test_cases_cache_key(extracted: ExtractedWebsiteData, coverage: str, focus: Optional[str] = None,
+                         count: Optional[int] = None, site: Optional[SitePrompt] = None) -> str:
+    """
+    Generation cache key for a site and coverage level (or focus area and
+    count) under the current MODEL_NAME, temperature and PROMPT_VERSION.
+    Pass `site` to reuse the site section the messages are built from.
+    
+    Use with get_llm_cache().invalidate(...) to drop a single cached generation.
+    """
+    shard = {"focus": focus, "count": count} if focus or count else {}
+    return cache_key(
+        inputs=prompt_inputs(extracted, site),
+        coverage=COVERAGE_MAP.get(coverage, "30-40"),
+        model=MODEL_NAME,
+        temperature=GENERATION_TEMPERATURE,
+        prompt_version=PROMPT_VERSION,
+        **shard,
+    )
+
+
+def build_messages(extracted: ExtractedWebsiteData, coverage: str, focus: Optional[str] = None,
+                   count: Optional[int] = None, site: Optional[SitePrompt] = None) -> List[Dict[str, str]]:
+    """
+    Chat messages for a test-case generation call.
+    
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+        focus: Restrict the request to one feature area (see generation_planner.py)
+        count: Exact number of test cases to ask for instead of the coverage range
+        site: Already built site section (built from `extracted` if omitted)
+        
+    Returns:
+        System and user messages
+    """
+    coverage_label = str(count) if count else COVERAGE_MAP.get(coverage, "30-40")
+    site = site or site_prompt(extracted)
+    print(f" Prompt: {site.report()}")
+    focus_note = (f"\nFOCUS AREA: {focus}\nOnly write test cases for this area; "
+                  f"other areas are covered by separate requests.\n") if focus else ""
+    
+    user_prompt = f"""Generate {coverage_label} test cases for this website.
+{focus_note}
+{site.text}
 
 Requirements:
 - Mix of positive, negative, and edge cases (at least 30% negative/edge)
@@ -329,16 +684,60 @@ Requirements:
 Return ONLY the JSON array, no explanation, no markdown.
 """
     
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def generate_test_cases(extracted: ExtractedWebsiteData, coverage: str, refresh: bool = False,
+                        focus: Optional[str] = None, count: Optional[int] = None,
+                        site: Optional[SitePrompt] = None) -> List[Dict]:
+    """
+    Generate test cases using OpenAI.
+    
+    Results are cached on disk (see llm_cache.py) under a hash of the prompt
+    inputs, coverage, model, temperature and PROMPT_VERSION, so a repeat run
+    returns without an API call. Set LLM_CACHE=0 to disable.
+    
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+        refresh: Ignore any cached generation and overwrite it
+        focus: Restrict the request to one feature area
+        count: Exact number of test cases to ask for
+        site: Site section from site_prompt(extracted), built once if omitted
+        
+    Returns:
+        List of test case dictionaries
+        
+    Raises:
+        RuntimeError: If OPENAI_API_KEY not set
+        ValueError: If LLM doesn't return valid JSON
+    """
+    site = site or site_prompt(extracted)
+    key = test_cases_cache_key(extracted, coverage, focus, count, site=site) if LLM_CACHE_ENABLED else None
+    if key and not refresh:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            print(f" Using {len(cached)} cached test cases (no LLM call)")
+            return cached
+    
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY not set in environment")
+    
+    # Thread-safe client initialization
+    client = OpenAI(api_key=OPENAI_API_KEY)
+    
+    coverage_label = str(count) if count else COVERAGE_MAP.get(coverage, "30-40")
+    
     try:
         print(f" Generating {coverage_label} test cases with {MODEL_NAME}...")
         
         resp = client.chat.completions.create(
             model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.4,
+            messages=build_messages(extracted, coverage, focus, count, site=site),
+            temperature=GENERATION_TEMPERATURE,
         )
         
         text = resp.choices[0].message.content
@@ -354,6 +753,10 @@ Return ONLY the JSON array, no explanation, no markdown.
         
         print(f" Generated {len(test_cases)} test cases")
         
+        if key:
+            usage = resp.usage.model_dump() if getattr(resp, "usage", None) else None
+            get_llm_cache().set(key, test_cases, usage)
+        
         return test_cases
 
         with open("test_cases.json", "w") as f:
@@ -365,3 +768,150 @@ Return ONLY the JSON array, no explanation, no markdown.
     except Exception as e:
         print(f" Test generation failed: {e}")
         raise
+
+
+class JSONArrayStream:
+    """
+    Incremental parser for a JSON array arriving in pieces.
+    
+    feed() returns the elements completed by each piece. Anything before the
+    first "[" (prose, a markdown fence) is skipped, as is anything after the
+    matching "]". Strings are tracked so brackets and commas inside them do not
+    count.
+    
+    Examples:
+        >>> p = JSONArrayStream()
+        >>> p.feed('```json\\n[{"id": 1, "t": "a, ]"}, {"id"')
+        [{'id': 1, 't': 'a, ]'}]
+        >>> p.feed(': 2}]```')
+        [{'id': 2}]
+        >>> p.done
+        True
+    """
+
+    def __init__(self):
+        self.started = False   # saw the opening "["
+        self.done = False      # saw the matching "]"
+        self._buf: List[str] = []
+        self._depth = 0        # nesting inside the current element
+        self._in_string = False
+        self._escape = False
+
+    def _flush(self, out: List[Any]):
+        element = "".join(self._buf).strip()
+        self._buf = []
+        if element:
+            try:
+                out.append(json.loads(element))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON from LLM: {e}")
+
+    def feed(self, text: str) -> List[Any]:
+        out: List[Any] = []
+        buf = self._buf
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                self.started = ch == "["
+                continue
+            if self._in_string:
+                buf.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+                buf.append(ch)
+            elif ch in "[{":
+                self._depth += 1
+                buf.append(ch)
+            elif ch in "]}":
+                if self._depth == 0:
+                    self._flush(out)
+                    self.done = True
+                else:
+                    self._depth -= 1
+                    buf.append(ch)
+                    if self._depth == 0:
+                        self._flush(out)
+                        buf = self._buf
+            elif ch == "," and self._depth == 0:
+                self._flush(out)
+                buf = self._buf
+            else:
+                buf.append(ch)
+        return out
+
+
+def stream_test_cases(extracted: ExtractedWebsiteData, coverage: str, refresh: bool = False) -> Iterator[Dict]:
+    """
+    Streaming variant of generate_test_cases: yields each test case as soon as
+    the model has finished writing it, instead of after the whole completion.
+    
+    Uses and fills the same cache as generate_test_cases; a response cut off
+    before the closing "]" yields its complete cases but is not cached. Closing
+    the generator early closes the stream, so no further tokens are spent.
+    
+    Args:
+        extracted: Extracted website data
+        coverage: basic/standard/comprehensive
+        refresh: Ignore any cached generation and overwrite it
+        
+    Yields:
+        Test case dictionaries, in the order the model writes them
+        
+    Raises:
+        RuntimeError: If OPENAI_API_KEY not set
+        ValueError: If LLM doesn't return a valid JSON array
+    """
+    site = site_prompt(extracted)
+    key = test_cases_cache_key(extracted, coverage, site=site) if LLM_CACHE_ENABLED else None
+    if key and not refresh:
+        cached = get_llm_cache().get(key)
+        if cached is not None:
+            print(f" Using {len(cached)} cached test cases (no LLM call)")
+            yield from cached
+            return
+    
+    if not OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY not set in environment")
+    
+    client = OpenAI(api_key=OPENAI_API_KEY)
+    coverage_label = COVERAGE_MAP.get(coverage, "30-40")
+    print(f" Streaming {coverage_label} test cases from {MODEL_NAME}...")
+    
+    parser = JSONArrayStream()
+    test_cases = []
+    usage = None
+    stream = client.chat.completions.create(
+        model=MODEL_NAME,
+        messages=build_messages(extracted, coverage, site=site),
+        temperature=GENERATION_TEMPERATURE,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage.model_dump()
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for test_case in parser.feed(chunk.choices[0].delta.content):
+                test_cases.append(test_case)
+                yield test_case
+    finally:
+        stream.close()
+    
+    if not parser.started:
+        raise ValueError("Model did not return a JSON array")
+    if not parser.done:
+        print(f" Response ended before the JSON array was closed; kept {len(test_cases)} complete test cases")
+        return
+    
+    print(f" Generated {len(test_cases)} test cases")
+    if key:
+        get_llm_cache().set(key, test_cases, usage)
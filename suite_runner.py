@@ -0,0 +1,417 @@
+"""
+Concurrent test execution for Marcus Intelligence.
+Runs generated test cases with browser-use agents across N isolated browser
+sessions at once. Each worker owns one session (an E2B desktop sandbox, a
+local headless Chromium, or a stub for offline checks) and runs one test at a
+time in it, with the browser reset between tests so no cookies, logins or
+storage carry over; every agent shares a single LLM client. Tests get a timeout and a
+bounded number of retries, and results are reported as tests finish.
+
+Run: python suite_runner.py tests.json --backend e2b --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+try:
+    from browser_use import Agent, Browser, ChatOpenAI
+except ImportError:  # optional: only the stub backend works without it
+    Agent = Browser = ChatOpenAI = None
+
+try:
+    from e2b_desktop import Sandbox
+except ImportError:  # optional: needed for the e2b backend only
+    Sandbox = None
+
+load_dotenv()
+
+RUNNER_BACKEND = os.getenv("RUNNER_BACKEND", "e2b")
+RUNNER_CONCURRENCY = int(os.getenv("RUNNER_CONCURRENCY", "4"))
+RUNNER_TEST_TIMEOUT = float(os.getenv("RUNNER_TEST_TIMEOUT", "300"))
+RUNNER_RETRIES = int(os.getenv("RUNNER_RETRIES", "1"))
+RUNNER_MAX_STEPS = int(os.getenv("RUNNER_MAX_STEPS", "25"))
+RUNNER_MODEL = os.getenv("RUNNER_MODEL", "gpt-4.1-mini")
+
+
+@dataclass
+class TestResult:
+    """Outcome of one test case: pass, fail (the agent's verdict), error or timeout."""
+    index: int
+    title: str
+    status: str
+    attempts: int
+    duration: float
+    session: int
+    detail: str = ""
+
+
+def task_prompt(test: Dict) -> str:
+    """Task for the browser-use agent from a generated test case."""
+    return f"""
+Test Case: {test.get('title', 'Unknown')}
+Type: {test.get('type', 'positive').upper()}
+Expected: {test.get('expected_result', 'Success')}
+Description: {test.get("description", "Navigate and test website functionality")}
+
+Execute these steps:
+{chr(10).join([f"- {step}" for step in test.get('steps', [])])}
+
+Report PASS/FAIL with screenshots.
+"""
+
+
+class BrowserSession:
+    """
+    One isolated browser; `browser` is what the backend's agents drive.
+    `used` is set once a test has run in it, so it is reset before the next.
+    """
+
+    def __init__(self, number: int, browser=None, sandbox=None):
+        self.number = number
+        self.browser = browser
+        self.sandbox = sandbox
+        self.used = False
+
+
+class BrowserBackend:
+    """
+    Where tests run. Subclasses open and close sessions and run one test in a
+    session; sessions are never shared between tests running at the same time.
+    """
+
+    needs_llm = True
+
+    async def open_session(self, number: int) -> BrowserSession:
+        raise NotImplementedError
+
+    async def close_session(self, session: BrowserSession):
+        await self._stop_browser(session)
+
+    async def reset_session(self, session: BrowserSession) -> BrowserSession:
+        """
+        A clean browser for the session's next test: nothing from the previous
+        test (cookies, logins, local storage, open tabs) may survive. By default
+        the session is closed and a new one opened in its place.
+        """
+        await self.close_session(session)
+        session.browser = None  # already stopped if opening the new one fails
+        return await self.open_session(session.number)
+
+    @staticmethod
+    async def _stop_browser(session: BrowserSession):
+        if session.browser is not None:
+            stop = getattr(session.browser, "kill", None) or getattr(session.browser, "stop", None)
+            if stop is not None:
+                await stop()
+
+    async def run_test(self, session: BrowserSession, test: Dict, llm) -> Dict[str, str]:
+        """
+        Run a test with a browser-use agent in `session`.
+
+        Returns:
+            {"status": "pass" | "fail", "detail": agent's final report}
+
+        Raises:
+            RuntimeError: If the agent stopped without finishing the task
+        """
+        agent = Agent(task=task_prompt(test), llm=llm, browser=session.browser)
+        history = await agent.run(max_steps=RUNNER_MAX_STEPS)
+        if not history.is_done():
+            raise RuntimeError(f"agent did not finish in {RUNNER_MAX_STEPS} steps")
+        report = history.final_result() or ""
+        verdict = re.search(r"\b(PASS|FAIL)(ED)?\b", report.upper().replace("PASS/FAIL", ""))
+        failed = history.is_successful() is False or (verdict is not None and verdict.group(1) == "FAIL")
+        return {"status": "fail" if failed else "pass", "detail": report}
+
+
+class E2BBackend(BrowserBackend):
+    """
+    A fresh E2B desktop sandbox with Chrome per session, driven over CDP.
+    Between tests Chrome is restarted with an empty profile in the same
+    sandbox instead of paying for a new sandbox.
+    """
+
+    def __init__(self, stream: bool = False):
+        if Sandbox is None or Browser is None:
+            raise RuntimeError("the e2b backend needs the e2b-desktop and browser-use packages")
+        self.stream = stream
+
+    def _launch_chrome(self, desktop):
+        desktop.launch("google-chrome")
+        desktop.wait(10000)
+        if self.stream:
+            desktop.stream.start(window_id=desktop.get_current_window_id(), require_auth=True)
+            print("Stream URL:", desktop.stream.get_url(auth_key=desktop.stream.get_auth_key()))
+
+    def _start_sandbox(self):
+        desktop = Sandbox.create()
+        try:
+            self._launch_chrome(desktop)
+        except BaseException:
+            desktop.kill()
+            raise
+        return desktop
+
+    def _restart_chrome(self, desktop):
+        if self.stream:
+            desktop.stream.stop()
+        # -x matches the process name only, not this shell's command line
+        desktop.commands.run("pkill -KILL -x chrome; sleep 1; rm -rf ~/.config/google-chrome; true")
+        self._launch_chrome(desktop)
+
+    @staticmethod
+    def _kill_late_sandbox(started: asyncio.Future):
+        # the caller gave up (timeout/cancel) while the thread was still creating it
+        if not started.cancelled() and started.exception() is None:
+            threading.Thread(target=started.result().kill, daemon=True).start()
+
+    async def open_session(self, number: int) -> BrowserSession:
+        started = asyncio.ensure_future(asyncio.to_thread(self._start_sandbox))
+        try:
+            desktop = await asyncio.shield(started)
+        except asyncio.CancelledError:
+            started.add_done_callback(self._kill_late_sandbox)
+            raise
+        browser = Browser(cdp_url=desktop.get_chrome_endpoint(), keep_alive=True)
+        return BrowserSession(number, browser=browser, sandbox=desktop)
+
+    async def reset_session(self, session: BrowserSession) -> BrowserSession:
+        await self._stop_browser(session)
+        session.browser = None
+        await asyncio.to_thread(self._restart_chrome, session.sandbox)
+        session.browser = Browser(cdp_url=session.sandbox.get_chrome_endpoint(), keep_alive=True)
+        session.used = False
+        return session
+
+    async def close_session(self, session: BrowserSession):
+        try:
+            await super().close_session(session)
+        finally:
+            await asyncio.to_thread(session.sandbox.kill)
+
+
+class LocalBackend(BrowserBackend):
+    """
+    A local Chromium per session, each with its own temporary profile; a
+    reset starts a new Chromium with a new profile.
+    """
+
+    def __init__(self, headless: bool = True):
+        if Browser is None:
+            raise RuntimeError("the local backend needs the browser-use package")
+        self.headless = headless
+
+    async def open_session(self, number: int) -> BrowserSession:
+        return BrowserSession(number, browser=Browser(headless=self.headless, user_data_dir=None, keep_alive=True))
+
+
+class StubBackend(BrowserBackend):
+    """
+    No browser and no LLM: `outcome(test)` decides each result after `delay`
+    seconds (every test passes by default). For checking the runner offline.
+    """
+
+    needs_llm = False
+
+    def __init__(self, delay: float = 0.1, outcome: Optional[Callable[[Dict], Dict[str, str]]] = None):
+        self.delay = delay
+        self.outcome = outcome or (lambda test: {"status": "pass", "detail": "stub"})
+        self.opened = 0
+        self.closed = 0
+        self.resets = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def open_session(self, number: int) -> BrowserSession:
+        self.opened += 1
+        return BrowserSession(number)
+
+    async def close_session(self, session: BrowserSession):
+        self.closed += 1
+
+    async def reset_session(self, session: BrowserSession) -> BrowserSession:
+        self.resets += 1
+        return BrowserSession(session.number)
+
+    async def run_test(self, session: BrowserSession, test: Dict, llm) -> Dict[str, str]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self.outcome(test)
+        finally:
+            self.in_flight -= 1
+
+
+def make_backend(name: str, stream: bool = False) -> BrowserBackend:
+    """Backend by name: e2b, local or stub."""
+    if name == "e2b":
+        return E2BBackend(stream=stream)
+    if name == "local":
+        return LocalBackend()
+    if name == "stub":
+        return StubBackend()
+    raise ValueError(f"unknown backend '{name}' (expected e2b, local or stub)")
+
+
+class SuiteRunner:
+    """
+    Runs test cases on up to `concurrency` sessions of `backend` at once.
+
+    Sessions are opened as workers start and reused for the worker's next
+    test after `backend.reset_session` gives them a clean browser; after a
+    timeout or error the session is replaced, since the browser may be left in
+    an unknown state. Opening or resetting a session counts against the
+    attempt's timeout. A "fail" verdict is a result, not an error, and is not
+    retried.
+    """
+    def __init__(self, backend: BrowserBackend, concurrency: int = RUNNER_CONCURRENCY,
+                 timeout: float = RUNNER_TEST_TIMEOUT, retries: int = RUNNER_RETRIES, llm=None):
+        self.backend = backend
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        if llm is None and backend.needs_llm:
+            if ChatOpenAI is None:
+                raise RuntimeError("browser-use is not installed")
+            llm = ChatOpenAI(model=RUNNER_MODEL)
+        self.llm = llm  # one client shared by every agent
+
+    async def _attempt(self, session: BrowserSession, test: Dict) -> Dict[str, str]:
+        try:
+            return await asyncio.wait_for(self.backend.run_test(session, test, self.llm), self.timeout or None)
+        except asyncio.TimeoutError:
+            return {"status": "timeout", "detail": f"no result after {self.timeout:g}s"}
+        except Exception as e:
+            return {"status": "error", "detail": f"{type(e).__name__}: {e}"}
+
+    async def _prepare(self, session: Optional[BrowserSession], number: int) -> BrowserSession:
+        """A session with a clean browser for the next test."""
+        if session is None:
+            return await self.backend.open_session(number)
+        if session.used:
+            return await self.backend.reset_session(session)
+        return session
+
+    async def _worker(self, number: int, queue: asyncio.Queue, results: asyncio.Queue):
+        session = None
+        try:
+            while True:
+                try:
+                    index, test = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t = time.perf_counter()
+                attempts = 0
+                outcome: Dict[str, str] = {}
+                while attempts <= self.retries:
+                    attempts += 1
+                    try:
+                        session = await asyncio.wait_for(self._prepare(session, number), self.timeout or None)
+                    except asyncio.TimeoutError:
+                        outcome = {"status": "timeout", "detail": f"session: not ready after {self.timeout:g}s"}
+                    except Exception as e:
+                        outcome = {"status": "error", "detail": f"session: {type(e).__name__}: {e}"}
+                    else:
+                        session.used = True
+                        outcome = await self._attempt(session, test)
+                        if outcome["status"] in ("pass", "fail"):
+                            break
+                    if session is not None:
+                        await self._close(session)
+                        session = None
+                await results.put(TestResult(index, test.get("title", "Unknown"), outcome["status"], attempts,
+                                             time.perf_counter() - t, number, outcome.get("detail", "")))
+        finally:
+            if session is not None:
+                await self._close(session)
+
+    async def _close(self, session: BrowserSession):
+        try:
+            await self.backend.close_session(session)
+        except Exception as e:
+            print(f" Closing session {session.number} failed: {e}")
+
+    async def iter_results(self, tests: List[Dict]) -> AsyncIterator[TestResult]:
+        """
+        Run `tests` and yield each result as soon as its test finishes.
+
+        Args:
+            tests: Test case dictionaries (as saved to tests.json)
+
+        Yields:
+            TestResult in completion order; `index` is the test's position in `tests`
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(tests):
+            queue.put_nowait(item)
+        results: asyncio.Queue = asyncio.Queue()
+        workers = [asyncio.create_task(self._worker(n, queue, results))
+                   for n in range(1, min(self.concurrency, len(tests)) + 1)]
+        try:
+            for _ in tests:
+                yield await results.get()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def run(self, tests: List[Dict]) -> List[TestResult]:
+        """All results of `tests`, in completion order."""
+        return [result async for result in self.iter_results(tests)]
+
+
+async def run_suite(tests: List[Dict], backend: BrowserBackend, concurrency: int = RUNNER_CONCURRENCY,
+                    timeout: float = RUNNER_TEST_TIMEOUT, retries: int = RUNNER_RETRIES) -> List[TestResult]:
+    """
+    Run a suite and print each result as it arrives.
+
+    Returns:
+        Results in completion order
+    """
+    runner = SuiteRunner(backend, concurrency, timeout, retries)
+    print(f"Running {len(tests)} tests on {runner.concurrency} sessions "
+          f"({type(backend).__name__}, timeout {timeout:g}s, {retries} retries)")
+    results = []
+    async for result in runner.iter_results(tests):
+        results.append(result)
+        print(f"[{len(results)}/{len(tests)}] {result.status.upper()} #{result.index + 1} {result.title} "
+              f"({result.duration:.1f}s, session {result.session}"
+              + (f", {result.attempts} attempts" if result.attempts > 1 else "") + ")")
+    counts = {s: sum(r.status == s for r in results) for s in ("pass", "fail", "error", "timeout")}
+    print(", ".join(f"{n} {s}" for s, n in counts.items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run generated test cases in parallel browser sessions")
+    parser.add_argument("tests", nargs="?", default="tests.json")
+    parser.add_argument("--backend", default=RUNNER_BACKEND, choices=["e2b", "local", "stub"])
+    parser.add_argument("--concurrency", type=int, default=RUNNER_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=RUNNER_TEST_TIMEOUT, help="seconds per attempt (0 = none)")
+    parser.add_argument("--retries", type=int, default=RUNNER_RETRIES, help="retries after an error or timeout")
+    parser.add_argument("--stream", action="store_true", help="print a live stream URL per E2B sandbox")
+    parser.add_argument("--out", default="test_results.json")
+    args = parser.parse_args()
+
+    with open(args.tests, "r", encoding="utf-8") as f:
+        tests = json.load(f)
+    results = asyncio.run(run_suite(tests, make_backend(args.backend, args.stream),
+                                    args.concurrency, args.timeout, args.retries))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump([asdict(r) for r in results], f, indent=2)
+    print(f"Results saved to {args.out}")
+    return 0 if all(r.status == "pass" for r in results) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""
+Checks batch_cli.py against a local fixture site and the fake LLM server:
+stage concurrency limits, pipelining, incremental results, and resuming after
+the process is killed mid-run.
+Run: python verify_batch.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fake_llm_server import start_fake_llm_server
+
+TMP = tempfile.mkdtemp(prefix="verify_batch_")
+llm, llm_url = start_fake_llm_server(delay=0.2, token_delay=0.0003)
+os.environ.update({
+    "OPENAI_BASE_URL": llm_url,
+    "OPENAI_API_KEY": "fake",
+    "LLM_CACHE_DIR": os.path.join(TMP, "llm_cache"),
+    "SCRAPE_CACHE_DIR": os.path.join(TMP, "http_cache"),
+})
+
+from batch_cli import BatchRunner, read_jobs  # noqa: E402
+
+PAGES = 12
+lock = threading.Lock()
+site_in_flight = 0
+site_max_in_flight = 0
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        global site_in_flight, site_max_in_flight
+        with lock:
+            site_in_flight += 1
+            site_max_in_flight = max(site_max_in_flight, site_in_flight)
+        try:
+            time.sleep(0.2)
+            n = self.path.strip("/").split("/")[-1]
+            body = (f"<html><head><title>Site {n}</title></head><body><nav><a href='/'>Home</a></nav>"
+                    f"<form action='/search'><input type='search' name='q'></form><p>Page number {n}</p></body></html>").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with lock:
+                site_in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def read_results(out_dir):
+    with open(os.path.join(out_dir, "results.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def verify_batch():
+    site = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{site.server_address[1]}"
+    urls_file = os.path.join(TMP, "urls.jsonl")
+    with open(urls_file, "w", encoding="utf-8") as f:
+        for n in range(PAGES):
+            f.write(json.dumps({"id": f"site-{n}", "url": f"{base}/site/{n}"}) + "\n")
+        f.write(f"{base}/site/0\n")  # duplicate, bare URL
+        f.write("not json {\n")
+    results = []
+    try:
+        print("--- Full run ---")
+        jobs = read_jobs(urls_file, "basic")
+        results.append(check(len(jobs) == PAGES, f"{len(jobs)} jobs (duplicate and invalid lines skipped)"))
+        out = os.path.join(TMP, "run1")
+        t = time.perf_counter()
+        counts = asyncio.run(BatchRunner(out, fetch_concurrency=3, parse_concurrency=1, llm_concurrency=2).run(jobs))
+        wall = time.perf_counter() - t
+        rows = read_results(out)
+        results.append(check(counts["ok"] == PAGES and len(rows) == PAGES, f"all {PAGES} URLs ok"))
+        results.append(check(all(os.path.exists(os.path.join(out, r["suite"])) for r in rows), "suite written per URL"))
+        results.append(check(site_max_in_flight <= 3 and llm.max_in_flight <= 2,
+                             f"stage limits respected (fetch {site_max_in_flight}/3, llm {llm.max_in_flight}/2)"))
+        serial = sum(sum(r["timings"].values()) for r in rows)
+        results.append(check(wall < serial / 2, f"pipelined: {wall:.1f}s wall vs {serial:.1f}s of stage work"))
+
+        print("\n--- Rerun skips finished URLs ---")
+        before = len(llm.requests)
+        counts = asyncio.run(BatchRunner(out).run(jobs))
+        results.append(check(counts["skipped"] == PAGES and len(llm.requests) == before, "nothing redone"))
+
+        print("\n--- LLM failure, then retry ---")
+        out2 = os.path.join(TMP, "run2")
+        llm.fail_on = "Title: Site 3\n"
+        asyncio.run(BatchRunner(out2, llm_concurrency=2, refresh=True).run(jobs))
+        failed = [r for r in read_results(out2) if r["status"] == "error"]
+        results.append(check(len(failed) == 1 and failed[0]["stage"] == "llm", "failure recorded with its stage"))
+        llm.fail_on = None
+        counts = asyncio.run(BatchRunner(out2).run(jobs))
+        results.append(check(counts["ok"] == 1 and counts["skipped"] == PAGES - 1, "only the failed URL rerun"))
+
+        print("\n--- Kill mid-run and resume ---")
+        out3 = os.path.join(TMP, "run3")
+        env = {**os.environ, "LLM_CACHE": "0"}  # make every URL take real LLM time
+        proc = subprocess.Popen([sys.executable, "batch_cli.py", urls_file, "--out", out3, "--coverage", "basic",
+                                 "--llm-concurrency", "1"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.time() + 60
+        while time.time() < deadline:
+            if os.path.exists(os.path.join(out3, "results.jsonl")) and len(read_results(out3)) >= 3:
+                break
+            time.sleep(0.05)
+        proc.kill()
+        proc.wait()
+        done_before = len(read_results(out3))
+        counts = asyncio.run(BatchRunner(out3).run(read_jobs(urls_file, "basic")))
+        rows = read_results(out3)
+        ok_urls = [r["url"] for r in rows if r["status"] == "ok"]
+        results.append(check(0 < done_before < PAGES and counts["skipped"] == done_before,
+                             f"killed after {done_before} URLs, resume skipped them"))
+        results.append(check(len(ok_urls) == PAGES and len(set(ok_urls)) == PAGES, "every URL done exactly once"))
+        results.append(check(any(r.get("resumed") for r in rows[done_before:]),
+                             "saved extractions reused (no refetch)"))
+    finally:
+        site.shutdown()
+        llm.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_batch() else 1)
@@ -0,0 +1,120 @@
+"""
+Checks crawler.py against a local fixture site served by http.server.
+Run: python verify_crawler.py
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crawler import CrawlConfig, crawl_site, normalize_url
+
+SITE = {
+    "/": '<html><head><title>Fixture Home</title><meta name="description" content="Fixture site"></head>'
+         '<body><nav><a href="/a">A</a> <a href="b">B</a> <a href="/a#top">A again</a>'
+         '<a href="https://external.example/">External</a> <a href="mailto:x@y.z">Mail</a>'
+         '<a href="/private/secret">Secret</a> <a href="/file.pdf">PDF</a></nav>'
+         '<button>Search</button></body></html>',
+    "/a": '<html><head><title>Page A</title></head><body>'
+          '<form method="post" action="/login"><input name="user" required><input type="password" name="pw"></form>'
+          '<a href="/c">C</a> <a href="/">Home</a></body></html>',
+    "/b": '<html><head><title>Page B</title></head><body><section>Shop our product catalog</section>'
+          '<a href="/c">C</a> <a href="/missing">Missing</a></body></html>',
+    "/c": '<html><head><title>Page C</title></head><body><a href="/d">D</a><button>Deep</button></body></html>',
+    "/d": '<html><head><title>Page D</title></head><body>Too deep</body></html>',
+    "/private/secret": '<html><body>Should not be fetched</body></html>',
+    "/robots.txt": "User-agent: *\nDisallow: /private/\n",
+}
+
+hits: Counter = Counter()
+in_flight = 0
+max_in_flight = 0
+lock = threading.Lock()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        global in_flight, max_in_flight
+        path = self.path.split("?")[0]
+        with lock:
+            hits[path] += 1
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        try:
+            time.sleep(0.05)  # make overlapping requests observable
+            body = SITE.get(path)
+            if body is None:
+                self.send_response(404)
+                payload = b"not found"
+                ctype = "text/plain"
+            else:
+                self.send_response(200)
+                payload = body.encode()
+                ctype = "text/plain" if path.endswith(".txt") else "text/html; charset=utf-8"
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with lock:
+                in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def verify_crawler():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    results = []
+    try:
+        print("--- Crawl depth 2, budget 10 ---")
+        res = asyncio.run(crawl_site(base + "/", CrawlConfig(max_pages=10, max_depth=2, concurrency=4, per_host=2, delay=0.0)))
+        crawled = {p.url.replace(base, "") for p in res.pages if p.extracted}
+        results.append(check(crawled == {"/", "/a", "/b", "/c"}, f"crawled pages {sorted(crawled)}"))
+        results.append(check(hits["/d"] == 0, "depth limit respected (/d not fetched)"))
+        results.append(check(hits["/private/secret"] == 0 and any("/private/" in u for u in res.skipped_robots),
+                             "robots.txt Disallow respected"))
+        results.append(check(all(hits[p] == 1 for p in ("/", "/a", "/b", "/c")), f"each page fetched once {dict(hits)}"))
+        results.append(check(hits["/file.pdf"] == 0, "asset links skipped"))
+        results.append(check(max_in_flight <= 2, f"per-host concurrency limit (max in flight {max_in_flight})"))
+        m = res.merged
+        results.append(check(m.title == "Fixture Home" and m.description == "Fixture site", "title and description from landing page"))
+        results.append(check(len(m.forms) == 1 and m.forms[0]["page"] == "/a", "form from /a merged"))
+        results.append(check({"Search", "Deep"} <= set(m.buttons), "buttons merged across pages"))
+        results.append(check(m.features.get("has_forms") and m.features.get("is_ecommerce"), f"features OR-ed {m.features}"))
+        results.append(check(any("/missing" in e and "404" in e for e in m.errors), "404 recorded in errors"))
+
+        print("\n--- Page budget 2 ---")
+        hits.clear()
+        res = asyncio.run(crawl_site(base + "/", CrawlConfig(max_pages=2, max_depth=3, delay=0.0)))
+        results.append(check(len(res.pages) == 2, f"budget respected ({len(res.pages)} pages)"))
+
+        print("\n--- Politeness delay ---")
+        hits.clear()
+        t = time.perf_counter()
+        asyncio.run(crawl_site(base + "/", CrawlConfig(max_pages=4, max_depth=1, concurrency=4, per_host=4, delay=0.2)))
+        elapsed = time.perf_counter() - t
+        pages = sum(hits.values()) - hits["/robots.txt"]
+        results.append(check(elapsed >= 0.2 * (pages - 1), f"{pages} requests 0.2s apart took {elapsed:.2f}s"))
+
+        results.append(check(normalize_url("HTTP://Example.COM:80/x#frag") == "http://example.com/x", "URL normalization"))
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_crawler() else 1)
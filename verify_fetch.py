@@ -0,0 +1,125 @@
+"""
+Checks the size-capped streaming fetch (scrape.fetch_page / extract_page and the
+crawler's body cap) and the retry of transient errors against a local
+http.server fixture serving a huge page.
+Run: python verify_fetch.py
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# keep the fixture out of the real page cache
+os.environ.setdefault("SCRAPE_CACHE_DIR", tempfile.mkdtemp(prefix="verify_fetch_"))
+
+from crawler import CrawlConfig, crawl_site  # noqa: E402
+from scrape import extract_page, extract_website_intelligence, fetch_page  # noqa: E402
+
+CARD = "<div class='card'><a href='/p'>View product</a><p>" + "lorem ipsum dolor sit amet " * 20 + "</p></div>"
+HUGE = ("<html><head><title>Huge</title><meta name='description' content='Big page'></head><body>"
+        "<form action='/search'><input type='search' name='q'></form>"
+        + CARD * 6000 + "<footer><button>Last button</button></footer></body></html>").encode()
+SMALL = ("<html><head><title>Small</title></head><body><nav><a href='/'>Home</a></nav>"
+         "<p>Short page about reviews</p><button>Go</button></body></html>").encode()
+PAGES = {"/huge": HUGE, "/small": SMALL, "/flaky": SMALL}
+# paths that answer 503 to their first request
+FLAKY = {"/flaky"}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in FLAKY:
+            FLAKY.discard(path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = PAGES.get(path, b"")
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"fixture"')
+        self.end_headers()
+        try:
+            for i in range(0, len(body), 64 * 1024):
+                self.wfile.write(body[i:i + 64 * 1024])
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client stopped reading
+
+    def log_message(self, *args):
+        pass
+
+
+class FixtureServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # resets from clients that stopped reading are expected
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def verify_fetch():
+    server = FixtureServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    results = []
+    try:
+        print(f"--- Byte cap (page is {len(HUGE):,} bytes) ---")
+        page = fetch_page(base + "/huge?cap", max_bytes=256 * 1024, early_stop=False)
+        results.append(check(page.truncated and page.bytes_read == 256 * 1024, f"read {page.bytes_read:,} bytes"))
+        data = extract_page(page)
+        results.append(check(any("truncated at 262,144 bytes (max_bytes=262,144)" in e for e in data.errors), f"cap recorded in errors {data.errors}"))
+        results.append(check(data.title == "Huge" and len(data.forms) == 1, "head and early forms still extracted"))
+        again = fetch_page(base + "/huge?cap", max_bytes=256 * 1024, early_stop=False)
+        results.append(check(again.truncated and again.bytes_read == 256 * 1024, "truncated body not cached"))
+
+        print("\n--- No cap ---")
+        page = fetch_page(base + "/huge?full", max_bytes=0, early_stop=False)
+        results.append(check(not page.truncated and page.bytes_read == len(HUGE), f"read all {page.bytes_read:,} bytes"))
+        full = extract_page(page)
+        results.append(check("Last button" in full.buttons and not full.errors, "whole page extracted"))
+
+        print("\n--- Early stop ---")
+        page = fetch_page(base + "/huge?early", max_bytes=0, early_stop=True)
+        results.append(check(page.truncated and page.bytes_read < len(HUGE) // 10,
+                             f"stopped after {page.bytes_read:,} of {len(HUGE):,} bytes"))
+        results.append(check(page.tree is not None, "tree parsed during download reused"))
+        early = extract_page(page)
+        results.append(check(early.text_summary == full.text_summary, "text summary identical to full download"))
+        results.append(check(any("stopped early" in e for e in early.errors), "early stop recorded in errors"))
+
+        print("\n--- Complete page through the pull parser ---")
+        page = fetch_page(base + "/small", max_bytes=0, early_stop=True)
+        streamed = asdict(extract_page(page))
+        parsed = asdict(extract_website_intelligence(page.html, page.url))
+        results.append(check(not page.truncated and page.tree is not None and streamed == parsed,
+                             "same extraction as parsing the downloaded string"))
+
+        print("\n--- Retry ---")
+        try:
+            fetched = fetch_page(base + "/flaky", max_bytes=0, early_stop=False).bytes_read
+        except Exception as e:
+            fetched = f"{type(e).__name__}: {e}"
+        results.append(check(fetched == len(SMALL), f"503 on the first request retried and fetched ({fetched})"))
+
+        print("\n--- Crawler cap ---")
+        res = asyncio.run(crawl_site(base + "/huge", CrawlConfig(max_pages=1, max_depth=0, delay=0.0, max_bytes=128 * 1024)))
+        errors = res.pages[0].extracted.errors if res.pages and res.pages[0].extracted else []
+        results.append(check(any("(CrawlConfig.max_bytes=131,072)" in e for e in errors), f"crawler records cap {errors}"))
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_fetch() else 1)
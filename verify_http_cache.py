@@ -0,0 +1,156 @@
+"""
+Checks http_cache.py (conditional requests, freshness, LRU eviction) against a
+local http.server fixture.
+Run: python verify_http_cache.py
+"""
+
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from disk_cache import DiskCache
+from http_cache import HTTPCache
+
+BODY = "<html><head><title>Cached</title></head><body>" + "x" * 2000 + "</body></html>"
+ETAG = '"v1"'
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+requests_seen: Counter = Counter()
+not_modified: Counter = Counter()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        path = self.path
+        requests_seen[path] += 1
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        if path.startswith("/etag"):
+            headers["ETag"] = ETAG
+            if self.headers.get("If-None-Match") == ETAG:
+                return self._send(304, headers, b"", path)
+        elif path == "/lastmod":
+            headers["Last-Modified"] = LAST_MODIFIED
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self._send(304, headers, b"", path)
+        elif path == "/fresh":
+            headers["Cache-Control"] = "public, max-age=60"
+            headers["ETag"] = ETAG
+        elif path == "/nostore":
+            headers["Cache-Control"] = "no-store"
+            headers["ETag"] = ETAG
+        self._send(200, headers, BODY.encode(), path)
+
+    def _send(self, status, headers, payload, path):
+        if status == 304:
+            not_modified[path] += 1
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def verify_http_cache():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HTTPCache(DiskCache(tmp, max_bytes=10 * 1024 * 1024))
+        try:
+            print("--- ETag revalidation ---")
+            first = cache.get(base + "/etag")
+            second = cache.get(base + "/etag#ignored-fragment")
+            results.append(check(not first.from_cache and second.revalidated and second.text == BODY,
+                                 "second fetch answered with 304 and served from disk"))
+            results.append(check(not_modified["/etag"] == 1, "server sent no body the second time"))
+
+            print("\n--- Last-Modified revalidation ---")
+            cache.get(base + "/lastmod")
+            again = cache.get(base + "/lastmod")
+            results.append(check(again.revalidated and not_modified["/lastmod"] == 1, "If-Modified-Since answered with 304"))
+
+            print("\n--- Cache-Control max-age ---")
+            cache.get(base + "/fresh")
+            t = time.perf_counter()
+            fresh = cache.get(base + "/fresh")
+            results.append(check(fresh.from_cache and not fresh.revalidated and requests_seen["/fresh"] == 1,
+                                 f"fresh entry served without a request ({(time.perf_counter() - t) * 1000:.1f} ms)"))
+
+            print("\n--- no-store ---")
+            cache.get(base + "/nostore")
+            cache.get(base + "/nostore")
+            results.append(check(requests_seen["/nostore"] == 2 and not_modified["/nostore"] == 0, "no-store response never cached"))
+
+            print("\n--- Repeated run ---")
+            before = sum(requests_seen.values())
+            for n in range(20):
+                cache.get(f"{base}/etag/{n}")
+            for n in range(20):
+                cache.get(f"{base}/etag/{n}")
+            revalidated = sum(v for k, v in not_modified.items() if k.startswith("/etag/"))
+            results.append(check(revalidated == 20, f"second pass: {revalidated}/20 answered 304 "
+                                                    f"({sum(requests_seen.values()) - before} requests total)"))
+
+            print("\n--- LRU eviction ---")
+            small = DiskCache(tmp + "/small", max_bytes=6000)
+            for n in range(5):
+                small.set(f"k{n}", {"text": "y" * 1500})
+                time.sleep(0.01)
+                small.get("k0")  # keep k0 recently used
+            small.evict()
+            kept = [n for n in range(5) if small.get(f"k{n}") is not None]
+            results.append(check(small.size() <= 6000 and 0 in kept and 1 not in kept, f"size bounded, LRU kept {kept}"))
+
+            print("\n--- Concurrent and failing writes ---")
+            shared = DiskCache(tmp + "/shared", max_bytes=10 ** 7)
+            values = [{"writer": n, "text": str(n) * 20000} for n in range(8)]
+            errors = []
+
+            def write(value):
+                try:
+                    for _ in range(20):
+                        shared.set("same", value)
+                except Exception as e:
+                    errors.append(e)
+
+            writers = [threading.Thread(target=write, args=(v,)) for v in values]
+            for w in writers:
+                w.start()
+            for w in writers:
+                w.join()
+            final = shared.get("same")
+            results.append(check(not errors and final in values,
+                                 f"8 threads writing one key: no errors, a whole entry survives {errors[:1]}"))
+            blocked = DiskCache(tmp + "/not-a-dir/cache", max_bytes=10 ** 6)
+            open(tmp + "/not-a-dir", "w").close()
+            results.append(check(blocked.set("k", {"v": 1}) is False and blocked.get("k") is None,
+                                 "write that cannot reach the disk is skipped, not raised"))
+
+            print("\n--- TTL ---")
+            small.set("short", {"v": 1}, ttl=0.05)
+            time.sleep(0.1)
+            results.append(check(small.get("short") is None, "expired entry not returned"))
+        finally:
+            server.shutdown()
+
+    print(f"\ncache stats: {cache.stats}")
+    print(f"{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_http_cache() else 1)
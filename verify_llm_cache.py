@@ -0,0 +1,96 @@
+"""
+Checks the test-case generation cache (llm_cache.py) against the local fake
+LLM server.
+Run: python verify_llm_cache.py
+"""
+
+import os
+import tempfile
+import time
+
+from fake_llm_server import start_fake_llm_server
+
+server, base_url = start_fake_llm_server(delay=0.3)
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["OPENAI_API_KEY"] = "fake"
+os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="verify_llm_cache_")
+
+import scrape  # noqa: E402
+from llm_cache import cache_key, get_llm_cache  # noqa: E402
+from scrape import ExtractedWebsiteData, generate_test_cases, test_cases_cache_key  # noqa: E402
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def site(**overrides) -> ExtractedWebsiteData:
+    data = dict(
+        url="https://shop.example/", title="Shop", description="A shop",
+        forms=[{"method": "GET", "action": "/search", "inputs": [{"type": "search", "name": "q", "placeholder": "", "required": False}]}],
+        buttons=["Search", "Sign in"], features={"has_search": True}, text_summary="Welcome to the shop",
+        dom_structure="{}", errors=[],
+    )
+    data.update(overrides)
+    return ExtractedWebsiteData(**data)
+
+
+def timed(fn):
+    t = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t
+
+
+def verify_llm_cache():
+    results = []
+    cache = get_llm_cache()
+    try:
+        print("--- Miss then hit ---")
+        first, cold = timed(lambda: generate_test_cases(site(), "basic"))
+        second, warm = timed(lambda: generate_test_cases(site(), "basic"))
+        results.append(check(len(server.requests) == 1 and first == second,
+                             f"second run served from cache ({cold * 1000:.0f} ms -> {warm * 1000:.1f} ms)"))
+        results.append(check(cache.stats["tokens_saved"] > 0, f"tokens saved recorded {cache.stats}"))
+
+        print("\n--- Key covers the prompt inputs ---")
+        generate_test_cases(site(), "standard")
+        generate_test_cases(site(buttons=["Search", "Sign in", "Cart"]), "basic")
+        results.append(check(len(server.requests) == 3, "coverage and used fields change the key"))
+        generate_test_cases(site(text_summary="x" * 2000), "basic")
+        generate_test_cases(site(text_summary="x" * 2000 + " past the content sample", errors=["ignored"]), "basic")
+        results.append(check(len(server.requests) == 4, "fields the prompt does not use do not change the key"))
+        key = test_cases_cache_key(site(), "basic")
+        scrape.MODEL_NAME, model = "other-model", scrape.MODEL_NAME
+        other = test_cases_cache_key(site(), "basic")
+        scrape.MODEL_NAME = model
+        scrape.PROMPT_VERSION, version = "test", scrape.PROMPT_VERSION
+        bumped = test_cases_cache_key(site(), "basic")
+        scrape.PROMPT_VERSION = version
+        results.append(check(len({key, other, bumped}) == 3, "model and prompt version change the key"))
+        results.append(check(cache_key(a=1, b=[2]) == cache_key(b=[2], a=1), "key independent of argument order"))
+
+        print("\n--- Invalidation ---")
+        generate_test_cases(site(), "basic", refresh=True)
+        results.append(check(len(server.requests) == 5, "refresh=True regenerates"))
+        cache.invalidate(key)
+        generate_test_cases(site(), "basic")
+        results.append(check(len(server.requests) == 6, "invalidate(key) drops one entry"))
+        cache.clear()
+        generate_test_cases(site(), "basic")
+        results.append(check(len(server.requests) == 7, "clear() drops everything"))
+
+        print("\n--- TTL ---")
+        cache.set(key, [{"id": 1}], ttl=0.05)
+        time.sleep(0.1)
+        generate_test_cases(site(), "basic")
+        results.append(check(len(server.requests) == 8, "expired entry regenerated"))
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_llm_cache() else 1)
@@ -0,0 +1,127 @@
+"""
+Checks the token-budgeted prompt builder (prompt_builder.py): compact
+serialization, ranking and deduplication of inputs and buttons, budget
+fitting, and the generation prompt actually sent to the local fake LLM server.
+Run: python verify_prompt.py
+"""
+
+import os
+import tempfile
+
+from fake_llm_server import start_fake_llm_server
+
+server, base_url = start_fake_llm_server()
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["OPENAI_API_KEY"] = "fake"
+os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="verify_prompt_")
+
+from prompt_builder import (  # noqa: E402
+    SitePrompt,
+    build_site_prompt,
+    count_tokens,
+    render_site_uncompacted,
+    tiktoken,
+)
+import scrape  # noqa: E402
+from scrape import MODEL_NAME, build_messages, extract_website_intelligence, generate_test_cases  # noqa: E402
+
+NEWSLETTER = "<form action='/subscribe' method='post'><input type='hidden' name='csrf' value='x'>" \
+             "<input type='email' name='email' placeholder='Your email' required><button>Subscribe</button></form>"
+PAGE = f"""<html><head><title>Example Shop</title><meta name="description" content="Shoes and bags"></head>
+<body><header><nav>{''.join(f"<a href='/c/{i}'>Category {i}</a>" for i in range(12))}
+<a href='/login'>Log in</a><a href='/login'>log  in</a><a href='/p/2'>2</a></nav>{NEWSLETTER}</header>
+<main>
+<form action='/search'><input type='search' name='q' placeholder='q'><input type='submit' value='Search'></form>
+<form action='/login' method='post'>
+  <input type='hidden' name='csrf' value='x'><input type='hidden' name='next' value='/'>
+  <input type='checkbox' name='remember'><input type='email' name='email' required>
+  <input type='password' name='password' required><button>Sign in</button></form>
+<form action='/contact' method='post'>
+  {''.join(f"<input type='text' name='field{i}' placeholder='Field {i}'>" for i in range(8))}
+  <textarea name='message' required></textarea><button>Send message</button></form>
+<section>{' '.join(f'Product {i} is a great item with free delivery.' for i in range(80))}</section>
+</main><footer>{NEWSLETTER}<a href='/privacy'>Privacy policy and terms of use for all customers</a></footer>
+</body></html>"""
+TINY_PAGE = "<html><head><title>Tiny</title></head><body><a href='/about'>About</a><p>Hello</p></body></html>"
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def names(forms):
+    return [i.get("name") for f in forms for i in f["inputs"]]
+
+
+def verify_prompt():
+    extracted = extract_website_intelligence(PAGE, "https://shop.example/")
+    results = []
+    try:
+        print(f"Counting tokens with {'tiktoken' if tiktoken else 'the built-in estimate'}")
+        print("--- Compaction without trimming ---")
+        full = build_site_prompt(extracted, budget=0, model=MODEL_NAME)
+        print(f" {full.report()}")
+        results.append(check(full.savings >= 0.2 and not any(full.trimmed.values()),
+                             f"{full.baseline_tokens} -> {full.tokens} tokens with nothing trimmed"))
+        forms = full.inputs["forms"]
+        kept = set(names(forms))
+        visible = {i["name"] for f in extracted.forms for i in f["inputs"] if i["type"] not in ("hidden", "submit")}
+        results.append(check(kept == visible and "csrf" not in kept, "every visible input kept, hidden/submit dropped"))
+        results.append(check(len(forms) == len(extracted.forms) - 1, "repeated newsletter form sent once"))
+        buttons = full.inputs["buttons"]
+        results.append(check([b.lower() for b in buttons].count("log in") == 1, "duplicate buttons removed"))
+
+        print("\n--- Ranking ---")
+        login = next(f for f in forms if f.get("action") == "/login")
+        results.append(check(forms[0] is login and [i["type"] for i in login["inputs"]] == ["password", "email", "checkbox"],
+                             "login form first, password and email ahead of the checkbox"))
+        results.append(check(buttons.index("Log in") < buttons.index("Category 0") < buttons.index("2"),
+                             f"action buttons first: {buttons[:4]}"))
+
+        print("\n--- Budget ---")
+        budget = full.tokens // 2
+        tight = build_site_prompt(extracted, budget=budget, model=MODEL_NAME)
+        print(f" {tight.report()}")
+        results.append(check(tight.tokens <= budget, f"{tight.tokens} tokens within a budget of {budget}"))
+        tight_names = set(names(tight.inputs["forms"]))
+        results.append(check({"password", "email", "q", "message"} <= tight_names and "Log in" in tight.inputs["buttons"],
+                             "salient inputs and buttons survive trimming"))
+        results.append(check(tight.trimmed["content chars"] > 0 and tight.trimmed["forms"] == 0,
+                             "content is trimmed before any form"))
+
+        print("\n--- Small pages ---")
+        tiny = build_site_prompt(extract_website_intelligence(TINY_PAGE, "https://tiny.example/"), model=MODEL_NAME)
+        print(f" {tiny.report()}")
+        results.append(check(tiny.tokens <= tiny.baseline_tokens, "small page never sent larger than uncompacted"))
+        grown = SitePrompt(inputs={}, text="", tokens=60, baseline_tokens=50, budget=0).report()
+        results.append(check("10 more than uncompacted (+20%)" in grown, f"increase reported as such: {grown}"))
+
+        print("\n--- Generation prompt ---")
+        messages = build_messages(extracted, "basic")
+        sent = messages[1]["content"]
+        site = build_site_prompt(extracted, model=MODEL_NAME)
+        results.append(check(site.text in sent, "user prompt carries the compacted site data"))
+        builds = []
+        scrape.build_site_prompt = lambda *a, **kw: builds.append(1) or build_site_prompt(*a, **kw)
+        try:
+            cases = generate_test_cases(extracted, "basic", refresh=True)
+        finally:
+            scrape.build_site_prompt = build_site_prompt
+        results.append(check(len(builds) == 1, f"site section built {len(builds)}x per generation (key and messages share it)"))
+        request = server.requests[-1]
+        prompt_tokens = count_tokens("".join(m["content"] for m in request["messages"]), MODEL_NAME)
+        old = sent.replace(site.text, render_site_uncompacted(extracted))
+        old_tokens = count_tokens(messages[0]["content"] + old, MODEL_NAME)
+        results.append(check(bool(cases) and prompt_tokens < old_tokens,
+                             f"whole request {prompt_tokens} tokens vs {old_tokens} before "
+                             f"({1 - prompt_tokens / old_tokens:.0%} less)"))
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_prompt() else 1)
@@ -0,0 +1,216 @@
+"""
+Checks the concurrent test runner (suite_runner.py) offline with the stub
+backend: bounded concurrency, session reuse and isolation, completion-order
+results, timeouts (also while opening a session), retries, the shared LLM
+client, E2B sandbox cleanup (with a fake sandbox) and browsing_agent.py.
+Run: python verify_runner.py
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import suite_runner
+from suite_runner import E2BBackend, StubBackend, SuiteRunner
+
+TESTS = [{"title": f"Test {i}", "steps": [f"Step {i}"], "delay": 0.2} for i in range(12)]
+
+
+class FakeSandbox:
+    """Stands in for e2b_desktop.Sandbox: `create` can be slow and `launch` can fail."""
+
+    create_delay = 0.0
+    fail_launch = False
+    killed = []
+
+    def __init__(self):
+        self.alive = True
+
+    @classmethod
+    def create(cls):
+        time.sleep(cls.create_delay)
+        return cls()
+
+    def launch(self, app):
+        if self.fail_launch:
+            raise RuntimeError("chrome did not start")
+
+    def wait(self, ms):
+        pass
+
+    def kill(self):
+        self.alive = False
+        FakeSandbox.killed.append(self)
+
+
+class ScriptedBackend(StubBackend):
+    """
+    Stub whose tests sleep for test["delay"] and can hang, raise or fail on given
+    attempts. Each test leaves a "cookie" in its session; the first `hang_opens`
+    session opens never finish.
+    """
+
+    needs_llm = True
+
+    def __init__(self, hang_opens: int = 0):
+        super().__init__()
+        self.attempts = {}
+        self.llms = set()
+        self.busy_sessions = set()
+        self.shared_session = False
+        self.leaked = False
+        self.hang_opens = hang_opens
+
+    async def open_session(self, number):
+        if self.hang_opens:
+            self.hang_opens -= 1
+            await asyncio.sleep(60)
+        return await super().open_session(number)
+
+    async def run_test(self, session, test, llm):
+        self.llms.add(id(llm))
+        if getattr(session, "cookie", None) is not None:
+            self.leaked = True
+        session.cookie = test["title"]
+        if session.number in self.busy_sessions:
+            self.shared_session = True
+        self.busy_sessions.add(session.number)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        attempt = self.attempts[test["title"]] = self.attempts.get(test["title"], 0) + 1
+        try:
+            if attempt in test.get("hang_on", ()):
+                await asyncio.sleep(60)
+            if attempt in test.get("raise_on", ()):
+                raise RuntimeError("browser crashed")
+            await asyncio.sleep(test.get("delay", 0.05))
+            return {"status": test.get("verdict", "pass"), "detail": "scripted"}
+        finally:
+            self.in_flight -= 1
+            self.busy_sessions.discard(session.number)
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def run(backend, tests, **kw):
+    llm = kw.pop("llm", object())
+    return asyncio.run(SuiteRunner(backend, llm=llm, **kw).run(tests))
+
+
+def verify_runner():
+    results = []
+
+    print("--- Concurrency ---")
+    backend = ScriptedBackend()
+    t = time.perf_counter()
+    done = run(backend, TESTS, concurrency=4)
+    wall = time.perf_counter() - t
+    serial = sum(tc["delay"] for tc in TESTS)
+    results.append(check(len(done) == 12 and all(r.status == "pass" for r in done), "all 12 tests passed"))
+    results.append(check(backend.max_in_flight == 4 and wall < serial / 3,
+                         f"{backend.max_in_flight} at once: {wall:.2f}s vs {serial:.1f}s one after another"))
+    results.append(check(backend.opened == 4 == backend.closed and not backend.shared_session,
+                         f"{backend.opened} sessions reused, one test at a time each, all closed"))
+    results.append(check(backend.resets == 12 - 4 and not backend.leaked,
+                         f"browser reset before each of the {backend.resets} reused runs, no state carried over"))
+    results.append(check(len(backend.llms) == 1, "one LLM client shared by every test"))
+
+    print("\n--- Completion order ---")
+    tests = [{"title": "slow", "delay": 0.6}, {"title": "medium", "delay": 0.3}, {"title": "fast", "delay": 0.05}]
+    done = run(ScriptedBackend(), tests, concurrency=3)
+    results.append(check([r.title for r in done] == ["fast", "medium", "slow"] and [r.index for r in done] == [2, 1, 0],
+                         "results arrive as tests finish, with their original index"))
+
+    print("\n--- Timeouts and retries ---")
+    backend = ScriptedBackend()
+    tests = [
+        {"title": "flaky", "hang_on": [1]},
+        {"title": "hangs", "hang_on": [1, 2]},
+        {"title": "crashes", "raise_on": [1, 2]},
+        {"title": "fails", "verdict": "fail"},
+        {"title": "fine"},
+    ]
+    t = time.perf_counter()
+    by_title = {r.title: r for r in run(backend, tests, concurrency=5, timeout=0.3, retries=1)}
+    wall = time.perf_counter() - t
+    results.append(check(by_title["flaky"].status == "pass" and by_title["flaky"].attempts == 2,
+                         "timed-out attempt retried and passed"))
+    results.append(check(by_title["hangs"].status == "timeout" and by_title["crashes"].status == "error"
+                         and by_title["hangs"].attempts == by_title["crashes"].attempts == 2,
+                         f"gave up after 2 attempts: {by_title['crashes'].detail}"))
+    results.append(check(by_title["fails"].status == "fail" and by_title["fails"].attempts == 1,
+                         "FAIL verdict reported, not retried"))
+    # flaky, hangs and crashes each get a fresh session for their retry
+    results.append(check(backend.opened == 5 + 3 and backend.closed == backend.opened and wall < 1.5,
+                         f"{backend.opened - 5} broken sessions replaced, {wall:.2f}s in total"))
+
+    print("\n--- Session start ---")
+    backend = ScriptedBackend(hang_opens=1)
+    t = time.perf_counter()
+    done = run(backend, [{"title": "after hang"}], concurrency=1, timeout=0.3, retries=1)
+    wall = time.perf_counter() - t
+    results.append(check(done[0].status == "pass" and done[0].attempts == 2 and wall < 1.5,
+                         f"hung session start timed out and retried in {wall:.2f}s"))
+    installed = suite_runner.Sandbox, suite_runner.Browser
+    suite_runner.Sandbox, suite_runner.Browser = FakeSandbox, object
+    try:
+        FakeSandbox.fail_launch = True
+        try:
+            E2BBackend()._start_sandbox()
+        except RuntimeError:
+            pass
+        failed = list(FakeSandbox.killed)
+        FakeSandbox.fail_launch, FakeSandbox.create_delay = False, 0.3
+
+        async def abandon_open():
+            try:
+                await asyncio.wait_for(E2BBackend().open_session(1), 0.05)
+            except asyncio.TimeoutError:
+                pass
+            await asyncio.sleep(0.5)
+
+        asyncio.run(abandon_open())
+        late = FakeSandbox.killed[len(failed):]
+        results.append(check(len(failed) == 1 and len(late) == 1 and not late[0].alive,
+                             "E2B sandbox killed when Chrome fails to start and when its start is abandoned"))
+    finally:
+        suite_runner.Sandbox, suite_runner.Browser = installed
+
+    print("\n--- Early stop ---")
+    backend = ScriptedBackend()
+
+    async def first_two():
+        seen = []
+        async for result in SuiteRunner(backend, concurrency=3, llm=object()).iter_results(TESTS):
+            seen.append(result)
+            if len(seen) == 2:
+                break
+        return seen
+
+    asyncio.run(first_two())
+    results.append(check(backend.closed == backend.opened == 3, "sessions closed when the consumer stops early"))
+
+    print("\n--- browsing_agent.py ---")
+    with tempfile.TemporaryDirectory() as cwd:
+        with open(os.path.join(cwd, "tests.json"), "w", encoding="utf-8") as f:
+            json.dump(TESTS, f)
+        env = {**os.environ, "RUNNER_BACKEND": "stub", "RUNNER_CONCURRENCY": "6",
+               "PYTHONPATH": os.path.dirname(os.path.abspath(__file__))}
+        proc = subprocess.run([sys.executable, os.path.abspath("browsing_agent.py")], cwd=cwd, env=env,
+                              capture_output=True, text=True, timeout=60)
+        results.append(check(proc.returncode == 0 and "12 pass" in proc.stdout and "on 6 sessions" in proc.stdout,
+                             "browsing_agent runs tests.json through the pool"))
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_runner() else 1)
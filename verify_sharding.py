@@ -0,0 +1,102 @@
+"""
+Checks sharded test generation (generation_planner.py) against the local fake
+LLM server: planning, bounded concurrency, merge/renumber/dedup, failures and
+wall time compared with one unsharded request.
+Run: python verify_sharding.py
+"""
+
+import os
+import tempfile
+import time
+
+from fake_llm_server import start_fake_llm_server
+
+server, base_url = start_fake_llm_server(delay=0.1, token_delay=0.001)
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["OPENAI_API_KEY"] = "fake"
+os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="verify_sharding_")
+
+from generation_planner import AREAS, generate_sharded, plan_shards  # noqa: E402
+from scrape import ExtractedWebsiteData, generate_test_cases  # noqa: E402
+
+RICH = ExtractedWebsiteData(
+    url="https://shop.example/", title="Shop", description="A shop",
+    forms=[
+        {"method": "GET", "action": "/search", "inputs": [{"type": "search", "name": "q", "placeholder": "", "required": False}]},
+        {"method": "POST", "action": "/login", "inputs": [{"type": "email", "name": "email", "placeholder": "", "required": True},
+                                                          {"type": "password", "name": "pw", "placeholder": "", "required": True}]},
+        {"method": "POST", "action": "/contact", "inputs": [{"type": "text", "name": "msg", "placeholder": "", "required": True}]},
+    ],
+    buttons=["Search", "Sign in", "Contact"], features={"has_search": True, "has_auth": True, "is_ecommerce": True},
+    text_summary="Products and reviews " * 40, dom_structure="{}",
+)
+PLAIN = ExtractedWebsiteData("https://plain.example/", "Plain", "", [], ["Home"], {}, "Hello", "{}")
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def timed(fn):
+    t = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t
+
+
+def verify_sharding():
+    results = []
+    try:
+        print("--- Planning ---")
+        shards = plan_shards(RICH, "comprehensive")
+        results.append(check([s.area for s in shards] == list(AREAS) and sum(s.count for s in shards) == 70
+                             and min(s.count for s in shards) >= 5, f"plan {[(s.area, s.count) for s in shards]}"))
+        results.append(check(plan_shards(RICH, "basic") == [] and plan_shards(PLAIN, "comprehensive") == [],
+                             "small coverage and single-area sites are not sharded"))
+
+        print("\n--- Sharded vs single request ---")
+        single, single_time = timed(lambda: generate_test_cases(RICH, "comprehensive", refresh=True))
+        largest = max(shards, key=lambda s: s.count)
+        _, largest_time = timed(lambda: generate_test_cases(RICH, "comprehensive", True, largest.focus, largest.count))
+        server.max_in_flight = 0
+        merged, sharded_time = timed(lambda: list(generate_sharded(RICH, "comprehensive", shards, refresh=True, concurrency=5)))
+        results.append(check(sharded_time < single_time / 2 and sharded_time < largest_time * 1.5 + 0.3,
+                             f"wall time {sharded_time:.2f}s vs single {single_time:.2f}s (largest shard {largest_time:.2f}s)"))
+        results.append(check([tc["id"] for tc in merged] == list(range(1, len(merged) + 1)), "ids renumbered 1..N"))
+        titles = [tc["title"] for tc in merged]
+        results.append(check(len(titles) == len(set(titles)) and len(merged) == 70 - (len(shards) - 1),
+                             f"{len(merged)} cases after dropping {70 - len(merged)} duplicates"))
+        results.append(check({tc["area"] for tc in merged} == set(AREAS), "cases tagged with their area"))
+        results.append(check(len(single) == 70, "single request still available"))
+
+        print("\n--- Bounded concurrency ---")
+        server.max_in_flight = 0
+        list(generate_sharded(RICH, "comprehensive", shards, refresh=True, concurrency=2))
+        results.append(check(server.max_in_flight <= 2, f"max {server.max_in_flight} requests in flight"))
+
+        print("\n--- Cache ---")
+        before = len(server.requests)
+        again = list(generate_sharded(RICH, "comprehensive", shards))
+        results.append(check(len(server.requests) == before and len(again) == len(merged), "repeat run served from shard cache"))
+
+        print("\n--- Failures ---")
+        server.fail_on = "Search: queries"
+        partial = list(generate_sharded(RICH, "comprehensive", shards, refresh=True))
+        results.append(check("search" not in {tc["area"] for tc in partial} and len(partial) > 0,
+                             f"failed shard skipped, {len(partial)} cases from the others"))
+        server.fail_on = "FOCUS AREA"
+        try:
+            list(generate_sharded(RICH, "comprehensive", shards, refresh=True))
+            results.append(check(False, "all shards failing raises"))
+        except Exception as e:
+            results.append(check(True, f"all shards failing raises {type(e).__name__}"))
+        server.fail_on = None
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_sharding() else 1)
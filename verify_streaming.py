@@ -0,0 +1,93 @@
+"""
+Checks streaming test generation (JSONArrayStream, stream_test_cases) against
+the local fake LLM server.
+Run: python verify_streaming.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from fake_llm_server import start_fake_llm_server
+
+server, base_url = start_fake_llm_server(delay=0.2, token_delay=0.002)
+os.environ["OPENAI_BASE_URL"] = base_url
+os.environ["OPENAI_API_KEY"] = "fake"
+os.environ["LLM_CACHE_DIR"] = tempfile.mkdtemp(prefix="verify_streaming_")
+
+from scrape import ExtractedWebsiteData, JSONArrayStream, generate_test_cases, stream_test_cases  # noqa: E402
+
+TRICKY = [
+    {"id": 1, "title": 'Quote " and backslash \\ and ] and }', "steps": ["a, b", "[x]"]},
+    {"id": 2, "title": "Unicode é 漢字  ", "nested": {"list": [1, [2, {"k": "v"}]]}},
+    {"id": 3, "title": "", "steps": []},
+    42, "plain string", None, True,
+]
+
+
+def check(ok: bool, message: str) -> bool:
+    print(f"{'✅ Success' if ok else '❌ Failure'}: {message}")
+    return ok
+
+
+def parse_in_pieces(text: str, size: int):
+    parser = JSONArrayStream()
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return items, parser
+
+
+def verify_streaming():
+    results = []
+    try:
+        print("--- Incremental parser ---")
+        text = "Sure! Here you go:\n```json\n" + json.dumps(TRICKY, indent=2, ensure_ascii=False) + "\n```\nDone [not parsed]"
+        ok = all(parse_in_pieces(text, size)[0] == TRICKY for size in (1, 2, 3, 7, 64, len(text)))
+        results.append(check(ok, "same elements as json.loads for every piece size"))
+        items, parser = parse_in_pieces(json.dumps(TRICKY[:3])[:-8], 5)
+        results.append(check(not parser.done and items == TRICKY[:2], "truncated array yields only complete elements"))
+        try:
+            JSONArrayStream().feed('[{"id": 1,}]')
+            results.append(check(False, "invalid element raises ValueError"))
+        except ValueError:
+            results.append(check(True, "invalid element raises ValueError"))
+
+        print("\n--- Streaming generation ---")
+        site = ExtractedWebsiteData("https://example.com/", "Example", "", [], ["Search"], {}, "Example text", "{}")
+        t = time.perf_counter()
+        first = None
+        streamed = []
+        for tc in stream_test_cases(site, "standard", refresh=True):
+            first = first if first is not None else time.perf_counter() - t
+            streamed.append(tc)
+        total = time.perf_counter() - t
+        results.append(check(len(streamed) == 50 and first < total / 5,
+                             f"first of {len(streamed)} cases after {first:.2f}s, all after {total:.2f}s"))
+
+        t = time.perf_counter()
+        whole = generate_test_cases(site, "standard", refresh=True)
+        blocking = time.perf_counter() - t
+        results.append(check(whole == streamed, f"same cases as the blocking call ({blocking:.2f}s to first case)"))
+
+        requests_before = len(server.requests)
+        cached = list(stream_test_cases(site, "standard"))
+        results.append(check(cached == streamed and len(server.requests) == requests_before, "repeat run served from cache"))
+
+        gen = stream_test_cases(site, "basic", refresh=True)
+        head = [next(gen) for _ in range(3)]
+        gen.close()
+        results.append(check(len(head) == 3, "consumer can stop early (stream closed)"))
+        requests_before = len(server.requests)
+        list(stream_test_cases(site, "basic"))
+        results.append(check(len(server.requests) == requests_before + 1, "abandoned stream was not cached"))
+    finally:
+        server.shutdown()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if verify_streaming() else 1)